@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
-from datetime import timedelta 
+from datetime import time, timedelta 
+
+from .database import configurar_bancos
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,11 +50,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Instrumentação opcional (AGENDA_PROFILING); no topo para medir a requisição inteira
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Com réplicas de leitura: quem acabou de alterar algo lê do banco principal
+    'core.routers.PrincipalAposEscritaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,13 +86,40 @@ WSGI_APPLICATION = 'agenda_aberta.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Configurado por variáveis de ambiente (AGENDA_DB_URL, AGENDA_DB_REPLICAS...),
+# ver agenda_aberta/database.py; sem elas, SQLite em BASE_DIR/db.sqlite3
+
+DATABASES = configurar_bancos(BASE_DIR)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Atraso máximo (segundos) das réplicas em relação ao principal: por esse tempo,
+# quem fez uma alteração lê do principal e respostas lidas da réplica logo após
+# uma alteração não ficam mais do que isso no cache
+AGENDA_DB_REPLICA_ATRASO = int(os.environ.get('AGENDA_DB_REPLICA_ATRASO', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Por padrão usa memória local (um processo). Com vários processos/servidores,
+# aponte para um backend compartilhado, ex:
+#   AGENDA_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache AGENDA_CACHE_LOCATION=/var/tmp/agenda_cache
+#   AGENDA_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache AGENDA_CACHE_LOCATION=redis://127.0.0.1:6379
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('AGENDA_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('AGENDA_CACHE_LOCATION', 'agenda-aberta'),
+        # O padrão do Django (300 entradas) é pouco: há um contador de geração
+        # por escopo (dia, curso, professor, sala...) além das entradas em si
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('AGENDA_CACHE_MAX_ENTRIES', 10000))},
     }
 }
 
+# Validade das respostas em cache (core.cache). Pode ser longa porque as
+# alterações em horários/disciplinas invalidam o cache imediatamente.
+AGENDA_CACHE_TIMEOUT = int(os.environ.get('AGENDA_CACHE_TIMEOUT', 60 * 60 * 6))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,7 +166,8 @@ AUTH_USER_MODEL = 'core.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT com os dados do usuário no token e cache curto (sem consulta por requisição)
+        'core.authentication.JWTComCacheAuthentication',
     ),
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
     'DEFAULT_FILTER_BACKENDS': [
@@ -142,11 +177,80 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Paginação por cursor das listagens de horários (core.pagination)
+AGENDA_PAGE_SIZE = 50
+AGENDA_MAX_PAGE_SIZE = 500
+
+# Limite de linhas por importação em lote de horários (core.importers)
+AGENDA_IMPORTACAO_MAX_LINHAS = 5000
+
+# Backend da busca textual de horários (core.search): 'fts5' (SQLite),
+# 'trigrama' (PostgreSQL + pg_trgm) ou 'basica'. Vazio = o melhor disponível.
+AGENDA_BUSCA_BACKEND = os.environ.get('AGENDA_BUSCA_BACKEND') or None
+
+# Instrumentação de requisições (core.profiling): cabeçalho Server-Timing e
+# agregados por endpoint em /api/admin/perfil/. Desligada por padrão.
+AGENDA_PROFILING = os.environ.get('AGENDA_PROFILING', '').lower() in ('1', 'true', 'sim')
+# A partir de quantas execuções da mesma consulta em uma requisição ela conta como repetida (N+1)
+AGENDA_PROFILING_LIMIAR_REPETICAO = 3
+
+# Listagens de horários serializadas direto de values() (core.fastpath), com
+# saída idêntica à dos serializers do DRF. False volta ao caminho padrão.
+AGENDA_SERIALIZACAO_RAPIDA = os.environ.get('AGENDA_SERIALIZACAO_RAPIDA', '1').lower() in ('1', 'true', 'sim')
+
+# Linhas lidas do banco por vez nas exportações em streaming (core.streaming)
+AGENDA_EXPORTACAO_CHUNK = 1000
+
+# Feeds iCalendar (core.ics): fuso dos horários, domínio dos UIDs dos eventos
+# e intervalo de atualização sugerido aos clientes (duração ISO 8601)
+AGENDA_ICS_FUSO = os.environ.get('AGENDA_ICS_FUSO', 'America/Fortaleza')
+AGENDA_ICS_DOMINIO = os.environ.get('AGENDA_ICS_DOMINIO', 'agenda-aberta.ufersa.edu.br')
+AGENDA_ICS_ATUALIZACAO = 'PT1H'
+
+# Busca de intervalos livres (core.availability): janela padrão do dia e
+# limite de salas + professores por consulta
+AGENDA_DISPONIBILIDADE_INICIO = time(7, 0)
+AGENDA_DISPONIBILIDADE_FIM = time(22, 0)
+AGENDA_DISPONIBILIDADE_MAX_RECURSOS = 500
+
+# Feed de alterações em Server-Sent Events (core.events; conexão contínua só sob ASGI):
+# 'cache' passa os eventos pelo cache do Django, com uma sequência única, e
+# serve a vários processos desde que o cache seja compartilhado (Redis,
+# memcached; o LocMemCache é de cada processo). 'local' entrega só às conexões
+# do mesmo processo, com sequência própria: só para um processo único, já que
+# sob WSGI cada consulta pode cair em outro worker e perder ou repetir eventos.
+AGENDA_EVENTOS_TRANSMISSOR = os.environ.get('AGENDA_EVENTOS_TRANSMISSOR', 'cache')
+# Segundos sem eventos até o envio de um heartbeat na conexão
+AGENDA_EVENTOS_HEARTBEAT = 15
+# Sob WSGI o feed não mantém a conexão: segundos entre as consultas do navegador
+AGENDA_EVENTOS_CONSULTA = 10
+
+# Leituras públicas assíncronas (core.async_views): sempre disponíveis em
+# /api/async/horarios-publicos/. Ligado, as rotas /api/horarios-publicos/
+# (listagem, detalhe e grade) também passam a usá-las. Só faz sentido sob ASGI.
+AGENDA_LEITURA_ASSINCRONA = os.environ.get('AGENDA_LEITURA_ASSINCRONA', '').lower() in ('1', 'true', 'sim')
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60), # Define a vida útil do token de acesso para 60 minutos
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),    # Define a vida útil do token de atualização para 1 dia
+    "TOKEN_OBTAIN_SERIALIZER": "core.authentication.TokenComDadosSerializer",
 }
 
+# Validade (segundos) dos dados de usuário em cache usados pela autenticação
+# quando o token é anterior à última alteração do usuário (core.authentication)
+AGENDA_USUARIO_CACHE_TIMEOUT = int(os.environ.get('AGENDA_USUARIO_CACHE_TIMEOUT', 300))
+
+# Hash de senhas do login e do cadastro da API em um pool de processos
+# (core.hashing), opcional: AGENDA_HASH_PROCESSOS processos (0 = na thread da
+# requisição, o padrão; ex: metade dos núcleos), até AGENDA_HASH_FILA pedidos
+# esperando além deles (acima disso, 429 com Retry-After), prioridade menor
+# (nice) para não disputar CPU com as leituras e AGENDA_HASH_TIMEOUT segundos
+# de espera por pedido (acima disso, 503)
+AGENDA_HASH_PROCESSOS = int(os.environ.get('AGENDA_HASH_PROCESSOS', 0))
+AGENDA_HASH_FILA = int(os.environ.get('AGENDA_HASH_FILA', 32))
+AGENDA_HASH_PRIORIDADE = 10
+AGENDA_HASH_TIMEOUT = 10
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173", # Endereço do app React (Vite)
     "http://127.0.0.1:5173",
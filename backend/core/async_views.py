@@ -0,0 +1,183 @@
+"""
+Versões assíncronas das leituras públicas de horários (listagem e busca,
+detalhe e grade semanal), para servidores ASGI.
+
+O DRF só tem views síncronas: sob ASGI cada requisição ocupa uma thread do
+começo ao fim, inclusive enquanto espera o banco. Estas views rodam no event
+loop e só saem dele para as consultas (ORM assíncrono do Django), então em
+picos de acesso a quantidade de requisições em andamento não fica limitada
+ao pool de threads.
+
+Filtros, busca, ordenação, paginação por cursor, cache de respostas, GET
+condicional e o serializer compilado são os mesmos de HorarioPublicViewSet
+(a view é instanciada apenas para montar a consulta), de modo que a saída é
+idêntica à do caminho síncrono. O cache é acessado diretamente (pelos métodos síncronos da view): com os
+backends usados (memória local, Redis) cada operação leva microssegundos, e
+a API assíncrona de cache do Django apenas repassaria a chamada a uma thread.
+"""
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .exceptions import custom_exception_handler
+from .grid import TIPOS_GRADE, ChaveInvalida, GradeInexistente, aobter_grade, compactar_grade, validar_chave
+from .responses import ApiResponse
+from .routers import usar_replica
+from .views import MENSAGEM_VISUALIZACAO, HorarioPublicViewSet
+
+
+_LISTAGEM_SINCRONA = HorarioPublicViewSet.as_view({'get': 'list'})
+
+
+def _renderizar(response):
+    """Renderiza uma Response do DRF fora da APIView (mesma saída do JSONRenderer)."""
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = JSONRenderer.media_type
+    response.renderer_context = {}
+    return response.render()
+
+
+class LeituraPublicaAsyncView(View):
+    """
+    Base: monta a HorarioPublicViewSet da ação, autentica, escolhe a réplica
+    e converte os erros do DRF. Cada subclasse define `acao` e a corrotina
+    `responder(viewset, request, **kwargs)`, que devolve a resposta.
+    """
+    acao = None
+
+    def _viewset(self, request, kwargs):
+        viewset = HorarioPublicViewSet(action=self.acao, args=(), kwargs=kwargs, format_kwarg=None, headers={})
+        # Os autenticadores da viewset: o usuário decide a réplica (quem acabou
+        # de escrever lê do principal, ver core.routers)
+        viewset.request = Request(request, authenticators=viewset.get_authenticators())
+        return viewset
+
+    async def _autenticar(self, request):
+        if request._request.headers.get('Authorization'):
+            # O usuário de um token antigo pode vir do banco: fora do event loop
+            await sync_to_async(lambda: request.user)()
+        else:
+            # Sem credenciais os autenticadores não consultam nada: usuário anônimo
+            request.user
+
+    async def get(self, request, **kwargs):
+        viewset = self._viewset(request, kwargs)
+        try:
+            await self._autenticar(viewset.request)
+            # As consultas saem do event loop por sync_to_async, que copia o contexto
+            # com a réplica escolhida (ver core.routers)
+            viewset.replica_leitura = viewset.get_replica_leitura(viewset.request)
+            with usar_replica(viewset.replica_leitura):
+                return await self.responder(viewset, viewset.request, **kwargs)
+        except APIException as exc:
+            if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+                # Como APIView.handle_exception: 401 com o desafio do autenticador
+                exc.auth_header = viewset.get_authenticate_header(viewset.request)
+            return _renderizar(custom_exception_handler(exc, {'view': viewset, 'request': viewset.request}))
+
+    async def _filtrar(self, viewset):
+        # Pode consultar o banco (validação de ?disciplina=, detecção do índice de
+        # busca), então roda fora do event loop; o resto é só montar a consulta
+        return await sync_to_async(lambda: viewset.filter_queryset(viewset.get_queryset()))()
+
+    async def _resposta_em_cache(self, viewset, request, queryset, gerar_dados):
+        """GET condicional + cache de respostas, como ConditionalGetMixin e CacheGeracionalMixin."""
+        # Em cache, o corpo e os totais do validador vêm da mesma entrada, sem o banco
+        chave, entrada = viewset.entrada_em_cache(request)
+        if entrada is not None and entrada['totais'] is not None:
+            viewset.totais_validacao = entrada['totais']
+        else:
+            viewset.totais_validacao = await queryset.order_by().aaggregate(**viewset.get_agregados_validacao())
+        etag, last_modified = viewset.validadores_dos_totais(request, viewset.totais_validacao)
+        cabecalhos = None
+        if etag is not None:
+            condicional, cabecalhos = viewset.verificar_condicional(request, etag, last_modified)
+            if condicional is not None:
+                return condicional
+
+        if entrada is not None:
+            dados = entrada['dados']
+        else:
+            dados = await gerar_dados()
+            viewset.guardar_em_cache(chave, dados)
+
+        if not viewset.modo_compacto():
+            dados = {**dados, 'message': MENSAGEM_VISUALIZACAO}
+        response = _renderizar(Response(dados))
+        if cabecalhos is not None:
+            viewset.aplicar_validadores(response, cabecalhos)
+        return response
+
+
+class HorarioPublicoListaAsyncView(LeituraPublicaAsyncView):
+    """Listagem pública (com ?search=, filtros e cursor) — GET /api/async/horarios-publicos/"""
+    acao = 'list'
+
+    async def responder(self, viewset, request):
+        if request.query_params.get('stream') in ('1', 'true'):
+            # Lista completa em streaming: continua pelo caminho síncrono
+            return await sync_to_async(_LISTAGEM_SINCRONA)(request._request)
+
+        queryset = await self._filtrar(viewset)
+
+        async def gerar_dados():
+            paginator = viewset.paginator
+            compilado = viewset.get_serializador_compilado()
+            if compilado is None:
+                pagina = await paginator.apaginate_queryset(queryset, request, viewset)
+                resultados = await sync_to_async(lambda: viewset.get_serializer(pagina, many=True).data)()
+            else:
+                linhas = viewset.get_linhas(queryset, compilado)
+                resultados = compilado.serializar(await paginator.apaginate_queryset(linhas, request, viewset))
+            return viewset.get_paginated_response(resultados).data
+
+        return await self._resposta_em_cache(viewset, request, queryset, gerar_dados)
+
+
+class HorarioPublicoDetalheAsyncView(LeituraPublicaAsyncView):
+    """Detalhe de um horário público — GET /api/async/horarios-publicos/<id>/"""
+    acao = 'retrieve'
+
+    async def responder(self, viewset, request, pk):
+        queryset = (await self._filtrar(viewset)).filter(pk=pk)
+
+        async def gerar_dados():
+            compilado = viewset.get_serializador_compilado()
+            if compilado is None:
+                objeto = await queryset.afirst()
+                if objeto is None:
+                    raise NotFound()
+                return await sync_to_async(lambda: viewset.get_serializer(objeto).data)()
+            linha = await queryset.values(*compilado.campos).afirst()
+            if linha is None:
+                raise NotFound()
+            return compilado.serializar_linha(linha)
+
+        return await self._resposta_em_cache(viewset, request, queryset, gerar_dados)
+
+
+class HorarioPublicoGradeAsyncView(LeituraPublicaAsyncView):
+    """Grade semanal materializada — GET /api/async/horarios-publicos/grade/?professor=|curso=|local="""
+    acao = 'grade'
+
+    async def responder(self, viewset, request):
+        pedidos = [(tipo, request.query_params[tipo]) for tipo in TIPOS_GRADE if request.query_params.get(tipo)]
+        if len(pedidos) != 1:
+            return _renderizar(
+                ApiResponse.error(message="Informe exatamente um dos parâmetros: professor, curso ou local.")
+            )
+        tipo, chave = pedidos[0]
+        try:
+            # Chaves conhecidas: em cache, com uma consulta quando a geração muda
+            chave = await sync_to_async(validar_chave)(tipo, chave)
+        except ChaveInvalida:
+            return _renderizar(ApiResponse.error(message="Informe o id numérico do professor."))
+        except GradeInexistente:
+            raise NotFound(f"Nenhum horário encontrado para {tipo} '{chave}'.")
+        dados = await aobter_grade(tipo, chave)
+        if viewset.pediu_compacto():
+            dados = compactar_grade(dados)
+        return _renderizar(Response({'tipo': tipo, 'chave': chave, **dados}))
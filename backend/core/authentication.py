@@ -0,0 +1,104 @@
+"""
+Autenticação JWT sem consultar o usuário no banco a cada requisição.
+
+O token de acesso leva, além do id, os dados que as views e permissões leem
+do usuário (tipo, nome, is_staff...) e a versão do cadastro no momento do
+login. Cada alteração ou exclusão do usuário incrementa a versão (sinais em
+core.signals), de modo que:
+
+1. token com a versão atual: o usuário é montado a partir do próprio token;
+2. token antigo (o usuário mudou depois do login): os dados vêm de um cache
+   curto, indexado pela versão atual;
+3. sem cache: uma consulta ao banco, como no JWTAuthentication padrão.
+
+A verificação da versão é uma leitura de cache. O usuário montado só tem os
+campos abaixo carregados; qualquer outro (email, date_joined...) é buscado no
+banco se for acessado, como um campo adiado do only().
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import escopo, obter_geracoes
+from .models import CustomUser
+
+PREFIXO_USUARIO = 'agenda:usuario:'
+
+# Campos do usuário levados no token e no cache
+CAMPOS_USUARIO = ('id', 'username', 'first_name', 'last_name', 'tipo', 'is_active', 'is_staff', 'is_superuser')
+
+CLAIM_VERSAO = 'versao'
+
+
+def versao_do_usuario(usuario_id):
+    nome = escopo('usuario', usuario_id)
+    return obter_geracoes([nome])[nome]
+
+
+def _chave_usuario(usuario_id, versao):
+    return f'{PREFIXO_USUARIO}{usuario_id}:{versao}'
+
+
+def _montar_usuario(dados):
+    # from_db: os campos que não vieram ficam adiados (carregados sob demanda);
+    # os valores vão na ordem dos campos do modelo
+    campos = [campo.attname for campo in CustomUser._meta.concrete_fields if campo.attname in dados]
+    return CustomUser.from_db('default', campos, [dados[campo] for campo in campos])
+
+
+def dados_do_usuario(usuario):
+    return {campo: getattr(usuario, campo) for campo in CAMPOS_USUARIO}
+
+
+class TokenComDadosSerializer(TokenObtainPairSerializer):
+    """Login: inclui no token os dados do usuário e a versão do cadastro."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for campo, valor in dados_do_usuario(user).items():
+            if campo != 'id':
+                token[campo] = valor
+        # Nome exibido, para o frontend não precisar de /api/users/me/
+        token['nome'] = f"{user.first_name} {user.last_name}".strip() or user.username
+        token[CLAIM_VERSAO] = versao_do_usuario(user.pk)
+        return token
+
+
+class JWTComCacheAuthentication(JWTAuthentication):
+    """JWTAuthentication que resolve o usuário pelo token ou pelo cache (ver o módulo)."""
+
+    def get_user(self, validated_token):
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        versao = versao_do_usuario(usuario_id)
+        if validated_token.get(CLAIM_VERSAO) == versao and all(
+            campo in validated_token for campo in CAMPOS_USUARIO if campo != 'id'
+        ):
+            dados = {campo: validated_token[campo] for campo in CAMPOS_USUARIO if campo != 'id'}
+            dados['id'] = usuario_id
+        else:
+            dados = self._dados_em_cache(usuario_id, versao)
+
+        if not dados['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return _montar_usuario(dados)
+
+    def _dados_em_cache(self, usuario_id, versao):
+        chave = _chave_usuario(usuario_id, versao)
+        dados = cache.get(chave)
+        if dados is None:
+            try:
+                usuario = CustomUser.objects.only(*CAMPOS_USUARIO).get(pk=usuario_id)
+            except CustomUser.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            dados = dados_do_usuario(usuario)
+            cache.set(chave, dados, getattr(settings, 'AGENDA_USUARIO_CACHE_TIMEOUT', 300))
+        return dados
@@ -0,0 +1,153 @@
+from datetime import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import escopo, montar_chave, obter_geracoes
+from .models import Horario
+
+PREFIXO_OCUPACAO = 'agenda:ocupacao:'
+
+# Resolução do mapa de ocupação: um bit por fatia de 5 minutos do dia
+RESOLUCAO_MINUTOS = 5
+FATIAS_POR_DIA = 24 * 60 // RESOLUCAO_MINUTOS
+
+# Recursos que não podem ter dois horários ao mesmo tempo -> campo em Horario
+CAMPOS_RECURSO = {
+    'local': 'local',
+    'professor': 'professor_monitor_id',
+}
+
+
+def _minutos(valor):
+    return valor.hour * 60 + valor.minute + (1 if valor.second or valor.microsecond else 0)
+
+
+def _hora(fatia):
+    minutos = fatia * RESOLUCAO_MINUTOS
+    if minutos >= 24 * 60:
+        return '24:00'
+    return f'{minutos // 60:02d}:{minutos % 60:02d}'
+
+
+def mesclar_intervalos(intervalos):
+    """
+    Une intervalos (inicio, fim) em minutos que se sobrepõem ou se tocam.
+    A entrada deve estar ordenada pelo início (como vem da consulta).
+    """
+    mesclados = []
+    for inicio, fim in intervalos:
+        if mesclados and inicio <= mesclados[-1][1]:
+            if fim > mesclados[-1][1]:
+                mesclados[-1][1] = fim
+        else:
+            mesclados.append([inicio, fim])
+    return mesclados
+
+
+def mapa_de_ocupacao(intervalos):
+    """
+    Bitmap (int) das fatias de 5 minutos ocupadas. O arredondamento é sempre
+    para fora (08:03-08:58 ocupa 08:00-09:00), então uma fatia livre no mapa
+    nunca gera conflito ao criar um horário.
+    """
+    mapa = 0
+    for inicio, fim in mesclar_intervalos(intervalos):
+        primeira = inicio // RESOLUCAO_MINUTOS
+        ultima = -(-fim // RESOLUCAO_MINUTOS)  # arredonda para cima
+        mapa |= ((1 << (ultima - primeira)) - 1) << primeira
+    return mapa
+
+
+def intervalos_livres(livre, fatias_minimas):
+    """Sequências de bits 1 do mapa com pelo menos `fatias_minimas` fatias, como (inicio, fim)."""
+    resultado = []
+    while livre:
+        inicio = (livre & -livre).bit_length() - 1
+        deslocado = livre >> inicio
+        # Quantidade de bits 1 seguidos a partir de `inicio`
+        comprimento = (~deslocado & (deslocado + 1)).bit_length() - 1
+        if comprimento >= fatias_minimas:
+            resultado.append((_hora(inicio), _hora(inicio + comprimento)))
+        livre &= ~(((1 << comprimento) - 1) << inicio)
+    return resultado
+
+
+def obter_ocupacao(tipo, chaves):
+    """
+    Mapas de ocupação dos 7 dias de cada recurso: {chave: [mapa_dia_0, ...]}.
+
+    Ficam em cache sob a geração do escopo do recurso ('local:Sala 101',
+    'professor:3'), incrementada pelos sinais a cada alteração de horário.
+    Os recursos fora do cache são calculados juntos a partir de uma única
+    consulta ordenada. Como a validação de conflitos, considera também os
+    horários inativos.
+    """
+    chaves = list(dict.fromkeys(str(chave) for chave in chaves))
+    escopos = {chave: escopo(tipo, chave) for chave in chaves}
+    geracoes = obter_geracoes(list(escopos.values()))
+    chaves_cache = {
+        chave: montar_chave(PREFIXO_OCUPACAO, f'{escopos[chave]}|{geracoes[escopos[chave]]}') for chave in chaves
+    }
+    encontrados = cache.get_many(list(chaves_cache.values()))
+    ocupacao = {
+        chave: encontrados[chave_cache] for chave, chave_cache in chaves_cache.items() if chave_cache in encontrados
+    }
+
+    faltando = [chave for chave in chaves if chave not in ocupacao]
+    if faltando:
+        campo = CAMPOS_RECURSO[tipo]
+        linhas = (
+            Horario.objects.filter(**{f'{campo}__in': faltando})
+            .order_by(campo, 'dia_semana', 'hora_inicio')
+            .values_list(campo, 'dia_semana', 'hora_inicio', 'hora_fim')
+        )
+        intervalos = {chave: [[] for _ in range(7)] for chave in faltando}
+        for recurso, dia, inicio, fim in linhas:
+            intervalos[str(recurso)][int(dia)].append((_minutos(inicio), _minutos(fim)))
+
+        novos = {chave: [mapa_de_ocupacao(dia) for dia in intervalos[chave]] for chave in faltando}
+        cache.set_many(
+            {chaves_cache[chave]: mapas for chave, mapas in novos.items()},
+            getattr(settings, 'AGENDA_CACHE_TIMEOUT', 60 * 60 * 6),
+        )
+        ocupacao.update(novos)
+    return ocupacao
+
+
+def _mascara_janela(inicio, fim):
+    primeira = -(-_minutos(inicio) // RESOLUCAO_MINUTOS)
+    ultima = _minutos(fim) // RESOLUCAO_MINUTOS if fim != time(0) else FATIAS_POR_DIA
+    if ultima <= primeira:
+        return 0
+    return ((1 << (ultima - primeira)) - 1) << primeira
+
+
+def buscar_disponibilidade(dia_semana, duracao, locais=(), professores=(), inicio=None, fim=None):
+    """
+    Intervalos livres de cada sala e de cada professor/monitor no dia, dentro
+    da janela [inicio, fim), com pelo menos `duracao` minutos. Com mais de um
+    recurso, `em_comum` traz os intervalos em que todos estão livres (um AND
+    dos mapas) - ex.: sala e professor ao mesmo tempo.
+    """
+    inicio = inicio or getattr(settings, 'AGENDA_DISPONIBILIDADE_INICIO', time(7, 0))
+    fim = fim or getattr(settings, 'AGENDA_DISPONIBILIDADE_FIM', time(22, 0))
+    janela = _mascara_janela(inicio, fim)
+    fatias_minimas = max(1, -(-duracao // RESOLUCAO_MINUTOS))
+    dia = int(dia_semana)
+
+    resultado = {}
+    livres_em_comum = janela
+    for tipo, chaves, nome in (('local', locais, 'locais'), ('professor', professores, 'professores')):
+        if not chaves:
+            continue
+        ocupacao = obter_ocupacao(tipo, chaves)
+        resultado[nome] = {}
+        for chave in chaves:
+            livre = janela & ~ocupacao[str(chave)][dia]
+            livres_em_comum &= livre
+            resultado[nome][str(chave)] = intervalos_livres(livre, fatias_minimas)
+
+    if len(locais) + len(professores) > 1:
+        resultado['em_comum'] = intervalos_livres(livres_em_comum, fatias_minimas)
+    return resultado
@@ -0,0 +1,155 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+PREFIXO_GERACAO = 'agenda:geracao:'
+PREFIXO_ALTERACAO = 'agenda:alterado-em:'
+# v2: entradas com o corpo e os totais do validador ({'dados', 'totais'})
+PREFIXO_RESPOSTA = 'agenda:resposta:v2:'
+
+ESCOPO_GLOBAL = 'global'
+
+
+def montar_chave(prefixo, texto):
+    """Chave de cache `prefixo` + md5(texto), para entradas derivadas de texto livre."""
+    # Hash para que a chave seja válida em qualquer backend (sem espaços/acentos)
+    return prefixo + hashlib.md5(texto.encode('utf-8')).hexdigest()
+
+
+def _geracao_inicial():
+    # Baseada no relógio: se o contador for perdido (expulso do cache, reinício
+    # do servidor) o novo valor nunca coincide com uma geração antiga.
+    return time.time_ns() // 1000
+
+
+def escopo(tipo, valor=None):
+    """Monta o nome de um escopo de invalidação, ex: escopo('dia', 'Segunda-feira')."""
+    return tipo if valor is None else f'{tipo}:{valor}'
+
+
+def obter_geracoes(escopos):
+    """
+    Retorna {escopo: geração} para cada escopo, criando os contadores que ainda
+    não existirem. Uma única ida ao cache no caso comum.
+    """
+    chaves = {montar_chave(PREFIXO_GERACAO, nome): nome for nome in escopos}
+    encontrados = cache.get_many(list(chaves))
+    geracoes = {chaves[chave]: valor for chave, valor in encontrados.items()}
+    for chave, nome in chaves.items():
+        if nome not in geracoes:
+            cache.add(chave, _geracao_inicial(), timeout=None)
+            geracoes[nome] = cache.get(chave)
+    return geracoes
+
+
+def incrementar_geracao(*escopos):
+    """Invalida tudo o que foi guardado sob os escopos informados."""
+    agora = int(time.time())
+    for nome in set(escopos):
+        chave = montar_chave(PREFIXO_GERACAO, nome)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            # Contador inexistente: qualquer valor novo já invalida as entradas antigas
+            cache.set(chave, _geracao_inicial(), timeout=None)
+    cache.set_many({montar_chave(PREFIXO_ALTERACAO, nome): agora for nome in set(escopos)}, timeout=None)
+
+
+def ultima_alteracao(escopos):
+    """
+    Instante (timestamp Unix) da alteração mais recente entre os escopos.
+    Inclui o que não deixa rastro nas linhas consultadas, como exclusões e
+    mudanças em tabelas relacionadas. Se o registro tiver sido perdido, assume
+    o instante atual (resposta considerada modificada).
+    """
+    chaves = {montar_chave(PREFIXO_ALTERACAO, nome) for nome in escopos}
+    encontrados = cache.get_many(list(chaves))
+    agora = int(time.time())
+    for chave in chaves - set(encontrados):
+        cache.add(chave, agora, timeout=None)
+        encontrados[chave] = cache.get(chave, agora)
+    return max(encontrados.values(), default=0)
+
+
+def escopos_do_horario(dia_semana, curso, professor_id, local, disciplina_id=None):
+    """Escopos afetados por uma alteração em um horário."""
+    return [
+        ESCOPO_GLOBAL,
+        escopo('dia', dia_semana),
+        escopo('curso', curso),
+        escopo('disciplina', disciplina_id),
+        escopo('professor', professor_id),
+        escopo('local', local),
+    ]
+
+
+class CacheGeracionalMixin:
+    """
+    Cache de respostas de leitura versionado por contadores de geração.
+
+    A chave de cada resposta inclui a geração atual dos escopos de que ela
+    depende (ver get_escopos_cache). Quando um horário/disciplina é alterado,
+    os sinais em core.signals incrementam as gerações afetadas e as entradas
+    antigas deixam de ser encontradas (e expiram sozinhas pelo TTL). Assim o
+    TTL pode ser longo sem que as edições demorem a aparecer.
+
+    Funciona com qualquer backend de cache do Django; com mais de um processo
+    é preciso um backend compartilhado (arquivo, Redis, Memcached).
+    """
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'AGENDA_CACHE_TIMEOUT', 60 * 60 * 6)
+
+    def get_escopos_cache(self, request):
+        """Escopos dos quais a resposta depende. Por padrão, qualquer alteração."""
+        return [ESCOPO_GLOBAL]
+
+    def get_chave_cache(self, request):
+        escopos = sorted(self.get_escopos_cache(request))
+        geracoes = obter_geracoes(escopos)
+        assinatura = '|'.join([
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+            *(f'{nome}={geracoes[nome]}' for nome in escopos),
+        ])
+        return montar_chave(PREFIXO_RESPOSTA, assinatura)
+
+    def entrada_em_cache(self, request):
+        """
+        (chave, entrada) da resposta da requisição, com a entrada None quando
+        não está em cache. Lida uma vez por requisição: o GET condicional
+        (core.conditional) usa a mesma entrada.
+        """
+        if getattr(self, '_entrada_cache', None) is None:
+            chave = self.get_chave_cache(request)
+            self._entrada_cache = (chave, cache.get(chave))
+        return self._entrada_cache
+
+    def guardar_em_cache(self, chave, dados):
+        # Os totais do validador (ConditionalGetMixin) vão junto do corpo, para
+        # que uma resposta em cache seja validada sem consultar o banco
+        entrada = {'dados': dados, 'totais': getattr(self, 'totais_validacao', None)}
+        cache.set(chave, entrada, self.get_cache_timeout())
+
+    def resposta_em_cache(self, request, gerar_resposta):
+        chave, entrada = self.entrada_em_cache(request)
+        if entrada is not None:
+            return Response(entrada['dados'])
+
+        response = gerar_resposta()
+        if response.status_code == status.HTTP_200_OK:
+            self.guardar_em_cache(chave, response.data)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.resposta_em_cache(request, lambda: super(CacheGeracionalMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.resposta_em_cache(request, lambda: super(CacheGeracionalMixin, self).retrieve(request, *args, **kwargs))
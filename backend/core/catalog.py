@@ -0,0 +1,193 @@
+"""
+Catálogo de disciplinas em cache, em dois níveis.
+
+O catálogo é pequeno e muda pouco, mas é lido o tempo todo: a listagem de
+disciplinas (carregada pelos formulários de horário do frontend), o filtro
+?disciplina= dos horários e a disciplina informada ao criar, editar ou
+importar horários. Essas leituras passam por aqui:
+
+- L1: as disciplinas indexadas por id e por código, na memória do processo
+  (LRU pelas versões mais recentes);
+- L2: as mesmas linhas no cache compartilhado, para que cada processo não
+  precise ir ao banco.
+
+A versão é a geração do escopo 'disciplinas' (core.cache), incrementada pelos
+sinais a cada disciplina criada, alterada ou excluída. Ler a versão é a única
+ida ao cache compartilhado de uma leitura comum; o banco só é consultado
+quando a versão muda.
+
+As funções devolvem instâncias novas a cada chamada, que podem ser alteradas
+sem afetar o catálogo.
+"""
+from functools import cached_property, lru_cache
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from rest_framework import filters
+
+from .cache import escopo, obter_geracoes
+from .models import Disciplina
+from .routers import usar_principal
+
+PREFIXO_CATALOGO = 'agenda:catalogo:disciplinas:'
+ESCOPO_CATALOGO = escopo('disciplinas')
+
+# Versões do catálogo mantidas na memória de cada processo
+VERSOES_EM_MEMORIA = 4
+
+CAMPOS = tuple(campo.attname for campo in Disciplina._meta.concrete_fields)
+
+
+def versao_catalogo():
+    return obter_geracoes([ESCOPO_CATALOGO])[ESCOPO_CATALOGO]
+
+
+def _linhas_do_banco():
+    # Sempre do principal: uma réplica atrasada deixaria o catálogo antigo sob a versão nova
+    with usar_principal():
+        return list(Disciplina.objects.order_by('pk').values_list(*CAMPOS))
+
+
+def _instancia(linha):
+    return Disciplina.from_db('default', CAMPOS, linha)
+
+
+class IndiceCatalogo:
+    """Linhas de uma versão do catálogo, indexadas por id e por código."""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        pk, codigo = CAMPOS.index(Disciplina._meta.pk.attname), CAMPOS.index('codigo')
+        self.por_pk = {linha[pk]: linha for linha in linhas}
+        self.por_codigo = {linha[codigo]: linha for linha in linhas}
+
+    def disciplinas(self):
+        return [_instancia(linha) for linha in self.linhas]
+
+    @cached_property
+    def cursos(self):
+        coluna = CAMPOS.index('curso')
+        return frozenset(linha[coluna] for linha in self.linhas)
+
+    def disciplina_por_pk(self, pk):
+        linha = self.por_pk.get(pk)
+        return _instancia(linha) if linha is not None else None
+
+    def disciplina_por_referencia(self, referencia):
+        linha = self.por_codigo.get(referencia)
+        if linha is None and str(referencia).isdigit():
+            linha = self.por_pk.get(int(referencia))
+        return _instancia(linha) if linha is not None else None
+
+
+@lru_cache(maxsize=VERSOES_EM_MEMORIA)
+def _indice(versao):
+    chave = f'{PREFIXO_CATALOGO}{versao}'
+    linhas = cache.get(chave)
+    if linhas is None:
+        linhas = _linhas_do_banco()
+        cache.set(chave, linhas, getattr(settings, 'AGENDA_CACHE_TIMEOUT', 60 * 60 * 6))
+    return IndiceCatalogo(linhas)
+
+
+def indice_atual():
+    """O catálogo na versão atual; para várias consultas seguidas, uma leitura só da versão."""
+    return _indice(versao_catalogo())
+
+
+def disciplinas():
+    """Todas as disciplinas, em ordem de id."""
+    return indice_atual().disciplinas()
+
+
+def disciplina_por_pk(pk):
+    """A disciplina com o id `pk` (inteiro), ou None."""
+    return indice_atual().disciplina_por_pk(pk)
+
+
+def disciplina_por_referencia(referencia):
+    """A disciplina com o código `referencia` ou, se não houver, com esse id; ou None."""
+    return indice_atual().disciplina_por_referencia(referencia)
+
+
+class CatalogoDisciplinasMixin:
+    """
+    Listagem e detalhe de disciplinas servidos pelo catálogo em cache. Os
+    filtros ?ativo=, ?semestre= e ?curso=, a busca (?search=) e a ordenação
+    (?ordering=) são aplicados em memória, com a semântica dos filtros do
+    banco; as demais ações usam o queryset normalmente.
+    """
+
+    def filtrar_catalogo(self, itens):
+        parametros = self.request.query_params
+
+        ativo = parametros.get('ativo')
+        if ativo is not None:
+            ativo = ativo.lower() == 'true'
+            itens = [disciplina for disciplina in itens if disciplina.ativo == ativo]
+
+        semestre = parametros.get('semestre')
+        if semestre is not None:
+            try:
+                semestre = int(semestre)
+            except ValueError:
+                pass
+            else:
+                itens = [disciplina for disciplina in itens if disciplina.semestre == semestre]
+
+        curso = parametros.get('curso')
+        if curso is not None:
+            curso = curso.lower()
+            itens = [disciplina for disciplina in itens if curso in disciplina.curso.lower()]
+
+        # Como o SearchFilter: cada termo precisa aparecer em algum dos search_fields
+        termos = [termo.lower() for termo in filters.SearchFilter().get_search_terms(self.request)]
+        if termos:
+            itens = [
+                disciplina for disciplina in itens
+                if all(
+                    any(termo in str(getattr(disciplina, campo)).lower() for campo in self.search_fields)
+                    for termo in termos
+                )
+            ]
+
+        ordenacao = filters.OrderingFilter().get_ordering(self.request, Disciplina.objects.none(), self)
+        # Ordenações estáveis do último critério para o primeiro
+        for campo in reversed(ordenacao or []):
+            itens = sorted(itens, key=attrgetter(campo.lstrip('-')), reverse=campo.startswith('-'))
+        return itens
+
+    def filter_queryset(self, queryset):
+        if self.action == 'list':
+            return self.filtrar_catalogo(disciplinas())
+        return super().filter_queryset(queryset)
+
+    def get_object(self):
+        if self.action != 'retrieve':
+            return super().get_object()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            disciplina = disciplina_por_pk(int(self.kwargs[lookup_url_kwarg]))
+        except (TypeError, ValueError):
+            disciplina = None
+        if disciplina is None:
+            raise Http404
+        self.check_object_permissions(self.request, disciplina)
+        return disciplina
+
+    def get_validadores(self, request):
+        """Validadores do GET condicional a partir do catálogo, sem a consulta agregada."""
+        if self.action == 'list':
+            itens = self.filter_queryset(None)
+        else:
+            try:
+                itens = [self.get_object()]
+            except Http404:
+                itens = []
+        totais = {
+            'ultima': max((disciplina.ultima_atualizacao for disciplina in itens), default=None),
+            'total': len(itens),
+        }
+        return self.validadores_dos_totais(request, totais)
@@ -0,0 +1,136 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import obter_geracoes, ultima_alteracao
+
+
+class ConditionalGetMixin:
+    """
+    Suporte a GET condicional (ETag / Last-Modified) nas ações de leitura.
+
+    Antes de qualquer serialização, calcula um validador barato do queryset
+    filtrado da requisição: Max(ultima_atualizacao) e Count(pk) em uma única
+    consulta agregada, combinados com as gerações de cache dos escopos da view
+    (que capturam exclusões e alterações em tabelas relacionadas, como o nome
+    da disciplina ou do professor). Se o cliente já tem essa versão
+    (If-None-Match / If-Modified-Since), responde 304 sem corpo.
+
+    Com o cache de respostas (core.cache), os totais ficam guardados junto do
+    corpo: uma leitura em cache, com ou sem 304, não consulta o banco.
+    """
+    campo_ultima_atualizacao = 'ultima_atualizacao'
+    conditional_actions = ('list', 'retrieve')
+    totais_validacao = None
+
+    def get_escopos_validacao(self, request):
+        """Escopos de geração que compõem o validador (ver core.cache)."""
+        if hasattr(self, 'get_escopos_cache'):
+            return self.get_escopos_cache(request)
+        return []
+
+    def get_queryset_validacao(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            try:
+                queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            except (ValueError, TypeError, ValidationError):
+                # Como o get_object_or_404 do DRF: um id malformado ('abc') é um 404
+                raise Http404
+        return queryset.order_by()
+
+    def get_agregados_validacao(self):
+        return {'ultima': Max(self.campo_ultima_atualizacao), 'total': Count('pk')}
+
+    def get_totais_validacao(self, request):
+        """
+        Resultado de get_agregados_validacao. Com o cache de respostas
+        (CacheGeracionalMixin), uma resposta em cache traz os totais calculados
+        junto com ela, e a validação não consulta o banco.
+        """
+        if hasattr(self, 'entrada_em_cache'):
+            entrada = self.entrada_em_cache(request)[1]
+            if entrada is not None and entrada['totais'] is not None:
+                return entrada['totais']
+        return self.get_queryset_validacao().aggregate(**self.get_agregados_validacao())
+
+    def get_validadores(self, request):
+        """Retorna (etag, last_modified) ou (None, None) quando não há o que validar."""
+        self.totais_validacao = self.get_totais_validacao(request)
+        return self.validadores_dos_totais(request, self.totais_validacao)
+
+    def validadores_dos_totais(self, request, totais):
+        """(etag, last_modified) a partir do resultado de get_agregados_validacao."""
+        if not totais['total']:
+            return None, None
+
+        escopos = sorted(self.get_escopos_validacao(request))
+        geracoes = obter_geracoes(escopos) if escopos else {}
+        usuario = request.user.pk if request.user.is_authenticated else ''
+        assinatura = '|'.join([
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            str(usuario),
+            totais['ultima'].isoformat(),
+            str(totais['total']),
+            *(f'{nome}={geracoes[nome]}' for nome in escopos),
+        ])
+        # ETag fraca: o corpo contém textos relativos ("5 minuto(s) atrás")
+        etag = 'W/' + quote_etag(hashlib.md5(assinatura.encode('utf-8')).hexdigest())
+        last_modified = int(totais['ultima'].timestamp())
+        if escopos:
+            last_modified = max(last_modified, ultima_alteracao(escopos))
+        return etag, last_modified
+
+    def _resposta_condicional(self, request, gerar_resposta):
+        if self.action not in self.conditional_actions:
+            return gerar_resposta()
+
+        etag, last_modified = self.get_validadores(request)
+        if etag is None:
+            return gerar_resposta()
+
+        condicional, cabecalhos = self.verificar_condicional(request, etag, last_modified)
+        if condicional is not None:
+            return condicional
+        return self.aplicar_validadores(gerar_resposta(), cabecalhos)
+
+    def verificar_condicional(self, request, etag, last_modified):
+        """
+        Retorna (resposta, cabecalhos): a resposta 304/412 quando o cliente já
+        tem a versão atual (senão None) e os cabeçalhos de validação a copiar
+        para a resposta completa (ver aplicar_validadores).
+        """
+        cabecalhos = HttpResponse()
+        cabecalhos['ETag'] = etag
+        cabecalhos['Last-Modified'] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_vary_headers(cabecalhos, ['Authorization'])
+
+        condicional = get_conditional_response(
+            request, etag=etag, last_modified=last_modified, response=cabecalhos
+        )
+        return (None if condicional is cabecalhos else condicional), cabecalhos
+
+    def aplicar_validadores(self, response, cabecalhos):
+        if response.status_code == 200:
+            response['ETag'] = cabecalhos['ETag']
+            response['Last-Modified'] = cabecalhos['Last-Modified']
+            if cabecalhos.has_header('Vary'):
+                patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._resposta_condicional(
+            request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._resposta_condicional(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
@@ -0,0 +1,94 @@
+from collections import defaultdict, namedtuple
+
+from django.db.models import Count, Q
+
+from .models import Horario
+
+
+Conflitos = namedtuple('Conflitos', ['professor', 'local'])
+Conflitos.__doc__ = "Resultado da verificação: True em cada campo que possui conflito."
+
+Sobreposicao = namedtuple('Sobreposicao', ['recurso', 'dia_semana', 'anterior', 'atual'])
+Sobreposicao.__doc__ = "Par de intervalos sobrepostos encontrado pela varredura em memória."
+
+
+def verificar_conflitos(professor, local, dia_semana, hora_inicio, hora_fim, exclude_id=None):
+    """
+    Verifica, em uma única consulta, se o intervalo colide com outro horário
+    do mesmo professor/monitor ou com outro horário na mesma sala.
+
+    A consulta é um OR entre os dois recursos sobre o mesmo dia e intervalo, o
+    que permite ao banco resolver cada ramo pelos índices compostos
+    (professor_monitor, dia_semana, hora_inicio, hora_fim) e
+    (local, dia_semana, hora_inicio, hora_fim).
+
+    Args:
+        professor: Instância (ou id) do professor/monitor
+        local: Sala/local do horário (None para ignorar a verificação de sala)
+        dia_semana: Dia da semana do horário
+        hora_inicio: Hora de início
+        hora_fim: Hora de fim
+        exclude_id: ID de um horário a ser ignorado (útil para edição)
+
+    Retorna:
+        Conflitos(professor=bool, local=bool)
+    """
+    por_professor = Q(professor_monitor=professor)
+    contagens = {'professor': Count('pk', filter=por_professor)}
+    recursos = por_professor
+    if local:
+        por_local = Q(local=local)
+        contagens['local'] = Count('pk', filter=por_local)
+        recursos |= por_local
+
+    queryset = Horario.objects.filter(
+        recursos,
+        dia_semana=dia_semana,
+        hora_inicio__lt=hora_fim,
+        hora_fim__gt=hora_inicio,
+    )
+    if exclude_id:
+        queryset = queryset.exclude(pk=exclude_id)
+
+    totais = queryset.aggregate(**contagens)
+    return Conflitos(professor=bool(totais['professor']), local=bool(totais.get('local')))
+
+
+class VerificadorEmLote:
+    """
+    Detector de sobreposições em memória para grandes lotes de horários.
+
+    Os intervalos são agrupados por (recurso, dia_semana) e cada grupo é
+    percorrido uma única vez após ordenação pelo início (sweep-line), mantendo
+    o intervalo ativo que termina mais tarde. Custo O(n log n) por lote, sem
+    nenhuma consulta ao banco.
+
+    Uso:
+        verificador = VerificadorEmLote()
+        verificador.adicionar(('local', 'Sala 101'), 'Segunda-feira', inicio, fim, ref=0)
+        ...
+        for sobreposicao in verificador.sobreposicoes():
+            ...
+    """
+
+    def __init__(self):
+        self._grupos = defaultdict(list)
+
+    def adicionar(self, recurso, dia_semana, hora_inicio, hora_fim, ref):
+        """
+        Registra um intervalo. `recurso` identifica o que não pode ser usado em
+        paralelo (ex: ('local', 'Sala 101') ou ('professor', 7)); `ref` é
+        devolvido nas sobreposições para identificar a origem do intervalo.
+        """
+        self._grupos[(recurso, dia_semana)].append((hora_inicio, hora_fim, ref))
+
+    def sobreposicoes(self):
+        """Gera uma Sobreposicao para cada intervalo que colide com um anterior."""
+        for (recurso, dia_semana), intervalos in self._grupos.items():
+            intervalos.sort(key=lambda intervalo: intervalo[0])
+            fim_ativo, ref_ativo = None, None
+            for inicio, fim, ref in intervalos:
+                if fim_ativo is not None and inicio < fim_ativo:
+                    yield Sobreposicao(recurso, dia_semana, ref_ativo, ref)
+                if fim_ativo is None or fim > fim_ativo:
+                    fim_ativo, ref_ativo = fim, ref
@@ -0,0 +1,270 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .streaming import codificar_json
+
+PREFIXO_EVENTOS = 'agenda:eventos:'
+
+# Escopos (core.cache) pelos quais um assinante pode filtrar os eventos
+TIPOS_FILTRO = ('curso', 'professor', 'local', 'disciplina')
+
+
+def _hora(valor):
+    return valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+
+
+def evento_do_horario(tipo, horario, escopos):
+    """
+    Evento de alteração de um horário ('criado', 'atualizado' ou 'removido').
+    `escopos` são os escopos de cache afetados (valores atuais e anteriores),
+    usados para filtrar os assinantes: um horário que muda de sala aparece
+    para quem acompanha a sala antiga e a nova.
+    """
+    return {
+        'tipo': tipo,
+        'horario': {
+            'id': horario.pk,
+            'dia_semana': horario.dia_semana.label,
+            'hora_inicio': _hora(horario.hora_inicio),
+            'hora_fim': _hora(horario.hora_fim),
+            'local': horario.local,
+            'professor_monitor': horario.professor_monitor_id,
+            'disciplina': horario.disciplina_id,
+            'ativo': horario.ativo,
+        },
+        'escopos': sorted(nome for nome in escopos if nome.split(':', 1)[0] in TIPOS_FILTRO),
+    }
+
+
+def evento_atende(evento, filtros):
+    """O evento interessa a um assinante com `filtros` (escopos exigidos, ex: {'curso:Engenharia'})."""
+    return set(filtros) <= set(evento['escopos'])
+
+
+class _Assinante:
+    """Fila de um assinante, alimentada a partir de qualquer thread."""
+
+    def __init__(self, loop, tamanho):
+        self.loop = loop
+        self.fila = asyncio.Queue(maxsize=tamanho)
+
+    def entregar(self, evento):
+        try:
+            self.loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:
+            pass  # loop encerrado: a conexão já terminou
+
+    def _colocar(self, evento):
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento demais: encerra a conexão (None); ao reconectar com
+            # Last-Event-ID ele recebe o que perdeu a partir do histórico
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(None)
+
+
+class TransmissorLocal:
+    """
+    Distribui os eventos aos assinantes do próprio processo, sem
+    intermediários. Os sinais publicam a partir da thread da requisição;
+    cada assinante recebe no seu event loop. Guarda os últimos eventos para
+    que um cliente reconectado (Last-Event-ID) recupere o que perdeu.
+
+    A sequência e o histórico são do processo: serve só a um servidor de
+    processo único. Com vários workers, um evento publicado em outro
+    processo não chega aqui, e um Last-Event-ID de outro processo não vale
+    nesta sequência (use TransmissorCache).
+    """
+
+    def __init__(self, historico=1000, tamanho_fila=256):
+        self._trava = threading.Lock()
+        self._assinantes = set()
+        self._historico = deque(maxlen=historico)
+        self._sequencia = 0
+        self.tamanho_fila = tamanho_fila
+
+    def publicar(self, evento):
+        with self._trava:
+            self._sequencia += 1
+            evento = {**evento, 'id': self._sequencia}
+            self._historico.append(evento)
+            assinantes = list(self._assinantes)
+        for assinante in assinantes:
+            assinante.entregar(evento)
+        return evento
+
+    def recentes(self, desde=None):
+        """(eventos do histórico posteriores ao id `desde`, id do último evento publicado), sem esperar."""
+        with self._trava:
+            if desde is None or desde > self._sequencia:
+                return [], self._sequencia
+            return [evento for evento in self._historico if evento['id'] > desde], self._sequencia
+
+    async def assinar(self, desde=None, espera=15):
+        """
+        Gera os eventos publicados a partir de agora (ou posteriores ao id
+        `desde`). Gera None após `espera` segundos sem eventos, para que a
+        conexão possa enviar um heartbeat; termina se o assinante ficar para trás.
+        """
+        assinante = _Assinante(asyncio.get_running_loop(), self.tamanho_fila)
+        with self._trava:
+            self._assinantes.add(assinante)
+            if desde is not None and desde > self._sequencia:
+                desde = self._sequencia  # id de antes de um reinício do processo
+            pendentes = [evento for evento in self._historico if desde is not None and evento['id'] > desde]
+            ultimo = self._sequencia if desde is None else desde
+        try:
+            for evento in pendentes:
+                ultimo = evento['id']
+                yield evento
+            while True:
+                try:
+                    evento = await asyncio.wait_for(assinante.fila.get(), espera)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if evento is None:
+                    return
+                if evento['id'] > ultimo:
+                    ultimo = evento['id']
+                    yield evento
+        finally:
+            with self._trava:
+                self._assinantes.discard(assinante)
+
+
+class TransmissorCache:
+    """
+    Substituto local de um broker: os eventos ficam no cache do Django, sob
+    uma sequência crescente, e cada assinante consulta o cache periodicamente.
+    Com um cache compartilhado (Redis, memcached) os eventos publicados por
+    um processo chegam às conexões abertas em todos os outros.
+    """
+    CHAVE_SEQUENCIA = PREFIXO_EVENTOS + 'sequencia'
+
+    def __init__(self, historico=1000, intervalo=0.5, validade=60 * 10):
+        self.historico = historico
+        self.intervalo = intervalo
+        self.validade = validade
+
+    def _chave_evento(self, numero):
+        return f'{PREFIXO_EVENTOS}{numero}'
+
+    def publicar(self, evento):
+        cache.add(self.CHAVE_SEQUENCIA, 0, timeout=None)
+        numero = cache.incr(self.CHAVE_SEQUENCIA)
+        evento = {**evento, 'id': numero}
+        cache.set(self._chave_evento(numero), evento, self.validade)
+        return evento
+
+    def recentes(self, desde=None):
+        atual = cache.get(self.CHAVE_SEQUENCIA, 0)
+        if desde is None or desde >= atual:
+            return [], atual
+        numeros = range(max(desde, atual - self.historico) + 1, atual + 1)
+        encontrados = cache.get_many([self._chave_evento(numero) for numero in numeros])
+        eventos = [encontrados[chave] for chave in map(self._chave_evento, numeros) if chave in encontrados]
+        # Números do fim ainda sem evento podem estar sendo gravados: ficam para a próxima consulta
+        ultimo = eventos[-1]['id'] if eventos else desde
+        return eventos, ultimo
+
+    async def assinar(self, desde=None, espera=15):
+        atual = await cache.aget(self.CHAVE_SEQUENCIA, 0)
+        ultimo = atual if desde is None else max(desde, atual - self.historico)
+        ocioso_desde = time.monotonic()
+        atrasado = None
+        while True:
+            atual = await cache.aget(self.CHAVE_SEQUENCIA, 0)
+            if atual < ultimo:
+                ultimo = atual  # sequência perdida (cache reiniciado)
+            if atual > ultimo:
+                numeros = range(ultimo + 1, atual + 1)
+                encontrados = await cache.aget_many([self._chave_evento(numero) for numero in numeros])
+                for numero in numeros:
+                    evento = encontrados.get(self._chave_evento(numero))
+                    if evento is None and atrasado != numero:
+                        # Sequência já incrementada, evento ainda não gravado:
+                        # espera mais uma rodada antes de considerá-lo perdido
+                        atrasado = numero
+                        break
+                    ultimo = numero
+                    if evento is not None:
+                        ocioso_desde = time.monotonic()
+                        yield evento
+            if time.monotonic() - ocioso_desde >= espera:
+                ocioso_desde = time.monotonic()
+                yield None
+            await asyncio.sleep(self.intervalo)
+
+
+def publicar_apos_commit(eventos):
+    """Publica os eventos quando a transação atual for confirmada (nunca os de um rollback)."""
+    if not eventos:
+        return
+
+    def publicar():
+        transmissor = obter_transmissor()
+        for evento in eventos:
+            transmissor.publicar(evento)
+    transaction.on_commit(publicar)
+
+
+def _mensagem(evento):
+    dados = {'tipo': evento['tipo'], 'horario': evento['horario']}
+    return f"id: {evento['id']}\ndata: {codificar_json(dados)}\n\n"
+
+
+async def stream_eventos(transmissor, filtros, desde=None, espera=15, reconexao=3000):
+    """
+    Gera o corpo text/event-stream (Server-Sent Events) de uma conexão: os
+    eventos que atendem aos filtros, com o id usado pelo navegador no
+    Last-Event-ID ao reconectar, e um comentário a cada `espera` segundos
+    sem eventos para manter a conexão aberta em proxies.
+    """
+    yield f'retry: {reconexao}\n\n'
+    async for evento in transmissor.assinar(desde=desde, espera=espera):
+        if evento is None:
+            yield ': ping\n\n'
+        elif evento_atende(evento, filtros):
+            yield _mensagem(evento)
+
+
+def eventos_recentes(transmissor, filtros, desde=None, reconexao=10000):
+    """
+    Corpo text/event-stream para servidores WSGI, onde uma conexão aberta
+    prenderia uma thread: só os eventos já publicados desde o Last-Event-ID,
+    e a resposta termina. O navegador reconecta após `reconexao` ms, com o
+    id do último evento, e a conexão vira uma consulta periódica.
+    """
+    eventos, ultimo = transmissor.recentes(desde)
+    yield f'retry: {reconexao}\n\n'
+    for evento in eventos:
+        if evento_atende(evento, filtros):
+            yield _mensagem(evento)
+    # Só o id, sem data: atualiza o Last-Event-ID do navegador sem disparar um evento
+    yield f'id: {ultimo}\n\n'
+
+
+TRANSMISSORES = {
+    'local': TransmissorLocal,
+    'cache': TransmissorCache,
+}
+
+
+@lru_cache(maxsize=None)
+def _criar_transmissor(nome):
+    return TRANSMISSORES[nome]()
+
+
+def obter_transmissor():
+    """Transmissor definido em AGENDA_EVENTOS_TRANSMISSOR ('cache' por padrão), um por processo."""
+    return _criar_transmissor(getattr(settings, 'AGENDA_EVENTOS_TRANSMISSOR', 'cache'))
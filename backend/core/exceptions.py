@@ -1,6 +1,8 @@
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, Throttled
 from rest_framework import status
 
+from .hashing import FilaDeHashCheia, TempoDeHashEsgotado
+
 
 class AgendaAbertaErrors:
     """
@@ -44,6 +46,17 @@ class AgendaAbertaErrors:
     }
 
 
+class ServicoIndisponivel(APIException):
+    """503 com Retry-After (`wait`, em segundos), como o Throttled faz no 429."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Serviço temporariamente indisponível.'
+    default_code = 'service_unavailable'
+
+    def __init__(self, wait, detail=None):
+        super().__init__(detail)
+        self.wait = wait
+
+
 class BusinessRuleException(APIException):
     """
     Exceção customizada para regras de negócio.
@@ -74,6 +87,13 @@ def custom_exception_handler(exc, context):
     """
     from rest_framework.views import exception_handler
     
+    # Pool de hash de senhas cheio (core.hashing): 429 com Retry-After
+    if isinstance(exc, FilaDeHashCheia):
+        exc = Throttled(wait=exc.espera, detail='Muitas requisições de login ou cadastro. Tente novamente em instantes.')
+    # Hash que passou de AGENDA_HASH_TIMEOUT: 503, o servidor é que está lento
+    elif isinstance(exc, TempoDeHashEsgotado):
+        exc = ServicoIndisponivel(wait=exc.espera, detail='A verificação da senha demorou demais. Tente novamente em instantes.')
+
     # Chamar o handler padrão primeiro
     response = exception_handler(exc, context)
     
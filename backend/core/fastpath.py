@@ -0,0 +1,169 @@
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+from rest_framework.response import Response
+
+from .planner import RAIZ, juntar_caminho, plano_do_serializer
+
+
+class NaoCompilavel(Exception):
+    """O serializer tem campos que o caminho rápido não sabe reproduzir."""
+
+
+class _ObjetoLinha:
+    """
+    Acesso por atributo a uma linha de values() ('professor_monitor__first_name'
+    vira obj.professor_monitor.first_name), para que os SerializerMethodFields
+    rodem sobre a linha sem instanciar modelos.
+    """
+    __slots__ = ('_linha', '_caminho', '_relacoes')
+
+    def __init__(self, linha, caminho, relacoes):
+        self._linha = linha
+        self._caminho = caminho
+        self._relacoes = relacoes
+
+    def __getattr__(self, nome):
+        chave = juntar_caminho(self._caminho, nome)
+        if chave in self._relacoes:
+            return _ObjetoLinha(self._linha, chave, self._relacoes)
+        if nome == 'pk':
+            chave = juntar_caminho(self._caminho, self._relacoes.get(self._caminho, 'id'))
+        try:
+            return self._linha[chave]
+        except KeyError:
+            raise AttributeError(nome)
+
+
+class SerializadorCompilado:
+    """
+    Versão "pré-compilada" de um serializer somente leitura: a lista de campos
+    vira uma lista de acessores (chave do values(), conversão) montada uma vez
+    por classe, e cada linha é serializada direto do dicionário do values(),
+    sem instanciar modelos nem percorrer a maquinaria de campos do DRF.
+
+    A conversão de cada valor continua sendo o to_representation do próprio
+    campo (e os SerializerMethodFields chamam o próprio método do serializer),
+    então a saída é idêntica à do serializer original. Campos lidos pelos
+    métodos vêm de Meta.campos_consulta, os mesmos usados por core.planner.
+    """
+    def __init__(self, serializer_class, modelo):
+        plano = plano_do_serializer(serializer_class, modelo)
+        if plano.prefetch_related or any(nomes is None for nomes in plano.colunas.values()):
+            raise NaoCompilavel(serializer_class.__name__)
+
+        self.serializer = serializer_class()
+        self.campos = plano.campos_only()
+        # Caminho de cada relação -> nome da chave primária do modelo relacionado
+        self._relacoes = {RAIZ: modelo._meta.pk.name}
+        for caminho in plano.select_related:
+            relacionado = modelo
+            for atributo in caminho.split('__'):
+                relacionado = relacionado._meta.get_field(atributo).related_model
+            self._relacoes[caminho] = relacionado._meta.pk.name
+        self._montar = self._compilar(self.serializer, RAIZ)
+
+    def _compilar(self, serializer, caminho):
+        acessores = []
+        for nome, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            acessores.append((nome, self._acessor(campo, caminho)))
+
+        def montar(linha):
+            return {nome: acessor(linha) for nome, acessor in acessores}
+        return montar
+
+    def _acessor(self, campo, caminho):
+        if isinstance(campo, serializers.SerializerMethodField):
+            metodo = getattr(campo.parent, campo.method_name)
+            relacoes = self._relacoes
+            return lambda linha: metodo(_ObjetoLinha(linha, caminho, relacoes))
+
+        if campo.source == '*' or isinstance(campo, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            raise NaoCompilavel(campo.field_name)
+
+        chave = juntar_caminho(caminho, *campo.source_attrs)
+
+        if isinstance(campo, serializers.ModelSerializer):
+            montar = self._compilar(campo, chave)
+            return lambda linha: None if linha[chave] is None else montar(linha)
+
+        if isinstance(campo, RelatedField):
+            if not campo.use_pk_only_optimization():
+                raise NaoCompilavel(campo.field_name)
+            # values() já traz o id da FK; PrimaryKeyRelatedField devolveria o mesmo pk
+            if campo.pk_field is not None:
+                converter_pk = campo.pk_field.to_representation
+                return lambda linha: None if linha[chave] is None else converter_pk(linha[chave])
+            return lambda linha: linha[chave]
+
+        converter = campo.to_representation
+
+        def acessor(linha):
+            valor = linha[chave]
+            return None if valor is None else converter(valor)
+        return acessor
+
+    def serializar_linha(self, linha):
+        return self._montar(linha)
+
+    def serializar(self, linhas):
+        montar = self._montar
+        return [montar(linha) for linha in linhas]
+
+
+# Limitado: ?fields= cria uma subclasse do serializer por combinação de campos (core.sparse)
+@lru_cache(maxsize=1024)
+def obter_serializador_compilado(serializer_class, modelo):
+    """Serializer compilado (um por classe), ou None se não for compilável."""
+    try:
+        return SerializadorCompilado(serializer_class, modelo)
+    except NaoCompilavel:
+        return None
+
+
+class SerializacaoRapidaMixin:
+    """
+    Listagens somente leitura pelo caminho rápido: o queryset filtrado vira um
+    values() com as colunas que o serializer lê e a página é serializada por
+    SerializadorCompilado. Serializers não compiláveis (ou
+    AGENDA_SERIALIZACAO_RAPIDA = False) seguem pelo list() padrão do DRF.
+    """
+    def get_serializador_compilado(self):
+        if not getattr(settings, 'AGENDA_SERIALIZACAO_RAPIDA', True):
+            return None
+        serializer_class = self.get_serializer_class()
+        modelo = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+        if modelo is None:
+            return None
+        return obter_serializador_compilado(serializer_class, modelo)
+
+    def get_campos_extras_linha(self, queryset):
+        """Colunas que a paginação por cursor e a ordenação leem de cada linha."""
+        extras = set(queryset.query.annotations)
+        ordenacao = getattr(self, 'ordering_fields', None)
+        if isinstance(ordenacao, (list, tuple)):
+            extras.update(ordenacao)
+        paginator = self.paginator
+        if paginator is not None:
+            extras.update(campo.lstrip('-') for campo in getattr(paginator, 'ordering', ()))
+        return extras
+
+    def get_linhas(self, queryset, compilado):
+        """values() do queryset com as colunas do serializer compilado e da paginação."""
+        extras = self.get_campos_extras_linha(queryset) - set(compilado.campos)
+        return queryset.values(*compilado.campos, *sorted(extras))
+
+    def list(self, request, *args, **kwargs):
+        compilado = self.get_serializador_compilado()
+        if compilado is None:
+            return super().list(request, *args, **kwargs)
+
+        linhas = self.get_linhas(self.filter_queryset(self.get_queryset()), compilado)
+        page = self.paginate_queryset(linhas)
+        if page is not None:
+            return self.get_paginated_response(compilado.serializar(page))
+        return Response(compilado.serializar(linhas))
@@ -1,5 +1,45 @@
 import django_filters
-from .models import Horario, Disciplina
+from django import forms
+from .catalog import disciplina_por_pk
+from .models import CustomUser, DiaSemana, Horario
+from .search import obter_backend_busca
+from .utils import normalizar_texto
+
+
+class DiaSemanaFormField(forms.CharField):
+    """Aceita o rótulo ('Terça-feira'), a forma curta ('terca') ou o número do dia."""
+    def to_python(self, value):
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+        dia = DiaSemana.de_texto(value)
+        if dia is None:
+            raise forms.ValidationError("Dia da semana inválido.")
+        return dia
+
+
+class DiaSemanaFilter(django_filters.Filter):
+    field_class = DiaSemanaFormField
+
+
+class DisciplinaFormField(forms.Field):
+    """Id da disciplina validado pelo catálogo em cache (core.catalog), sem consultar o banco."""
+    default_error_messages = {'invalid_choice': forms.ModelChoiceField.default_error_messages['invalid_choice']}
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            disciplina = disciplina_por_pk(int(value))
+        except (TypeError, ValueError):
+            disciplina = None
+        if disciplina is None:
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return disciplina
+
+
+class DisciplinaFilter(django_filters.Filter):
+    field_class = DisciplinaFormField
 
 
 class HorarioFilter(django_filters.FilterSet):
@@ -7,18 +47,10 @@ class HorarioFilter(django_filters.FilterSet):
     Filtro avançado para horários, permitindo filtrar por diversos critérios.
     """
     curso = django_filters.CharFilter(field_name='disciplina__curso', lookup_expr='icontains')
-    disciplina = django_filters.ModelChoiceFilter(queryset=Disciplina.objects.all())
+    disciplina = DisciplinaFilter()
     professor = django_filters.CharFilter(field_name='professor_monitor__username', lookup_expr='icontains')
     professor_nome = django_filters.CharFilter(method='filter_professor_nome')
-    dia_semana = django_filters.ChoiceFilter(choices=[
-        ('Segunda-feira', 'Segunda-feira'),
-        ('Terça-feira', 'Terça-feira'),
-        ('Quarta-feira', 'Quarta-feira'),
-        ('Quinta-feira', 'Quinta-feira'),
-        ('Sexta-feira', 'Sexta-feira'),
-        ('Sábado', 'Sábado'),
-        ('Domingo', 'Domingo'),
-    ])
+    dia_semana = DiaSemanaFilter()
     periodo = django_filters.CharFilter(method='filter_periodo')
     
     class Meta:
@@ -39,10 +71,25 @@ class HorarioFilter(django_filters.FilterSet):
     
     def filter_professor_nome(self, queryset, name, value):
         """
-        Filtra horários pelo nome do professor (first_name ou last_name).
+        Filtra horários pelo nome do professor/monitor. Cada termo precisa
+        aparecer no nome (sem diferenciar maiúsculas e acentos), então
+        'ana lima' encontra 'Ana Beatriz Lima'. A busca roda sobre a coluna
+        CustomUser.nome_busca pelo índice de texto (core.search: FTS5 no
+        SQLite, trigramas no PostgreSQL), em uma única subconsulta.
         """
-        return queryset.filter(
-            professor_monitor__first_name__icontains=value
-        ) | queryset.filter(
-            professor_monitor__last_name__icontains=value
-        )
\ No newline at end of file
+        termos = normalizar_texto(value).split()
+        if not termos:
+            return queryset
+        backend = obter_backend_busca(queryset.db, indice='nomes')
+        professores = backend.filtrar_nomes(CustomUser.objects.all(), termos)
+        return queryset.filter(professor_monitor__in=professores.values('pk'))
+
+
+class HorarioProfessorFilter(django_filters.FilterSet):
+    """Filtros da listagem privada de horários do professor/monitor."""
+    dia_semana = DiaSemanaFilter()
+    disciplina = DisciplinaFilter()
+
+    class Meta:
+        model = Horario
+        fields = ['dia_semana', 'disciplina__curso', 'disciplina']
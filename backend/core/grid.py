@@ -0,0 +1,228 @@
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache import ESCOPO_GLOBAL, montar_chave, obter_geracoes
+from .catalog import indice_atual
+from .models import DiaSemana, GradeSemanal, Horario
+
+TIPOS_GRADE = ('professor', 'curso', 'local')
+
+PREFIXO_CHAVES = 'agenda:chaves-conhecidas:'
+
+# Maior id aceito em ?professor= (inteiro de 64 bits com sinal)
+MAIOR_ID = 2 ** 63 - 1
+
+# Quantidade de chaves recalculadas por consulta na rematerialização completa
+TAMANHO_LOTE = 500
+
+# Colunas de cada horário na grade compacta (cada horário é uma lista nesta ordem)
+COLUNAS = (
+    'id', 'hora_inicio', 'hora_fim', 'local',
+    'disciplina_id', 'disciplina_codigo', 'disciplina_nome', 'curso',
+    'professor_id', 'professor_nome',
+)
+
+_CAMPOS_CONSULTA = (
+    'id', 'dia_semana', 'hora_inicio', 'hora_fim', 'local',
+    'disciplina_id', 'disciplina__codigo', 'disciplina__nome', 'disciplina__curso',
+    'professor_monitor_id', 'professor_monitor__first_name',
+    'professor_monitor__last_name', 'professor_monitor__username',
+)
+
+
+# Grade compacta (?compacto=1): disciplina e professor vão uma vez para `relacionados`
+RELACOES_COMPACTAS = {
+    'disciplina_id': ('disciplina', ('disciplina_codigo', 'disciplina_nome', 'curso')),
+    'professor_id': ('professor', ('professor_nome',)),
+}
+
+
+class ChaveInvalida(Exception):
+    """Chave de grade malformada (ex: ?professor= que não é um id)."""
+
+
+class GradeInexistente(Exception):
+    """Chave de grade bem formada, mas sem nenhum horário (professor, curso ou local desconhecido)."""
+
+
+def chaves_conhecidas(tipo):
+    """
+    Valores de `tipo` que existem: cursos do catálogo (sem consulta), e ids de
+    professor (em texto) e locais com algum horário, ativo ou não, em cache
+    por geração do escopo global.
+    """
+    if tipo == 'curso':
+        return indice_atual().cursos
+    geracao = obter_geracoes([ESCOPO_GLOBAL])[ESCOPO_GLOBAL]
+    chave_cache = montar_chave(PREFIXO_CHAVES, f'{tipo}|{geracao}')
+    chaves = cache.get(chave_cache)
+    if chaves is None:
+        campo = 'professor_monitor_id' if tipo == 'professor' else 'local'
+        chaves = frozenset(str(valor) for valor in Horario.objects.order_by().values_list(campo, flat=True).distinct())
+        cache.set(chave_cache, chaves, getattr(settings, 'AGENDA_CACHE_TIMEOUT', 60 * 60 * 6))
+    return chaves
+
+
+def validar_chave(tipo, chave):
+    """
+    Forma canônica de uma chave de grade vinda da URL ('03' -> '3', sem
+    espaços nas pontas). Levanta ChaveInvalida ou GradeInexistente: só chaves
+    conhecidas chegam a obter_grade, que grava e consulta por chave.
+    """
+    chave = chave.strip()
+    if tipo == 'professor':
+        try:
+            numero = int(chave)
+        except ValueError:
+            raise ChaveInvalida(chave)
+        if not 1 <= numero <= MAIOR_ID:
+            raise ChaveInvalida(chave)
+        chave = str(numero)
+    if chave not in chaves_conhecidas(tipo):
+        raise GradeInexistente(chave)
+    return chave
+
+
+def _nome_professor(first_name, last_name, username):
+    return f"{first_name} {last_name}".strip() or username
+
+
+def _grade_vazia():
+    return {'dias': list(DiaSemana.labels), 'colunas': list(COLUNAS), 'grade': [[] for _ in DiaSemana]}
+
+
+def chaves_dos_escopos(escopos):
+    """Converte escopos de cache (ex: 'local:Sala 101') nas chaves de grade afetadas."""
+    chaves = set()
+    for nome in escopos:
+        tipo, _, valor = nome.partition(':')
+        if tipo in TIPOS_GRADE and valor and valor != 'None':
+            chaves.add((tipo, valor))
+    return chaves
+
+
+def _consultar(chaves):
+    """Horários ativos de todas as chaves pedidas, em uma única consulta ordenada."""
+    por_tipo = defaultdict(set)
+    for tipo, chave in chaves:
+        por_tipo[tipo].add(chave)
+
+    filtro = Q()
+    if por_tipo['professor']:
+        filtro |= Q(professor_monitor_id__in=[int(chave) for chave in por_tipo['professor'] if chave.isdigit()])
+    if por_tipo['curso']:
+        filtro |= Q(disciplina__curso__in=por_tipo['curso'])
+    if por_tipo['local']:
+        filtro |= Q(local__in=por_tipo['local'])
+
+    return Horario.objects.filter(filtro, ativo=True).order_by('hora_inicio', 'id').values_list(*_CAMPOS_CONSULTA)
+
+
+def montar_grades(chaves):
+    """Monta (sem gravar) a grade compacta de cada chave (tipo, chave)."""
+    chaves = set(chaves)
+    grades = {chave: _grade_vazia() for chave in chaves}
+    if not chaves:
+        return grades
+
+    for linha in _consultar(chaves):
+        (id_, dia, inicio, fim, local, disciplina_id, codigo, nome, curso,
+         professor_id, first_name, last_name, username) = linha
+        horario = [
+            id_, inicio.isoformat(), fim.isoformat(), local,
+            disciplina_id, codigo, nome, curso,
+            professor_id, _nome_professor(first_name, last_name, username),
+        ]
+        for chave in (('professor', str(professor_id)), ('curso', curso), ('local', local)):
+            if chave in grades:
+                grades[chave]['grade'][dia].append(horario)
+    return grades
+
+
+def atualizar_grades(chaves, salvar_vazias=True):
+    """
+    Recalcula e grava as grades das chaves informadas (uma consulta de leitura
+    e um upsert), sem tocar nas demais.
+    """
+    grades = montar_grades(chaves)
+    registros = [
+        GradeSemanal(tipo=tipo, chave=chave, dados=dados)
+        for (tipo, chave), dados in grades.items()
+        if salvar_vazias or any(dados['grade'])
+    ]
+    if registros:
+        GradeSemanal.objects.bulk_create(
+            registros,
+            update_conflicts=True,
+            unique_fields=['tipo', 'chave'],
+            update_fields=['dados', 'atualizado_em'],
+        )
+    return grades
+
+
+def obter_grade(tipo, chave):
+    """
+    Retorna a grade materializada. Se ainda não existir (dados anteriores à
+    materialização), monta e grava sob demanda.
+    """
+    dados = GradeSemanal.objects.filter(tipo=tipo, chave=chave).values_list('dados', flat=True).first()
+    if dados is None:
+        dados = atualizar_grades({(tipo, chave)}, salvar_vazias=False)[(tipo, chave)]
+    return dados
+
+
+def compactar_grade(dados):
+    """
+    Tira de cada horário os dados repetidos da disciplina e do professor, que
+    passam a aparecer uma vez em `relacionados`, indexados pelo id.
+    """
+    colunas = dados['colunas']
+    posicao = {coluna: indice for indice, coluna in enumerate(colunas)}
+    repetidas = {coluna for _, campos in RELACOES_COMPACTAS.values() for coluna in campos}
+    mantidas = [indice for indice, coluna in enumerate(colunas) if coluna not in repetidas]
+    relacionados = {nome: {} for nome, _ in RELACOES_COMPACTAS.values()}
+
+    grade = []
+    for horarios in dados['grade']:
+        for horario in horarios:
+            for coluna_id, (nome, campos) in RELACOES_COMPACTAS.items():
+                identificador = horario[posicao[coluna_id]]
+                if identificador is not None and str(identificador) not in relacionados[nome]:
+                    relacionados[nome][str(identificador)] = {campo: horario[posicao[campo]] for campo in campos}
+        grade.append([[horario[indice] for indice in mantidas] for horario in horarios])
+    return {
+        'dias': dados['dias'],
+        'colunas': [colunas[indice] for indice in mantidas],
+        'grade': grade,
+        'relacionados': relacionados,
+    }
+
+
+async def aobter_grade(tipo, chave):
+    """obter_grade pelo ORM assíncrono (core.async_views)."""
+    dados = await GradeSemanal.objects.filter(tipo=tipo, chave=chave).values_list('dados', flat=True).afirst()
+    if dados is None:
+        grades = await sync_to_async(atualizar_grades)({(tipo, chave)}, salvar_vazias=False)
+        dados = grades[(tipo, chave)]
+    return dados
+
+
+def rematerializar_todas():
+    """Reconstrói todas as grades e remove as que não têm mais horários."""
+    linhas = Horario.objects.filter(ativo=True).values_list(
+        'professor_monitor_id', 'disciplina__curso', 'local'
+    ).distinct()
+    chaves = set()
+    for professor_id, curso, local in linhas:
+        chaves.update({('professor', str(professor_id)), ('curso', curso), ('local', local)})
+
+    ordenadas = sorted(chaves)
+    for inicio in range(0, len(ordenadas), TAMANHO_LOTE):
+        atualizar_grades(ordenadas[inicio:inicio + TAMANHO_LOTE])
+    obsoletas = [grade.pk for grade in GradeSemanal.objects.only('tipo', 'chave') if (grade.tipo, grade.chave) not in chaves]
+    GradeSemanal.objects.filter(pk__in=obsoletas).delete()
+    return len(chaves)
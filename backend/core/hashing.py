@@ -0,0 +1,213 @@
+"""
+Hash de senhas (login e cadastro) em um pool de processos limitado.
+
+O PBKDF2 é propositalmente caro: feito na thread da requisição, uma rajada de
+logins ocupa a CPU do servidor e atrasa todas as outras rotas. Aqui o cálculo
+vai para AGENDA_HASH_PROCESSOS processos (com prioridade menor, via nice), e a
+thread da requisição só espera o resultado.
+
+Cabem no máximo AGENDA_HASH_PROCESSOS + AGENDA_HASH_FILA pedidos ao mesmo tempo
+(em cálculo ou esperando um processo). Com o pool cheio, o pedido é recusado na
+hora com FilaDeHashCheia, que a API responde com 429 e Retry-After
+(core.exceptions) em vez de acumular requisições; um pedido que passa de
+AGENDA_HASH_TIMEOUT segundos termina com TempoDeHashEsgotado (503).
+
+CustomUser.set_password e check_password passam por aqui, mas o pool só é
+usado dentro de usar_pool_de_hash() (PoolDeHashMixin, nas views de login e
+cadastro da API), onde as duas exceções viram respostas HTTP. Fora dele
+(admin, o hash fictício do ModelBackend para usuários inexistentes,
+createsuperuser/changepassword) e com AGENDA_HASH_PROCESSOS = 0, o padrão,
+o hash é feito na própria thread, como antes.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Tempo de um hash antes da primeira medição, em segundos (PBKDF2 padrão do Django)
+TEMPO_INICIAL = 0.5
+
+
+# Ligado por usar_pool_de_hash(): só quem sabe responder às exceções abaixo usa o pool
+_pool_permitido = ContextVar('pool_de_hash_permitido', default=False)
+
+
+class FilaDeHashCheia(Exception):
+    """Pool de hash sem vaga; `espera` é a estimativa (segundos) até liberar."""
+
+    def __init__(self, espera):
+        super().__init__(f"Pool de hash de senhas cheio; tente novamente em {espera}s.")
+        self.espera = espera
+
+
+class TempoDeHashEsgotado(Exception):
+    """O hash não terminou em AGENDA_HASH_TIMEOUT segundos (o pedido continua ocupando a vaga)."""
+
+    def __init__(self, espera):
+        super().__init__(f"Hash de senha sem resposta no tempo limite; tente novamente em {espera}s.")
+        self.espera = espera
+
+
+def _iniciar_processo(hashers_configurados, prioridade):
+    # Os processos só calculam hashes: basta a configuração dos hashers
+    if prioridade:
+        os.nice(prioridade)
+    if not settings.configured:
+        settings.configure(PASSWORD_HASHERS=hashers_configurados)
+
+
+def _calcular(senha):
+    return hashers.make_password(senha)
+
+
+def _verificar(senha, codificado):
+    """(senha confere, hash novo se os parâmetros do hash atual estão desatualizados)."""
+    valida, atualizar = hashers.verify_password(senha, codificado)
+    return valida, hashers.make_password(senha) if valida and atualizar else None
+
+
+class ExecutorDeHash:
+    def __init__(self, processos, fila, prioridade=0, timeout=None):
+        self.processos = processos
+        self.capacidade = processos + fila
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._vagas = threading.BoundedSemaphore(self.capacidade)
+        self._tempo_medio = TEMPO_INICIAL
+        # spawn: o servidor pode ter threads e conexões abertas, que um fork copiaria
+        self._pool = ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_iniciar_processo,
+            initargs=(list(settings.PASSWORD_HASHERS), prioridade),
+        )
+
+    def espera_estimada(self):
+        """Segundos até o pool esvaziar, pelo tempo médio de um pedido."""
+        return max(1, math.ceil(self._tempo_medio * self.capacidade / self.processos))
+
+    def executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            raise FilaDeHashCheia(self.espera_estimada())
+        inicio = time.perf_counter()
+        try:
+            futuro = self._pool.submit(funcao, *args)
+        except BaseException:
+            self._vagas.release()
+            raise
+        # A vaga só é devolvida quando o processo termina, mesmo se a requisição desistir
+        futuro.add_done_callback(lambda _: self._concluir(inicio))
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TimeoutError:
+            raise TempoDeHashEsgotado(self.espera_estimada())
+
+    def _concluir(self, inicio):
+        # Média móvel do tempo de um pedido (espera na fila + cálculo)
+        self._tempo_medio = 0.8 * self._tempo_medio + 0.2 * (time.perf_counter() - inicio)
+        self._vagas.release()
+
+    def encerrar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor = None
+_trava = threading.Lock()
+
+
+def executor_de_hash():
+    """ExecutorDeHash deste processo (criado no primeiro uso), ou None com AGENDA_HASH_PROCESSOS = 0."""
+    global _executor
+    processos = getattr(settings, 'AGENDA_HASH_PROCESSOS', 0)
+    if processos <= 0:
+        return None
+    executor = _executor
+    if executor is not None and executor.pid == os.getpid():
+        return executor
+    with _trava:
+        # Um executor herdado de outro processo (fork do servidor) não tem os processos do pool
+        if _executor is None or _executor.pid != os.getpid():
+            _executor = ExecutorDeHash(
+                processos,
+                getattr(settings, 'AGENDA_HASH_FILA', 0),
+                getattr(settings, 'AGENDA_HASH_PRIORIDADE', 0),
+                getattr(settings, 'AGENDA_HASH_TIMEOUT', None),
+            )
+        return _executor
+
+
+def encerrar_executor():
+    global _executor
+    with _trava:
+        if _executor is not None and _executor.pid == os.getpid():
+            _executor.encerrar()
+        _executor = None
+
+
+@receiver(setting_changed)
+def _reiniciar_executor(setting, **kwargs):
+    if setting == 'PASSWORD_HASHERS' or setting.startswith('AGENDA_HASH_'):
+        encerrar_executor()
+
+
+@contextmanager
+def usar_pool_de_hash():
+    """Hashes do bloco vão para o pool (se configurado), podendo levantar FilaDeHashCheia/TempoDeHashEsgotado."""
+    token = _pool_permitido.set(True)
+    try:
+        yield
+    finally:
+        _pool_permitido.reset(token)
+
+
+class PoolDeHashMixin:
+    """Views da API que calculam hashes de senha (login, cadastro): usam o pool de processos."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with usar_pool_de_hash():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def _executar(funcao, *args):
+    executor = executor_de_hash() if _pool_permitido.get() else None
+    if executor is None:
+        return funcao(*args)
+    try:
+        return executor.executar(funcao, *args)
+    except BrokenProcessPool:
+        # Um processo do pool morreu: o próximo pedido cria outro pool
+        logger.warning("Pool de hash de senhas interrompido; hash calculado na thread da requisição.")
+        encerrar_executor()
+        return funcao(*args)
+
+
+def calcular_hash(senha):
+    """make_password() no pool de processos."""
+    if senha is None:
+        # Senha inutilizável: não há hash a calcular
+        return hashers.make_password(None)
+    return _executar(_calcular, senha)
+
+
+def verificar_senha(senha, codificado):
+    """
+    Confere a senha no pool de processos. Retorna (confere, hash_novo); hash_novo
+    vem preenchido quando a senha confere mas o hash foi feito com parâmetros
+    antigos (outro algoritmo ou menos iterações) e deve ser regravado.
+    """
+    if senha is None or not hashers.is_password_usable(codificado):
+        return False, None
+    return _executar(_verificar, senha, codificado)
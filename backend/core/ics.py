@@ -0,0 +1,218 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from .cache import escopo, montar_chave, obter_geracoes, ultima_alteracao
+from .grid import chaves_conhecidas
+from .models import CustomUser, Disciplina, Horario
+
+PREFIXO_ICS = 'agenda:ics:'
+
+# Tipos de feed -> filtro dos horários
+TIPOS_FEED = {
+    'professor': 'professor_monitor_id',
+    'disciplina': 'disciplina_id',
+    'curso': 'disciplina__curso',
+    'local': 'local',
+}
+
+# Códigos de dia do RRULE (RFC 5545), na ordem de DiaSemana
+DIAS_RRULE = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+TAMANHO_MAXIMO_LINHA = 75  # octetos, sem contar o CRLF
+
+_CAMPOS_FEED = (
+    'id', 'dia_semana', 'hora_inicio', 'hora_fim', 'local', 'data_criacao', 'ultima_atualizacao',
+    'disciplina__nome', 'disciplina__codigo', 'disciplina__curso',
+    'professor_monitor__username', 'professor_monitor__first_name', 'professor_monitor__last_name',
+)
+
+
+class FeedInexistente(Exception):
+    """Tipo de feed desconhecido, ou professor/disciplina/curso/local que não existe."""
+
+
+def _escapar(texto):
+    """Escapa um valor TEXT (RFC 5545, 3.3.11)."""
+    return (
+        str(texto).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _dobrar(linha):
+    """Quebra linhas com mais de 75 octetos (RFC 5545, 3.1) sem partir caracteres UTF-8."""
+    if len(linha.encode('utf-8')) <= TAMANHO_MAXIMO_LINHA:
+        return linha
+    partes, atual, tamanho = [], '', 0
+    for caractere in linha:
+        octetos = len(caractere.encode('utf-8'))
+        # As continuações começam com um espaço, que também conta
+        limite = TAMANHO_MAXIMO_LINHA if not partes else TAMANHO_MAXIMO_LINHA - 1
+        if tamanho + octetos > limite:
+            partes.append(atual)
+            atual, tamanho = '', 0
+        atual += caractere
+        tamanho += octetos
+    partes.append(atual)
+    return '\r\n '.join(partes)
+
+
+def _utc(valor):
+    return valor.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _primeira_ocorrencia(criado_em, dia_semana, fuso):
+    """Data da primeira ocorrência do dia da semana a partir da criação do horário."""
+    inicio = criado_em.astimezone(fuso).date()
+    return inicio + timedelta(days=(int(dia_semana) - inicio.weekday()) % 7)
+
+
+def _vtimezone(fuso):
+    """
+    VTIMEZONE de deslocamento fixo (o atual do fuso). Suficiente para fusos
+    sem horário de verão, como America/Fortaleza.
+    """
+    deslocamento = datetime.now(fuso).utcoffset()
+    minutos = int(deslocamento.total_seconds() // 60)
+    sinal = '-' if minutos < 0 else '+'
+    offset = f'{sinal}{abs(minutos) // 60:02d}{abs(minutos) % 60:02d}'
+    return [
+        'BEGIN:VTIMEZONE',
+        f'TZID:{fuso.key}',
+        'BEGIN:STANDARD',
+        'DTSTART:19700101T000000',
+        f'TZOFFSETFROM:{offset}',
+        f'TZOFFSETTO:{offset}',
+        f'TZNAME:{datetime.now(fuso).tzname()}',
+        'END:STANDARD',
+        'END:VTIMEZONE',
+    ]
+
+
+def _nome_professor(first_name, last_name, username):
+    return f"{first_name} {last_name}".strip() or username
+
+
+def _vevent(linha, fuso, dominio):
+    professor = _nome_professor(
+        linha['professor_monitor__first_name'], linha['professor_monitor__last_name'],
+        linha['professor_monitor__username'],
+    )
+    data = _primeira_ocorrencia(linha['data_criacao'], linha['dia_semana'], fuso)
+    descricao = '\n'.join([
+        f"Professor/monitor: {professor}",
+        f"Disciplina: {linha['disciplina__nome']} ({linha['disciplina__codigo']})",
+        f"Curso: {linha['disciplina__curso']}",
+    ])
+    return [
+        'BEGIN:VEVENT',
+        f"UID:horario-{linha['id']}@{dominio}",
+        f"DTSTAMP:{_utc(linha['ultima_atualizacao'])}",
+        f"LAST-MODIFIED:{_utc(linha['ultima_atualizacao'])}",
+        f"DTSTART;TZID={fuso.key}:{data:%Y%m%d}T{linha['hora_inicio']:%H%M%S}",
+        f"DTEND;TZID={fuso.key}:{data:%Y%m%d}T{linha['hora_fim']:%H%M%S}",
+        f"RRULE:FREQ=WEEKLY;BYDAY={DIAS_RRULE[int(linha['dia_semana'])]}",
+        f"SUMMARY:{_escapar(linha['disciplina__nome'] + ' - ' + professor)}",
+        f"LOCATION:{_escapar(linha['local'])}",
+        f"DESCRIPTION:{_escapar(descricao)}",
+        'TRANSP:TRANSPARENT',
+        'END:VEVENT',
+    ]
+
+
+def _titulo_do_feed(tipo, chave):
+    if tipo == 'professor':
+        try:
+            professor = CustomUser.objects.get(pk=int(chave), tipo__in=['professor', 'monitor'])
+        except (ValueError, CustomUser.DoesNotExist):
+            raise FeedInexistente(chave)
+        return f"Atendimentos - {_nome_professor(professor.first_name, professor.last_name, professor.username)}"
+    if tipo == 'disciplina':
+        try:
+            disciplina = Disciplina.objects.get(pk=int(chave))
+        except (ValueError, Disciplina.DoesNotExist):
+            raise FeedInexistente(chave)
+        return f"Atendimentos - {disciplina.nome} ({disciplina.codigo})"
+    # Curso e local já foram conferidos em obter_feed
+    return f"Atendimentos - {chave}"
+
+
+def gerar_calendario(tipo, chave):
+    """Monta o VCALENDAR (bytes) com os horários ativos do feed, um VEVENT semanal por horário."""
+    if tipo not in TIPOS_FEED:
+        raise FeedInexistente(tipo)
+    titulo = _titulo_do_feed(tipo, chave)
+    fuso = ZoneInfo(getattr(settings, 'AGENDA_ICS_FUSO', 'America/Fortaleza'))
+    dominio = getattr(settings, 'AGENDA_ICS_DOMINIO', 'agenda-aberta')
+    intervalo = getattr(settings, 'AGENDA_ICS_ATUALIZACAO', 'PT1H')
+
+    linhas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Agenda Aberta//Horarios de Atendimento//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escapar(titulo)}',
+        f'X-WR-TIMEZONE:{fuso.key}',
+        f'REFRESH-INTERVAL;VALUE=DURATION:{intervalo}',
+        f'X-PUBLISHED-TTL:{intervalo}',
+        *_vtimezone(fuso),
+    ]
+    horarios = (
+        Horario.objects.filter(ativo=True, **{TIPOS_FEED[tipo]: chave})
+        .order_by('dia_semana', 'hora_inicio', 'id')
+        .values(*_CAMPOS_FEED)
+    )
+    for horario in horarios.iterator():
+        linhas.extend(_vevent(horario, fuso, dominio))
+    linhas.append('END:VCALENDAR')
+    return ''.join(_dobrar(linha) + '\r\n' for linha in linhas).encode('utf-8')
+
+
+def _normalizar_chave(tipo, chave):
+    """
+    Forma canônica da chave do feed, ou FeedInexistente. Curso e local vêm
+    como texto livre da URL: só nomes conhecidos (core.grid) são aceitos, senão cada
+    valor inventado criaria um contador de geração e uma entrada no cache.
+    """
+    if tipo in ('professor', 'disciplina'):
+        # '03' e '3' são o mesmo feed (e o mesmo escopo 'professor:3')
+        try:
+            return str(int(chave))
+        except ValueError:
+            raise FeedInexistente(chave)
+    chave = chave.strip()
+    if chave not in chaves_conhecidas(tipo):
+        raise FeedInexistente(chave)
+    return chave
+
+
+def obter_feed(tipo, chave):
+    """
+    Retorna {'conteudo', 'etag', 'last_modified'} do feed, pré-montado em
+    cache. A chave da entrada inclui a geração do escopo do feed (ex:
+    'professor:3'), que os sinais incrementam a cada alteração relevante;
+    então, no caso comum, servir um feed custa duas leituras do cache e
+    nenhuma consulta ao banco.
+    """
+    if tipo not in TIPOS_FEED:
+        raise FeedInexistente(tipo)
+    chave = _normalizar_chave(tipo, chave)
+    nome = escopo(tipo, chave)
+    geracao = obter_geracoes([nome])[nome]
+    chave_cache = montar_chave(PREFIXO_ICS, f'{nome}|{geracao}')
+    feed = cache.get(chave_cache)
+    if feed is None:
+        conteudo = gerar_calendario(tipo, chave)
+        feed = {
+            'conteudo': conteudo,
+            'etag': quote_etag(hashlib.md5(conteudo).hexdigest()),
+            'last_modified': ultima_alteracao([nome]),
+        }
+        cache.set(chave_cache, feed, getattr(settings, 'AGENDA_CACHE_TIMEOUT', 60 * 60 * 6))
+    return feed
@@ -0,0 +1,182 @@
+import csv
+import io
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .catalog import indice_atual
+from .conflicts import VerificadorEmLote
+from .models import Horario
+from .serializers import HorarioImportacaoSerializer
+from .signals import invalidar_horarios
+
+MENSAGEM_CONFLITO_PROFESSOR = "Conflito de horário. Você já possui um atendimento neste intervalo."
+MENSAGEM_CONFLITO_LOCAL = "Conflito de agendamento: Esta sala já está reservada neste mesmo horário."
+
+
+class ImportacaoInvalida(Exception):
+    """Erro no formato do arquivo/corpo enviado (antes da validação das linhas)."""
+
+
+class ImportadorHorarios:
+    """
+    Importa em lote os horários de um professor/monitor.
+
+    Todas as linhas são validadas em memória antes de qualquer escrita:
+    - campos de cada linha com HorarioImportacaoSerializer;
+    - disciplinas resolvidas (por id ou código) em uma única consulta;
+    - conflitos de professor e de sala, dentro do lote e contra os horários já
+      cadastrados, com uma única consulta de pré-carga e uma varredura em
+      memória (VerificadorEmLote).
+
+    Se alguma linha tiver erro nada é gravado; caso contrário as linhas são
+    gravadas com bulk_create em uma única transação.
+    """
+
+    def __init__(self, professor):
+        self.professor = professor
+        self.linhas = []
+        self.erros = {}
+
+    # --- Leitura ---
+
+    def carregar_json(self, dados):
+        """Aceita uma lista de objetos ou {"horarios": [...]}."""
+        if isinstance(dados, dict):
+            dados = dados.get('horarios')
+        if not isinstance(dados, list):
+            raise ImportacaoInvalida('Envie uma lista de horários ou um objeto com a chave "horarios".')
+        for numero, item in enumerate(dados, start=1):
+            if not isinstance(item, dict):
+                self.erros[numero] = {'linha': 'Cada horário deve ser um objeto.'}
+                continue
+            self.linhas.append((numero, item))
+        self._verificar_limite()
+
+    def carregar_csv(self, arquivo):
+        """
+        Lê um CSV com cabeçalho (disciplina, dia_semana, hora_inicio, hora_fim,
+        local e, opcionalmente, ativo). Aceita ',' ou ';' como separador.
+        """
+        conteudo = arquivo.read()
+        if isinstance(conteudo, bytes):
+            try:
+                conteudo = conteudo.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                raise ImportacaoInvalida('O arquivo CSV deve estar codificado em UTF-8.')
+        if not conteudo.strip():
+            raise ImportacaoInvalida('O arquivo CSV está vazio.')
+
+        try:
+            dialeto = csv.Sniffer().sniff(conteudo.splitlines()[0], delimiters=',;')
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.DictReader(io.StringIO(conteudo), dialect=dialeto)
+        for item in leitor:
+            dados = {
+                (chave or '').strip(): (valor or '').strip()
+                for chave, valor in item.items()
+                if chave is not None
+            }
+            if not any(dados.values()):
+                continue
+            self.linhas.append((leitor.line_num, dados))
+        self._verificar_limite()
+
+    def _verificar_limite(self):
+        limite = getattr(settings, 'AGENDA_IMPORTACAO_MAX_LINHAS', 5000)
+        if len(self.linhas) > limite:
+            raise ImportacaoInvalida(f'A importação aceita no máximo {limite} horários por vez.')
+        if not self.linhas and not self.erros:
+            raise ImportacaoInvalida('Nenhum horário encontrado para importar.')
+
+    # --- Validação ---
+
+    def validar(self):
+        """Valida todas as linhas. Retorna True se não houver erros."""
+        validas = []
+        for numero, dados in self.linhas:
+            serializer = HorarioImportacaoSerializer(data=dados)
+            if serializer.is_valid():
+                validas.append((numero, serializer.validated_data))
+            else:
+                self.erros[numero] = self._primeiro_erro(serializer.errors)
+
+        validas = self._resolver_disciplinas(validas)
+        self._verificar_conflitos(validas)
+        self.validas = [(numero, dados) for numero, dados in validas if numero not in self.erros]
+        return not self.erros
+
+    def _resolver_disciplinas(self, validas):
+        # Pelo código ou id, no catálogo em cache (core.catalog): sem consultas
+        catalogo = indice_atual()
+        resolvidas = []
+        for numero, dados in validas:
+            disciplina = catalogo.disciplina_por_referencia(dados['disciplina'])
+            if disciplina is None:
+                self.erros[numero] = {'disciplina': 'Disciplina não encontrada.'}
+                continue
+            resolvidas.append((numero, {**dados, 'disciplina': disciplina}))
+        return resolvidas
+
+    def _verificar_conflitos(self, validas):
+        if not validas:
+            return
+        locais = {dados['local'] for _, dados in validas}
+        dias = {dados['dia_semana'] for _, dados in validas}
+
+        verificador = VerificadorEmLote()
+        existentes = Horario.objects.filter(
+            Q(professor_monitor=self.professor) | Q(local__in=locais),
+            dia_semana__in=dias,
+        ).values_list('pk', 'professor_monitor_id', 'local', 'dia_semana', 'hora_inicio', 'hora_fim')
+
+        for pk, professor_id, local, dia, inicio, fim in existentes:
+            ref = ('existente', pk)
+            if professor_id == self.professor.pk:
+                verificador.adicionar(('professor', professor_id), dia, inicio, fim, ref)
+            if local in locais:
+                verificador.adicionar(('local', local), dia, inicio, fim, ref)
+
+        for numero, dados in validas:
+            ref = ('linha', numero)
+            dia, inicio, fim = dados['dia_semana'], dados['hora_inicio'], dados['hora_fim']
+            verificador.adicionar(('professor', self.professor.pk), dia, inicio, fim, ref)
+            verificador.adicionar(('local', dados['local']), dia, inicio, fim, ref)
+
+        for sobreposicao in verificador.sobreposicoes():
+            tipo_recurso = sobreposicao.recurso[0]
+            mensagem = MENSAGEM_CONFLITO_PROFESSOR if tipo_recurso == 'professor' else MENSAGEM_CONFLITO_LOCAL
+            campo = 'non_field_errors' if tipo_recurso == 'professor' else 'local'
+            for ref, outro in ((sobreposicao.anterior, sobreposicao.atual),
+                               (sobreposicao.atual, sobreposicao.anterior)):
+                if ref[0] != 'linha' or ref[1] in self.erros:
+                    continue
+                detalhe = f" (conflita com a linha {outro[1]})" if outro[0] == 'linha' else ''
+                self.erros[ref[1]] = {campo: mensagem + detalhe}
+
+    @staticmethod
+    def _primeiro_erro(erros):
+        return {campo: str(mensagens[0]) if isinstance(mensagens, list) else str(mensagens)
+                for campo, mensagens in erros.items()}
+
+    # --- Gravação ---
+
+    def salvar(self):
+        """Grava as linhas válidas em uma única transação. Retorna os horários criados."""
+        horarios = [
+            Horario(professor_monitor=self.professor, **dados)
+            for _, dados in self.validas
+        ]
+        # bulk_create não passa por Horario.save: monta o texto de busca aqui
+        for horario in horarios:
+            horario.texto_busca = horario.montar_texto_busca()
+        with transaction.atomic():
+            criados = Horario.objects.bulk_create(horarios, batch_size=500)
+        # bulk_create não dispara post_save: invalida os caches explicitamente
+        invalidar_horarios(criados)
+        return criados
+
+    def erros_por_linha(self):
+        return [{'linha': numero, 'erros': self.erros[numero]} for numero in sorted(self.erros)]
@@ -0,0 +1,221 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class Medicao:
+    """Latências e pico de requisições em andamento dentro da aplicação."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.latencias = []
+        self.erros = 0
+        self.em_andamento = 0
+        self.pico = 0
+
+    def entrar(self):
+        with self._trava:
+            self.em_andamento += 1
+            self.pico = max(self.pico, self.em_andamento)
+
+    def sair(self, inicio, status):
+        with self._trava:
+            self.em_andamento -= 1
+            self.latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                self.erros += 1
+
+    def resumo(self, duracao):
+        ordenadas = sorted(self.latencias)
+
+        def percentil(p):
+            return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000
+
+        return {
+            'req/s': len(ordenadas) / duracao,
+            'p50': statistics.median(ordenadas) * 1000,
+            'p95': percentil(0.95),
+            'p99': percentil(0.99),
+            'máx': ordenadas[-1] * 1000,
+            'pico': self.pico,
+            'erros': self.erros,
+        }
+
+
+@contextmanager
+def latencia_simulada(segundos):
+    """Acrescenta `segundos` a cada consulta, em todas as conexões (banco remoto)."""
+    if not segundos:
+        yield
+        return
+
+    def atrasar(execute, sql, params, many, context):
+        time.sleep(segundos)
+        return execute(sql, params, many, context)
+
+    def instalar(sender, connection, **kwargs):
+        # Chamado a cada (re)abertura; a conexão da thread pode ser a mesma
+        if atrasar not in connection.execute_wrappers:
+            connection.execute_wrappers.append(atrasar)
+
+    connection_created.connect(instalar)
+    for connection in connections.all():
+        instalar(None, connection)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(instalar)
+        for connection in connections.all():
+            if atrasar in connection.execute_wrappers:
+                connection.execute_wrappers.remove(atrasar)
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga das leituras públicas: compara o caminho WSGI atual "
+        "(agenda_aberta.wsgi, DRF síncrono em um pool de threads) com o ASGI "
+        "(agenda_aberta.asgi, views de core.async_views) — vazão, pico de "
+        "requisições simultâneas e latência (p50/p95/p99)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=2000, help="Total de requisições por caminho.")
+        parser.add_argument('--concorrencia', type=int, default=200, help="Clientes simultâneos.")
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help="Threads do servidor WSGI (como gunicorn --threads).",
+        )
+        parser.add_argument(
+            '--caminho', default='horarios-publicos/?page_size=20',
+            help="Rota sob /api/ (WSGI) e /api/async/ (ASGI).",
+        )
+        parser.add_argument(
+            '--sem-cache', action='store_true',
+            help="Uma URL diferente por requisição, para não servir do cache de respostas.",
+        )
+        parser.add_argument(
+            '--latencia-db', type=float, default=0,
+            help="Milissegundos acrescentados a cada consulta (simula um banco na rede).",
+        )
+
+    def handle(self, *args, **options):
+        from agenda_aberta.asgi import application as asgi
+        from agenda_aberta.wsgi import application as wsgi
+
+        self.host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost'
+        )
+        caminho = options['caminho'].lstrip('/')
+        total = options['requisicoes']
+
+        def url(prefixo, numero):
+            endereco = f'/api/{prefixo}{caminho}'
+            if options['sem_cache']:
+                endereco += ('&' if '?' in endereco else '?') + f'_carga={numero}'
+            return endereco
+
+        resultados = []
+        with latencia_simulada(options['latencia_db'] / 1000):
+            for nome, executar in (
+                ('WSGI', lambda: self._carga_wsgi(wsgi, [url('', n) for n in range(total)], options)),
+                ('ASGI', lambda: self._carga_asgi(asgi, [url('async/', n) for n in range(total)], options)),
+            ):
+                inicio = time.perf_counter()
+                medicao = asyncio.run(executar())
+                resultados.append((nome, medicao.resumo(time.perf_counter() - inicio)))
+
+        self.stdout.write(
+            f"{total} requisições, {options['concorrencia']} clientes simultâneos, "
+            f"{options['threads']} threads WSGI, latência do banco +{options['latencia_db']:g} ms"
+        )
+        colunas = ['req/s', 'p50', 'p95', 'p99', 'máx', 'pico', 'erros']
+        self.stdout.write('caminho ' + ''.join(f'{coluna:>10}' for coluna in colunas))
+        for nome, resumo in resultados:
+            valores = ''.join(
+                f'{resumo[coluna]:>10.1f}' if isinstance(resumo[coluna], float) else f'{resumo[coluna]:>10}'
+                for coluna in colunas
+            )
+            self.stdout.write(f'{nome:<8}{valores}')
+        self.stdout.write("(latências em ms; pico = requisições em andamento ao mesmo tempo na aplicação)")
+
+    async def _clientes(self, urls, concorrencia, requisitar):
+        """`concorrencia` clientes, cada um fazendo requisições em sequência até esgotar as URLs."""
+        fila = iter(urls)
+
+        async def cliente():
+            for url in fila:
+                await requisitar(url)
+
+        await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+
+    async def _carga_wsgi(self, application, urls, options):
+        medicao = Medicao()
+        host = self.host
+
+        def chamar(url, inicio):
+            caminho, _, query = url.partition('?')
+            environ = {'PATH_INFO': caminho, 'QUERY_STRING': query, 'HTTP_HOST': host, 'wsgi.input': BytesIO()}
+            setup_testing_defaults(environ)
+            status = []
+            medicao.entrar()
+            resposta = application(environ, lambda codigo, cabecalhos, exc_info=None: status.append(codigo))
+            try:
+                b''.join(resposta)
+            finally:
+                if hasattr(resposta, 'close'):
+                    resposta.close()
+            medicao.sair(inicio, int(status[0].split()[0]))
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            # A latência inclui a espera por uma thread livre, como na fila do servidor
+            await self._clientes(
+                urls, options['concorrencia'],
+                lambda url: loop.run_in_executor(pool, chamar, url, time.perf_counter()),
+            )
+        return medicao
+
+    async def _carga_asgi(self, application, urls, options):
+        medicao = Medicao()
+        host = self.host.encode('ascii')
+
+        async def chamar(url):
+            caminho, _, query = url.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': caminho, 'raw_path': caminho.encode('utf-8'),
+                'query_string': query.encode('utf-8'), 'root_path': '',
+                'headers': [(b'host', host)], 'client': ('127.0.0.1', 0), 'server': (self.host, 80),
+            }
+            corpo_enviado = False
+            status = []
+
+            async def receive():
+                nonlocal corpo_enviado
+                if not corpo_enviado:
+                    corpo_enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Cliente nunca desconecta: espera até a aplicação cancelar
+                await asyncio.Future()
+
+            async def send(mensagem):
+                if mensagem['type'] == 'http.response.start':
+                    status.append(mensagem['status'])
+
+            inicio = time.perf_counter()
+            medicao.entrar()
+            await application(scope, receive, send)
+            medicao.sair(inicio, status[0])
+
+        await self._clientes(urls, options['concorrencia'], chamar)
+        return medicao
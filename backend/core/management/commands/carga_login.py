@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.hashing import encerrar_executor
+from core.models import CustomUser
+
+from .carga_leitura import Medicao
+
+USUARIO = '_carga_login'
+SENHA = 'Carga-Login-2024'
+
+
+def resumir(medicao, duracao):
+    # Sem leitores não há latências de leitura a resumir
+    return medicao.resumo(duracao) if medicao.latencias else None
+
+
+def nucleos_disponiveis():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de uma rajada de logins (/api/login/): logins por segundo e por "
+        "núcleo com o hash na thread da requisição e no pool de processos "
+        "(core.hashing), respostas 429, e a latência das leituras públicas feitas "
+        "ao mesmo tempo. Cria um usuário temporário, removido ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help="Total de logins por modo.")
+        parser.add_argument('--concorrencia', type=int, default=32, help="Clientes fazendo login ao mesmo tempo.")
+        parser.add_argument('--leitores', type=int, default=8, help="Clientes navegando nos horários durante a rajada.")
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help="Threads do servidor WSGI (como gunicorn --threads), compartilhadas por logins e leituras.",
+        )
+        parser.add_argument(
+            '--caminho', default='horarios-publicos/?page_size=20', help="Rota de leitura sob /api/.",
+        )
+        parser.add_argument(
+            '--sem-cache', action='store_true',
+            help="Uma URL de leitura diferente por requisição, para não servir do cache de respostas.",
+        )
+
+    def handle(self, *args, **options):
+        from agenda_aberta.wsgi import application
+
+        self.application = application
+        self.host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost'
+        )
+        nucleos = nucleos_disponiveis()
+        processos = settings.AGENDA_HASH_PROCESSOS or max(1, nucleos // 2)
+
+        CustomUser.objects.filter(username=USUARIO).delete()
+        CustomUser.objects.create_user(
+            username=USUARIO, email=f'{USUARIO}@ufersa.edu.br', password=SENHA, tipo='aluno',
+        )
+        try:
+            base = asyncio.run(self._rodada(0, options))[1]
+            resultados = []
+            for modo, quantidade, nucleos_hash in (
+                ('thread', 0, nucleos),
+                ('pool', processos, min(processos, nucleos)),
+            ):
+                with override_settings(AGENDA_HASH_PROCESSOS=quantidade):
+                    inicio = time.perf_counter()
+                    logins, leituras, recusados = asyncio.run(self._rodada(options['logins'], options))
+                    duracao = time.perf_counter() - inicio
+                    encerrar_executor()
+                resultados.append((modo, nucleos_hash, logins.resumo(duracao), resumir(leituras, duracao), recusados))
+        finally:
+            CustomUser.objects.filter(username=USUARIO).delete()
+
+        self.stdout.write(
+            f"{options['logins']} logins, {options['concorrencia']} clientes de login, "
+            f"{options['leitores']} leitores, {options['threads']} threads WSGI, {nucleos} núcleo(s), "
+            f"pool com {processos} processo(s)"
+        )
+        resumo_base = resumir(base, 1)
+        if resumo_base:
+            self.stdout.write(
+                f"leituras sem logins: p50 {resumo_base['p50']:.1f} ms, p95 {resumo_base['p95']:.1f} ms"
+            )
+        colunas = ['logins/s', '/núcleo', 'p50', 'p95', '429', 'leit. p50', 'leit. p95']
+        self.stdout.write('modo    ' + ''.join(f'{coluna:>11}' for coluna in colunas))
+        for modo, nucleos_hash, login, leitura, recusados in resultados:
+            aceitos = login['req/s'] * (1 - recusados / max(1, options['logins']))
+            valores = [
+                aceitos, aceitos / nucleos_hash, login['p50'], login['p95'], recusados,
+                leitura['p50'] if leitura else '-', leitura['p95'] if leitura else '-',
+            ]
+            self.stdout.write(f'{modo:<8}' + ''.join(
+                f'{valor:>11.1f}' if isinstance(valor, float) else f'{valor:>11}' for valor in valores
+            ))
+        self.stdout.write(
+            "(latências em ms; logins/s conta só os aceitos; /núcleo divide pelos núcleos usados no hash; "
+            "429 = recusados pelo pool cheio)"
+        )
+
+    def _chamar(self, metodo, url, corpo=b''):
+        caminho, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': metodo, 'PATH_INFO': caminho, 'QUERY_STRING': query, 'HTTP_HOST': self.host,
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded', 'CONTENT_LENGTH': str(len(corpo)),
+            'wsgi.input': BytesIO(corpo),
+        }
+        setup_testing_defaults(environ)
+        status = []
+        resposta = self.application(environ, lambda codigo, cabecalhos, exc_info=None: status.append(codigo))
+        try:
+            b''.join(resposta)
+        finally:
+            if hasattr(resposta, 'close'):
+                resposta.close()
+        return int(status[0].split()[0])
+
+    async def _rodada(self, total_logins, options):
+        """Rajada de `total_logins` logins com os leitores navegando até ela terminar."""
+        logins, leituras = Medicao(), Medicao()
+        recusados = 0
+        corpo = urlencode({'username': USUARIO, 'password': SENHA}).encode()
+        caminho = options['caminho'].lstrip('/')
+        loop = asyncio.get_running_loop()
+        pendentes = iter(range(total_logins))
+        terminou = asyncio.Event()
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as servidor:
+            async def requisitar(medicao, metodo, url, corpo=b''):
+                # A latência inclui a espera por uma thread livre, como na fila do servidor
+                inicio = time.perf_counter()
+                medicao.entrar()
+                status = await loop.run_in_executor(servidor, self._chamar, metodo, url, corpo)
+                medicao.sair(inicio, status)
+                return status
+
+            async def cliente_login():
+                nonlocal recusados
+                for _ in pendentes:
+                    if await requisitar(logins, 'POST', '/api/login/', corpo) == 429:
+                        recusados += 1
+
+            async def leitor(numero):
+                contador = 0
+                # Sem logins, uma amostra fixa de leituras (linha de base)
+                while (not terminou.is_set()) if total_logins else contador < 50:
+                    url = f'/api/{caminho}'
+                    if options['sem_cache']:
+                        url += ('&' if '?' in url else '?') + f'_carga={numero}-{contador}'
+                    await requisitar(leituras, 'GET', url)
+                    contador += 1
+
+            async def rajada():
+                await asyncio.gather(*(cliente_login() for _ in range(options['concorrencia'])))
+                terminou.set()
+
+            await asyncio.gather(rajada(), *(leitor(numero) for numero in range(options['leitores'])))
+        return logins, leituras, recusados
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sinteticos import PREFIXO, SENHA, GeradorCampus, remover_sinteticos
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera um campus sintético (professores/monitores, disciplinas e horários sem "
+        "conflitos) para testes de desempenho. Determinístico pela semente; os "
+        "registros usam o prefixo de username informado e podem ser removidos com --remover."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--professores', type=int, default=10000)
+        parser.add_argument('--disciplinas', type=int, default=2000)
+        parser.add_argument('--horarios', type=int, default=200000)
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--prefixo', default=PREFIXO, help="Prefixo dos usernames gerados.")
+        parser.add_argument(
+            '--substituir', action='store_true', help="Remove os dados sintéticos anteriores antes de gerar.",
+        )
+        parser.add_argument('--remover', action='store_true', help="Só remove os dados sintéticos.")
+
+    def handle(self, *args, **options):
+        if options['substituir'] or options['remover']:
+            removidos = remover_sinteticos(options['prefixo'])
+            self.stdout.write(f"{removidos} horário(s) sintético(s) removido(s).")
+            if options['remover']:
+                return
+
+        gerador = GeradorCampus(
+            options['professores'], options['disciplinas'], options['horarios'],
+            semente=options['semente'], prefixo=options['prefixo'],
+        )
+        inicio = time.perf_counter()
+        criados = gerador.gerar()
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{criados['professores']} professor(es)/monitor(es), {criados['disciplinas']} disciplina(s) e "
+            f"{criados['horarios']} horário(s) em {duracao:.1f}s (semente {options['semente']})."
+        ))
+        if gerador.descartados:
+            self.stdout.write(
+                f"{gerador.descartados} horário(s) não couberam sem conflito; aumente --professores "
+                "ou reduza --horarios."
+            )
+        self.stdout.write(f"Senha de todos os usuários gerados: {SENHA}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.grid import rematerializar_todas
+
+
+class Command(BaseCommand):
+    help = "Reconstrói todas as grades semanais materializadas (professor, curso e local)."
+
+    def handle(self, *args, **options):
+        total = rematerializar_todas()
+        self.stdout.write(self.style.SUCCESS(f"{total} grade(s) materializada(s)."))
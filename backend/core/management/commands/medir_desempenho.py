@@ -0,0 +1,237 @@
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+
+from core.models import CustomUser, DiaSemana, Disciplina, Horario
+from core.serializers import HorarioPublicSerializer, HorarioSerializer
+
+# Versão do formato do arquivo de resultados
+FORMATO = 1
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _commit():
+    try:
+        saida = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede os caminhos mais usados (listagem pública, busca, cada filtro de "
+        "HorarioFilter, criação de horário com verificação de conflitos, validação "
+        "e serialização) sobre os dados do banco, e grava os resultados em JSON "
+        "para comparar uma execução com outra (--comparar). Para dados em escala, "
+        "use antes o comando gerar_dados_sinteticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=20, help="Medições por caso.")
+        parser.add_argument('--aquecimento', type=int, default=2, help="Execuções descartadas antes de medir.")
+        parser.add_argument('--semente', type=int, default=42, help="Semente da escolha dos parâmetros.")
+        parser.add_argument('--itens', type=int, default=1000, help="Horários serializados no caso de serialização.")
+        parser.add_argument('--saida', default='desempenho.json', help="Arquivo JSON com os resultados.")
+        parser.add_argument('--comparar', help="Resultados anteriores (JSON) para comparar.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=20.0,
+            help="Aumento da mediana (%%) a partir do qual um caso é marcado como regressão.",
+        )
+        parser.add_argument(
+            '--estrito', action='store_true', help="Termina com erro se houver regressão na comparação.",
+        )
+        parser.add_argument(
+            '--com-cache', action='store_true',
+            help="Permite respostas do cache (por padrão cada requisição usa uma URL diferente).",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost'
+        )
+        self.cliente = APIClient(HTTP_HOST=self.host)
+        self.numero = 0
+        amostra = self._amostra(random.Random(options['semente']))
+
+        resultados = {}
+        # Os conflitos (400) esperados em criar_horario não precisam ir para o log
+        registro = logging.getLogger('django.request')
+        nivel = registro.level
+        registro.setLevel(logging.ERROR)
+        try:
+            for nome, caso, itens in self._casos(amostra):
+                resultados[nome] = self._medir(caso, itens)
+                self.stdout.write(f"{nome:<24}{resultados[nome]['mediana_ms']:>10.2f} ms")
+        finally:
+            registro.setLevel(nivel)
+
+        relatorio = {
+            'formato': FORMATO,
+            'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'ambiente': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'banco': connection.vendor,
+                'plataforma': platform.platform(),
+            },
+            'dados': {
+                'professores': CustomUser.objects.filter(tipo__in=('professor', 'monitor')).count(),
+                'disciplinas': Disciplina.objects.count(),
+                'horarios': Horario.objects.count(),
+            },
+            'parametros': {
+                chave: options[chave] for chave in ('repeticoes', 'aquecimento', 'semente', 'itens', 'com_cache')
+            },
+            'resultados': resultados,
+        }
+        with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
+
+        if options['comparar']:
+            regressoes = self._comparar(options['comparar'], resultados)
+            if regressoes and options['estrito']:
+                raise CommandError(f"Regressão em: {', '.join(regressoes)}.")
+
+    def _amostra(self, aleatorio):
+        """Valores reais do banco para os parâmetros dos casos, escolhidos pela semente."""
+        horarios = list(Horario.objects.order_by('pk').values_list('pk', flat=True)[:5000])
+        if not horarios:
+            raise CommandError("Não há horários no banco: gere dados com o comando gerar_dados_sinteticos.")
+        horario = Horario.objects.select_related('disciplina', 'professor_monitor').get(pk=aleatorio.choice(horarios))
+        professor = horario.professor_monitor
+        return SimpleNamespace(
+            professor=professor,
+            disciplina=horario.disciplina,
+            termo_busca=max(horario.disciplina.nome.split(), key=len),
+            professor_nome=' '.join(filter(None, [professor.first_name, professor.last_name.split(' ')[0]])),
+            dia=aleatorio.choice(DiaSemana.labels[:5]),
+            aleatorio=aleatorio,
+        )
+
+    def _casos(self, amostra):
+        """(nome, função, itens por execução)."""
+        def listar(**parametros):
+            return lambda: self._get('/api/horarios-publicos/', parametros)
+
+        casos = [
+            ('lista_publica', listar(), None),
+            ('busca', listar(search=amostra.termo_busca), None),
+            ('filtro_curso', listar(curso=amostra.disciplina.curso), None),
+            ('filtro_disciplina', listar(disciplina=amostra.disciplina.pk), None),
+            ('filtro_professor', listar(professor=amostra.professor.username), None),
+            ('filtro_professor_nome', listar(professor_nome=amostra.professor_nome), None),
+            ('filtro_dia_semana', listar(dia_semana=amostra.dia), None),
+            ('filtro_periodo', listar(periodo='tarde'), None),
+            ('criar_horario', lambda: self._criar(amostra), None),
+            ('validar_horario', lambda: self._validar(amostra), None),
+        ]
+        itens = list(
+            Horario.objects.filter(ativo=True).select_related('disciplina', 'professor_monitor')
+            .order_by('dia_semana', 'hora_inicio', 'id')[:self.options['itens']]
+        )
+        casos.append(('serializacao', lambda: HorarioPublicSerializer(itens, many=True).data, len(itens)))
+        return casos
+
+    def _get(self, caminho, parametros):
+        if not self.options['com_cache']:
+            # Parâmetro ignorado pela API, só para a resposta não vir do cache
+            self.numero += 1
+            parametros = {**parametros, '_desempenho': self.numero}
+        return self.cliente.get(caminho, parametros).status_code
+
+    def _dados_horario(self, amostra):
+        aleatorio = amostra.aleatorio
+        inicio = aleatorio.randint(7, 20)
+        return {
+            'disciplina': amostra.disciplina.pk, 'dia_semana': aleatorio.choice(DiaSemana.labels[:6]),
+            'hora_inicio': f'{inicio:02d}:00', 'hora_fim': f'{inicio + 1:02d}:30',
+            'local': f'Sala {aleatorio.randint(1, 300)}', 'ativo': True,
+        }
+
+    def _criar(self, amostra):
+        # Desfeito ao final: o banco não muda entre as execuções
+        self.cliente.force_authenticate(amostra.professor)
+        try:
+            with transaction.atomic():
+                status = self.cliente.post('/api/horarios/', self._dados_horario(amostra)).status_code
+                transaction.set_rollback(True)
+        finally:
+            self.cliente.force_authenticate(None)
+        return status
+
+    def _validar(self, amostra):
+        serializer = HorarioSerializer(
+            data=self._dados_horario(amostra), context={'request': SimpleNamespace(user=amostra.professor)},
+        )
+        serializer.is_valid()
+
+    def _medir(self, caso, itens):
+        for _ in range(self.options['aquecimento']):
+            caso()
+        tempos, respostas = [], Counter()
+        for _ in range(self.options['repeticoes']):
+            inicio = time.perf_counter()
+            status = caso()
+            tempos.append(time.perf_counter() - inicio)
+            if isinstance(status, int):
+                respostas[str(status)] += 1
+
+        ordenados = sorted(tempos)
+        mediana = statistics.median(ordenados)
+        resultado = {
+            'repeticoes': len(tempos),
+            'mediana_ms': round(mediana * 1000, 3),
+            'p95_ms': round(_percentil(ordenados, 0.95) * 1000, 3),
+            'min_ms': round(ordenados[0] * 1000, 3),
+            'media_ms': round(statistics.fmean(ordenados) * 1000, 3),
+            'ops_s': round(1 / mediana, 2) if mediana else None,
+        }
+        if itens is not None:
+            resultado['itens_s'] = round(itens / mediana, 1) if mediana else None
+        if respostas:
+            resultado['respostas'] = dict(respostas)
+        return resultado
+
+    def _comparar(self, caminho, resultados):
+        """Mostra a variação da mediana de cada caso; retorna os casos com regressão."""
+        with open(caminho, encoding='utf-8') as arquivo:
+            anteriores = json.load(arquivo).get('resultados', {})
+        tolerancia = self.options['tolerancia']
+        regressoes = []
+        self.stdout.write(f"\nComparação com {caminho} (mediana, ms):")
+        for nome, resultado in resultados.items():
+            anterior = anteriores.get(nome)
+            if not anterior or not anterior.get('mediana_ms'):
+                self.stdout.write(f"{nome:<24}{'-':>10}{resultado['mediana_ms']:>10.2f}   (novo)")
+                continue
+            variacao = (resultado['mediana_ms'] - anterior['mediana_ms']) / anterior['mediana_ms'] * 100
+            marca = ''
+            if variacao > tolerancia:
+                regressoes.append(nome)
+                marca = '   REGRESSÃO'
+            self.stdout.write(
+                f"{nome:<24}{anterior['mediana_ms']:>10.2f}{resultado['mediana_ms']:>10.2f}{variacao:>+9.1f}%{marca}"
+            )
+        return regressoes
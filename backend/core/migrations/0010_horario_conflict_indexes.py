@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alter_customuser_managers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='horario',
+            name='core_horari_local_3a5060_idx',
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['local', 'dia_semana', 'hora_inicio', 'hora_fim'], name='horario_local_intervalo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['professor_monitor', 'dia_semana', 'hora_inicio', 'hora_fim'], name='horario_prof_intervalo_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_horario_conflict_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disciplina',
+            name='ultima_atualizacao',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_disciplina_ultima_atualizacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeSemanal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('professor', 'Professor/Monitor'), ('curso', 'Curso'), ('local', 'Local')], max_length=10)),
+                ('chave', models.CharField(max_length=100)),
+                ('dados', models.JSONField()),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'chave'), name='grade_semanal_tipo_chave_unica')],
+            },
+        ),
+    ]
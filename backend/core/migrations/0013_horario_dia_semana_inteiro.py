@@ -0,0 +1,100 @@
+import unicodedata
+
+from django.db import migrations, models
+
+import core.models
+
+# Cópia congelada de DiaSemana: a migração não deve depender do código atual
+ROTULOS = (
+    'Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira',
+    'Sexta-feira', 'Sábado', 'Domingo',
+)
+
+
+def _normalizar(valor):
+    texto = unicodedata.normalize('NFKD', str(valor)).encode('ascii', 'ignore').decode('ascii')
+    texto = texto.strip().lower()
+    return texto[:-len('-feira')] if texto.endswith('-feira') else texto
+
+
+def converter_para_inteiro(apps, schema_editor):
+    """Converte 'Segunda-feira', 'segunda', 'Terça'... no número do dia (0 = segunda)."""
+    Horario = apps.get_model('core', 'Horario')
+    numeros = {_normalizar(rotulo): numero for numero, rotulo in enumerate(ROTULOS)}
+    textos = Horario.objects.values_list('dia_semana', flat=True).distinct()
+
+    invalidos = []
+    for texto in textos:
+        numero = numeros.get(_normalizar(texto))
+        if numero is None:
+            invalidos.append(texto)
+            continue
+        Horario.objects.filter(dia_semana=texto).update(dia_semana_numero=numero)
+    if invalidos:
+        raise ValueError(f"Dias da semana não reconhecidos: {', '.join(map(repr, invalidos))}")
+
+
+def converter_para_texto(apps, schema_editor):
+    Horario = apps.get_model('core', 'Horario')
+    for numero, rotulo in enumerate(ROTULOS):
+        Horario.objects.filter(dia_semana_numero=numero).update(dia_semana=rotulo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_grade_semanal'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='horario',
+            name='core_horari_dia_sem_e1de28_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='horario',
+            name='horario_local_intervalo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='horario',
+            name='horario_prof_intervalo_idx',
+        ),
+        migrations.AddField(
+            model_name='horario',
+            name='dia_semana_numero',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # Nulo durante a conversão para que a migração também possa ser revertida
+        migrations.AlterField(
+            model_name='horario',
+            name='dia_semana',
+            field=models.CharField(max_length=20, null=True),
+        ),
+        migrations.RunPython(converter_para_inteiro, converter_para_texto),
+        migrations.RemoveField(
+            model_name='horario',
+            name='dia_semana',
+        ),
+        migrations.RenameField(
+            model_name='horario',
+            old_name='dia_semana_numero',
+            new_name='dia_semana',
+        ),
+        migrations.AlterField(
+            model_name='horario',
+            name='dia_semana',
+            field=core.models.DiaSemanaField(choices=[(0, 'Segunda-feira'), (1, 'Terça-feira'), (2, 'Quarta-feira'), (3, 'Quinta-feira'), (4, 'Sexta-feira'), (5, 'Sábado'), (6, 'Domingo')]),
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['dia_semana', 'hora_inicio'], name='horario_dia_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['local', 'dia_semana', 'hora_inicio', 'hora_fim'], name='horario_local_intervalo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['professor_monitor', 'dia_semana', 'hora_inicio', 'hora_fim'], name='horario_prof_intervalo_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(texto.lower().split())
+
+
+def preencher_texto_busca(apps, schema_editor):
+    """Preenche texto_busca dos horários existentes (o índice de texto vem na migração 0017)."""
+    Horario = apps.get_model('core', 'Horario')
+    linhas = Horario.objects.values_list(
+        'pk', 'disciplina__nome', 'disciplina__codigo', 'professor_monitor__username',
+        'professor_monitor__first_name', 'professor_monitor__last_name', 'local',
+    )
+    atualizados = [
+        Horario(pk=pk, texto_busca=_normalizar(' '.join(parte for parte in partes if parte)))
+        for pk, *partes in linhas
+    ]
+    Horario.objects.bulk_update(atualizados, ['texto_busca'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_horario_dia_semana_inteiro'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horario',
+            name='texto_busca',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(preencher_texto_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(texto.lower().split())
+
+
+def preencher_nome_busca(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    usuarios = CustomUser.objects.only('pk', 'username', 'first_name', 'last_name')
+    atualizados = []
+    for usuario in usuarios:
+        usuario.nome_busca = (
+            _normalizar(f"{usuario.first_name} {usuario.last_name}") or _normalizar(usuario.username)
+        )
+        atualizados.append(usuario)
+    CustomUser.objects.bulk_update(atualizados, ['nome_busca'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_horario_texto_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='nome_busca',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=301),
+        ),
+        migrations.RunPython(preencher_nome_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:35
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def verificar_repetidos_sem_caixa(apps, schema_editor):
+    """
+    Antes, só o cadastro da API barrava nomes e emails iguais sem diferenciar
+    maiúsculas; o admin e o createsuperuser não. Se houver repetidos, os
+    índices abaixo não podem ser criados: interrompe com a lista deles.
+    """
+    CustomUser = apps.get_model('core', 'CustomUser')
+    usuarios = CustomUser.objects.using(schema_editor.connection.alias)
+    problemas = []
+    for campo in ('username', 'email'):
+        linhas = usuarios.exclude(**{campo: ''}) if campo == 'email' else usuarios
+        repetidos = (
+            linhas.annotate(valor=Lower(campo)).values('valor')
+            .annotate(total=Count('pk')).filter(total__gt=1).values_list('valor', flat=True)
+        )
+        for valor in repetidos:
+            contas = linhas.annotate(valor=Lower(campo)).filter(valor=valor).order_by('pk')
+            problemas.append(f"{campo} '{valor}': " + ', '.join(f"id {pk} ({nome})" for pk, nome in contas.values_list('pk', 'username')))
+    if problemas:
+        raise RuntimeError(
+            "Há usuários com username ou email iguais sem diferenciar maiúsculas, o que os novos "
+            "índices únicos não permitem. Altere ou remova os repetidos (ex: pelo admin) e rode o "
+            "migrate de novo:\n  " + '\n  '.join(problemas)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0015_customuser_nome_busca'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_repetidos_sem_caixa, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('username'), name='usuario_username_ci_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='usuario_email_ci_unico'),
+        ),
+    ]
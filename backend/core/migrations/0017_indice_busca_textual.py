@@ -0,0 +1,58 @@
+from django.db import migrations
+
+from core.operations import RunSQLOpcional
+
+# Cópia congelada dos nomes de core.search: a migração não deve depender do código atual
+TABELA_FTS = 'core_horario_busca'
+INDICE_TRIGRAMA = 'core_horario_busca_trgm'
+
+# FTS5 com conteúdo externo (a própria core_horario), mantido por gatilhos.
+# O tokenizador trigram permite busca por trechos ('alc' encontra 'calculo');
+# como texto_busca já é normalizado, a busca também ignora acentos.
+#
+# No SQLite, migrações que recriam a tabela core_horario (AlterField,
+# RemoveField...) descartam os gatilhos: repita GATILHOS_FTS5 e o 'rebuild'
+# depois delas.
+TABELA_FTS5 = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        texto_busca, content='core_horario', content_rowid='id', tokenize='trigram'
+    )""",
+]
+GATILHOS_FTS5 = [
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON core_horario BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, texto_busca) VALUES (new.id, new.texto_busca);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON core_horario BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, texto_busca) VALUES ('delete', old.id, old.texto_busca);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF texto_busca ON core_horario BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, texto_busca) VALUES ('delete', old.id, old.texto_busca);
+        INSERT INTO {TABELA_FTS}(rowid, texto_busca) VALUES (new.id, new.texto_busca);
+    END""",
+    # Indexa as linhas já existentes
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+REMOVER_FTS5 = [
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+    f"DROP TABLE IF EXISTS {TABELA_FTS}",
+]
+
+TRIGRAMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} ON core_horario USING gin (texto_busca gin_trgm_ops)",
+]
+REMOVER_TRIGRAMA = [f"DROP INDEX IF EXISTS {INDICE_TRIGRAMA}"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_customuser_unicidade_sem_caixa'),
+    ]
+
+    operations = [
+        RunSQLOpcional('sqlite', TABELA_FTS5 + GATILHOS_FTS5, REMOVER_FTS5),
+        RunSQLOpcional('postgresql', TRIGRAMA, REMOVER_TRIGRAMA),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+from core.operations import RunSQLOpcional
+
+# Cópia congelada dos nomes de core.search: a migração não deve depender do código atual
+TABELA_FTS = 'core_usuario_nome_busca'
+INDICE_TRIGRAMA = 'core_usuario_nome_busca_trgm'
+
+# O filtro professor_nome procura trechos do nome (LIKE '%termo%'), que o
+# índice B-tree de nome_busca não atende: ele é trocado por um índice de texto
+# como o de core_horario.texto_busca (0017). Os gatilhos vêm depois do
+# AlterField, que no SQLite recria a tabela core_customuser.
+TABELA_FTS5 = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        nome_busca, content='core_customuser', content_rowid='id', tokenize='trigram'
+    )""",
+]
+GATILHOS_FTS5 = [
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON core_customuser BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, nome_busca) VALUES (new.id, new.nome_busca);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON core_customuser BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome_busca) VALUES ('delete', old.id, old.nome_busca);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF nome_busca ON core_customuser BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, nome_busca) VALUES ('delete', old.id, old.nome_busca);
+        INSERT INTO {TABELA_FTS}(rowid, nome_busca) VALUES (new.id, new.nome_busca);
+    END""",
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+REMOVER_FTS5 = [
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+    f"DROP TABLE IF EXISTS {TABELA_FTS}",
+]
+
+TRIGRAMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} ON core_customuser USING gin (nome_busca gin_trgm_ops)",
+]
+REMOVER_TRIGRAMA = [f"DROP INDEX IF EXISTS {INDICE_TRIGRAMA}"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_indice_busca_textual'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='nome_busca',
+            field=models.CharField(blank=True, default='', editable=False, max_length=301),
+        ),
+        RunSQLOpcional('sqlite', TABELA_FTS5 + GATILHOS_FTS5, REMOVER_FTS5),
+        RunSQLOpcional('postgresql', TRIGRAMA, REMOVER_TRIGRAMA),
+    ]
@@ -1,11 +1,111 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.core import exceptions
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 from django.db.models import Q, CheckConstraint
 from django.db.models import Q, CheckConstraint
+from django.db.models.functions import Lower
 from django.utils import timezone
+from .hashing import calcular_hash, verificar_senha
 from .managers import CustomUserManager
+from .utils import normalizar_texto
 
-class CustomUser(AbstractUser):
+class DiaSemana(models.IntegerChoices):
+    """Dias da semana na ordem da grade (0 = segunda, como date.weekday())."""
+    SEGUNDA = 0, 'Segunda-feira'
+    TERCA = 1, 'Terça-feira'
+    QUARTA = 2, 'Quarta-feira'
+    QUINTA = 3, 'Quinta-feira'
+    SEXTA = 4, 'Sexta-feira'
+    SABADO = 5, 'Sábado'
+    DOMINGO = 6, 'Domingo'
+
+    @classmethod
+    def de_texto(cls, valor):
+        """
+        Converte o rótulo ('Terça-feira'), a forma curta ('terca', 'Terça')
+        ou o número (1, '1') no dia correspondente. Retorna None se inválido.
+        """
+        if isinstance(valor, int):
+            return cls(valor) if valor in cls.values else None
+        texto = _normalizar_dia(valor)
+        if texto.isdigit():
+            return cls.de_texto(int(texto))
+        return _DIAS_POR_TEXTO.get(texto)
+
+
+def _normalizar_dia(valor):
+    texto = normalizar_texto(valor)
+    return texto[:-len('-feira')] if texto.endswith('-feira') else texto
+
+
+_DIAS_POR_TEXTO = {_normalizar_dia(dia.label): dia for dia in DiaSemana}
+
+
+class DiaSemanaDescriptor(DeferredAttribute):
+    """Normaliza o valor atribuído ('Segunda-feira', 'segunda', 0...) para DiaSemana."""
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = self.field.to_python(value)
+
+
+class DiaSemanaField(models.PositiveSmallIntegerField):
+    """
+    Dia da semana gravado como inteiro (0 = segunda ... 6 = domingo), o que
+    permite ordenar pela semana no banco e deixa índices e comparações baratos.
+    Aceita também os rótulos em português em atribuições e consultas.
+    """
+    descriptor_class = DiaSemanaDescriptor
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', DiaSemana.choices)
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, DiaSemana):
+            return value
+        dia = DiaSemana.de_texto(value)
+        if dia is None:
+            raise exceptions.ValidationError(f"Dia da semana inválido: {value}", code='invalid')
+        return dia
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else DiaSemana(value)
+
+    def get_prep_value(self, value):
+        value = self.to_python(value)
+        return None if value is None else int(value)
+
+
+class RastreiaAlteracoesMixin:
+    """
+    Guarda os valores de `campos_rastreados` como estavam no banco, para que
+    os sinais de post_save saibam quais escopos (dia, sala, curso...) deixaram
+    de valer quando um registro muda.
+    """
+    campos_rastreados = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._registrar_originais()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._registrar_originais()
+
+    def _registrar_originais(self):
+        carregados = self.__dict__
+        self._valores_originais = {
+            campo: carregados[campo] for campo in self.campos_rastreados if campo in carregados
+        }
+
+    def valores_originais(self):
+        """Valores rastreados como estavam no banco (vazio para registros novos)."""
+        return getattr(self, '_valores_originais', {})
+
+
+class CustomUser(RastreiaAlteracoesMixin, AbstractUser):
     TIPO_USUARIO_CHOICES = (
         ("aluno", "Aluno"),
         ("professor", "Professor"),
@@ -30,22 +130,59 @@ class CustomUser(AbstractUser):
         related_name="customuser_set",
         related_query_name="user",
     )
+    # Nome exibido (nome completo ou, na falta dele, o username) em minúsculas e
+    # sem acentos, usado pelo filtro professor_nome (core.filters). O índice é
+    # o de texto (core.search): um índice B-tree não atende LIKE '%termo%'
+    nome_busca = models.CharField(max_length=301, blank=True, default='', editable=False)
     objects = CustomUserManager()
 
+    campos_rastreados = ('username', 'first_name', 'last_name')
+
     class Meta:
         constraints = [
             CheckConstraint(
                 check=Q(tipo__in=["aluno", "professor", "monitor"]),
                 name="tipo_usuario_valido",
-            )
+            ),
+            # Unicidade sem diferenciar maiúsculas: o cadastro só faz o INSERT e
+            # traduz a violação (UserSerializer), sem consultas antes
+            models.UniqueConstraint(Lower('username'), name='usuario_username_ci_unico'),
+            models.UniqueConstraint(Lower('email'), condition=~Q(email=''), name='usuario_email_ci_unico'),
         ]
 
-class Disciplina(models.Model):
+    def montar_nome_busca(self):
+        return normalizar_texto(f"{self.first_name} {self.last_name}") or normalizar_texto(self.username)
+
+    def set_password(self, raw_password):
+        # O hash é calculado no pool de processos (core.hashing), fora da thread da requisição
+        self.password = calcular_hash(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        valida, hash_novo = verificar_senha(raw_password, self.password)
+        if hash_novo:
+            # Hash com parâmetros antigos: regrava com os atuais, já calculado no pool
+            self.password = hash_novo
+            self._password = None
+            self.save(update_fields=['password'])
+        return valida
+
+    def save(self, *args, **kwargs):
+        self.nome_busca = self.montar_nome_busca()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.campos_rastreados):
+            kwargs['update_fields'] = {*update_fields, 'nome_busca'}
+        super().save(*args, **kwargs)
+
+class Disciplina(RastreiaAlteracoesMixin, models.Model):
     nome = models.CharField(max_length=100)
     curso = models.CharField(max_length=100)
     codigo = models.CharField(max_length=20, unique=True, default='TEMP0000')  # Temporary default
     semestre = models.IntegerField(default=1)  # Temporary default
     ativo = models.BooleanField(default=True)
+    ultima_atualizacao = models.DateTimeField(auto_now=True)
+
+    campos_rastreados = ('curso',)
     
     class Meta:
         indexes = [
@@ -58,27 +195,84 @@ class Disciplina(models.Model):
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
 
-class Horario(models.Model):
+class Horario(RastreiaAlteracoesMixin, models.Model):
     professor_monitor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='horarios')
     disciplina = models.ForeignKey(Disciplina, on_delete=models.CASCADE, related_name='horarios')
-    dia_semana = models.CharField(max_length=20)
+    dia_semana = DiaSemanaField()
     hora_inicio = models.TimeField()
     hora_fim = models.TimeField()
     local = models.CharField(max_length=100)
     ultima_atualizacao = models.DateTimeField(auto_now=True)
     data_criacao = models.DateTimeField(auto_now_add=True)
     ativo = models.BooleanField(default=True)
+    # Disciplina, professor e local normalizados, indexados pela busca (core.search)
+    texto_busca = models.TextField(blank=True, default='', editable=False)
+
+    campos_rastreados = ('professor_monitor_id', 'disciplina_id', 'dia_semana', 'local')
 
     class Meta:
         indexes = [
-            models.Index(fields=['dia_semana']),
+            # Ordem da grade semanal (listagens e paginação por cursor)
+            models.Index(fields=['dia_semana', 'hora_inicio'], name='horario_dia_hora_idx'),
             models.Index(fields=['hora_inicio']),
             models.Index(fields=['hora_fim']),
-            models.Index(fields=['local']),
             models.Index(fields=['ativo']),
             models.Index(fields=['ultima_atualizacao']),
+            # Índices compostos usados na detecção de conflitos (core.conflicts).
+            # O índice por sala também atende às buscas apenas por 'local'.
+            models.Index(
+                fields=['local', 'dia_semana', 'hora_inicio', 'hora_fim'],
+                name='horario_local_intervalo_idx',
+            ),
+            models.Index(
+                fields=['professor_monitor', 'dia_semana', 'hora_inicio', 'hora_fim'],
+                name='horario_prof_intervalo_idx',
+            ),
         ]
 
+    @staticmethod
+    def compor_texto_busca(disciplina_nome, disciplina_codigo, username, first_name, last_name, local):
+        return normalizar_texto(' '.join(
+            parte for parte in (disciplina_nome, disciplina_codigo, username, first_name, last_name, local) if parte
+        ))
+
+    def montar_texto_busca(self):
+        professor = self.professor_monitor
+        return self.compor_texto_busca(
+            self.disciplina.nome, self.disciplina.codigo,
+            professor.username, professor.first_name, professor.last_name, self.local,
+        )
+
+    def save(self, *args, **kwargs):
+        self.texto_busca = self.montar_texto_busca()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'texto_busca'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return f"{self.professor_monitor.username} - {self.dia_semana} ({self.hora_inicio}-{self.hora_fim})"
+        return f"{self.professor_monitor.username} - {self.get_dia_semana_display()} ({self.hora_inicio}-{self.hora_fim})"
+
+
+class GradeSemanal(models.Model):
+    """
+    Grade semanal materializada de um professor/monitor, curso ou local.
+    Mantida por core.grid a cada alteração de horário; a leitura é uma busca
+    pela chave (tipo, chave).
+    """
+    TIPO_CHOICES = (
+        ("professor", "Professor/Monitor"),
+        ("curso", "Curso"),
+        ("local", "Local"),
+    )
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    chave = models.CharField(max_length=100)
+    dados = models.JSONField()
+    atualizado_em = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'chave'], name='grade_semanal_tipo_chave_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}: {self.chave}"
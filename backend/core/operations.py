@@ -0,0 +1,38 @@
+"""Operações de migração próprias do projeto."""
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RunSQLOpcional(migrations.RunSQL):
+    """
+    RunSQL aplicado só no banco `vendor`. Se o banco não suportar o índice
+    (SQLite sem FTS5, PostgreSQL sem permissão para o pg_trgm), a migração
+    segue sem ele e a busca usa o backend básico (ver core.search).
+    """
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        nome, args, kwargs = super().deconstruct()
+        return nome, [self.vendor, *args], kwargs
+
+    def _executar(self, schema_editor, sqls):
+        if schema_editor.connection.vendor != self.vendor:
+            return
+        try:
+            # Savepoint: no PostgreSQL um erro invalidaria o resto da transação
+            with transaction.atomic(using=schema_editor.connection.alias):
+                self._run_sql(schema_editor, sqls)
+        except DatabaseError as exc:
+            logger.warning("Índice de busca indisponível (%s): %s", self.vendor, exc)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._executar(schema_editor, self.sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._executar(schema_editor, self.reverse_sql)
@@ -0,0 +1,307 @@
+import json
+import sys
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (keyset/cursor) sobre uma tupla de colunas ordenadas.
+
+    Em vez de OFFSET, cada página é obtida com um filtro do tipo
+    "(a, b, id) > (ultimo_a, ultimo_b, ultimo_id)", de modo que o custo de cada
+    página não cresce com o tamanho da tabela. O cursor é opaco para o cliente
+    (JSON codificado em base64) e o último campo da ordenação deve ser único.
+
+    Ordenações por valores que mudam com o resto da tabela (ex: a relevância
+    de uma busca) não servem de chave: nelas (ver usa_deslocamento) o cursor
+    guarda apenas a posição na lista, como um OFFSET.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    # Campos da chave de ordenação (prefixo '-' para ordem decrescente)
+    ordering = ('id',)
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'AGENDA_PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'AGENDA_MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, posicao, reverso = self._preparar_pagina(queryset, request, view)
+        return self._concluir_pagina(list(queryset), posicao, reverso)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Mesma paginação, lendo a página pelo ORM assíncrono (core.async_views)."""
+        queryset, posicao, reverso = self._preparar_pagina(queryset, request, view)
+        return self._concluir_pagina([item async for item in queryset], posicao, reverso)
+
+    def usa_deslocamento(self, request, queryset, view):
+        """Pagina por deslocamento (OFFSET) em vez de chave."""
+        return False
+
+    def _preparar_pagina(self, queryset, request, view):
+        """Ordena e filtra o queryset a partir do cursor; retorna (fatia, posicao, reverso)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_atual = self.get_page_size(request)
+        self.ordering_atual = self.get_ordering(request, queryset, view)
+
+        self.deslocamento = None
+        if self.usa_deslocamento(request, queryset, view):
+            self.deslocamento = self.decode_deslocamento(request)
+            inicio = self.deslocamento
+            return queryset.order_by(*self.ordering_atual)[inicio:inicio + self.page_size_atual + 1], None, False
+
+        posicao, reverso = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering_atual
+        if reverso:
+            ordering = [self._inverter(campo) for campo in ordering]
+        queryset = queryset.order_by(*ordering)
+
+        if posicao is not None:
+            queryset = queryset.filter(self._filtro_apos(ordering, posicao))
+        # Uma linha a mais para saber se há próxima página
+        return queryset[:self.page_size_atual + 1], posicao, reverso
+
+    def _concluir_pagina(self, resultados, posicao, reverso):
+        ha_mais = len(resultados) > self.page_size_atual
+        self.page = resultados[:self.page_size_atual]
+
+        if self.deslocamento is not None:
+            self.has_next = ha_mais
+            self.has_previous = self.deslocamento > 0
+        elif reverso:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = ha_mais
+        else:
+            self.has_next = ha_mais
+            self.has_previous = posicao is not None and bool(self.page)
+
+        return self.page
+
+    def get_page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            tamanho = int(valor)
+        except ValueError:
+            return self.page_size
+        if tamanho <= 0:
+            return self.page_size
+        return min(tamanho, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Usa a ordenação pedida em ?ordering= (validada pelo OrderingFilter da
+        view) ou a ordenação padrão da chave. O 'id' é sempre o desempate final.
+        """
+        ordering = list(self.get_ordering_padrao(queryset))
+        backends = getattr(view, 'filter_backends', []) if view is not None else []
+        ordering_filter = next((b for b in backends if issubclass(b, OrderingFilter)), None)
+
+        if ordering_filter is not None and request.query_params.get(ordering_filter.ordering_param):
+            ordering = list(ordering_filter().get_ordering(request, queryset, view) or [])
+
+        if not ordering or ordering[-1].lstrip('-') != 'id':
+            ordering = [campo for campo in ordering if campo.lstrip('-') != 'id'] + ['id']
+        return ordering
+
+    def get_ordering_padrao(self, queryset):
+        return self.ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        if self.deslocamento is not None:
+            return self._url_do_cursor({'o': self.deslocamento + len(self.page)})
+        return self.encode_cursor(self._posicao(self.page[-1]), reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        if self.deslocamento is not None:
+            return self._url_do_cursor({'o': max(0, self.deslocamento - self.page_size_atual)})
+        return self.encode_cursor(self._posicao(self.page[0]), reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor opaco da página.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Quantidade de resultados por página.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def encode_cursor(self, posicao, reverso):
+        return self._url_do_cursor({'p': posicao, 'r': int(reverso)})
+
+    def _url_do_cursor(self, dados):
+        payload = json.dumps(dados, separators=(',', ':'))
+        cursor = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        url = replace_query_param(self.base_url, self.cursor_query_param, cursor)
+        if self.page_size_query_param not in self.request.query_params:
+            url = remove_query_param(url, self.page_size_query_param)
+        return url
+
+    def _ler_cursor(self, request):
+        """O JSON do cursor da requisição, ou None se não houver cursor."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            return json.loads(urlsafe_b64decode(cursor + padding).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def decode_deslocamento(self, request):
+        """Posição (OFFSET) a partir do cursor da requisição."""
+        payload = self._ler_cursor(request)
+        if payload is None:
+            return 0
+        deslocamento = payload.get('o') if isinstance(payload, dict) else None
+        if not isinstance(deslocamento, int) or isinstance(deslocamento, bool) or deslocamento < 0:
+            raise NotFound(self.invalid_cursor_message)
+        # OFFSET e LIMIT (deslocamento + página) precisam caber em um inteiro de 64 bits no banco
+        if deslocamento > sys.maxsize - self.max_page_size - 1:
+            raise NotFound(self.invalid_cursor_message)
+        return deslocamento
+
+    def decode_cursor(self, request, modelo=None):
+        """
+        Retorna (posicao, reverso) a partir do cursor da requisição, com cada
+        valor convertido pelo campo de `modelo` usado na ordenação: um cursor
+        adulterado vira "Cursor inválido." em vez de um erro na consulta.
+        """
+        payload = self._ler_cursor(request)
+        if payload is None:
+            return None, False
+        try:
+            posicao = payload['p']
+            reverso = bool(payload.get('r', 0))
+        except (TypeError, KeyError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(posicao, list) or len(posicao) != len(self.ordering_atual):
+            raise NotFound(self.invalid_cursor_message)
+        return [self._valor_do_cursor(modelo, campo, valor) for campo, valor in zip(self.ordering_atual, posicao)], reverso
+
+    def _valor_do_cursor(self, modelo, campo, valor):
+        if valor is None:
+            raise NotFound(self.invalid_cursor_message)
+        campo_modelo = self._campo_do_modelo(modelo, campo.lstrip('-'))
+        try:
+            if campo_modelo is not None:
+                valor = campo_modelo.to_python(valor)
+            elif not isinstance(valor, (int, float, str)):
+                # Anotação (sem campo no modelo): só valores escalares
+                raise TypeError(valor)
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Inteiros além de 64 bits não chegam ao banco (OverflowError)
+        if isinstance(valor, int) and not -sys.maxsize - 1 <= valor <= sys.maxsize:
+            raise NotFound(self.invalid_cursor_message)
+        return valor
+
+    @staticmethod
+    def _campo_do_modelo(modelo, nome):
+        """O campo de `nome` (com relações: 'disciplina__nome'), ou None se não for um campo."""
+        campo = None
+        for parte in nome.split('__'):
+            if modelo is None:
+                return None
+            try:
+                campo = modelo._meta.get_field(parte)
+            except FieldDoesNotExist:
+                return None
+            modelo = campo.related_model
+        return campo
+
+    def _posicao(self, item):
+        """Extrai os valores da chave de um objeto ou de um dicionário (values())."""
+        posicao = []
+        for campo in self.ordering_atual:
+            nome = campo.lstrip('-')
+            valor = item[nome] if isinstance(item, dict) else getattr(item, nome)
+            if isinstance(valor, (datetime, date, time)):
+                valor = valor.isoformat()
+            posicao.append(valor)
+        return posicao
+
+    @staticmethod
+    def _inverter(campo):
+        return campo[1:] if campo.startswith('-') else '-' + campo
+
+    @staticmethod
+    def _filtro_apos(ordering, posicao):
+        """
+        Monta o predicado "linha vem depois de posicao" para uma chave composta:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        filtro = Q()
+        iguais = {}
+        for campo, valor in zip(ordering, posicao):
+            nome = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= Q(**iguais, **{f'{nome}__{operador}': valor})
+            iguais[nome] = valor
+        return filtro
+
+
+class HorarioKeysetPagination(KeysetPagination):
+    """
+    Paginação dos horários na ordem da grade semanal:
+    (dia da semana, hora de início, id), atendida pelo índice horario_dia_hora_idx.
+    """
+    ordering = ('dia_semana', 'hora_inicio', 'id')
+
+    def get_ordering_padrao(self, queryset):
+        # Em buscas ranqueadas (core.search), os mais relevantes vêm primeiro
+        if 'busca_rank' in queryset.query.annotations:
+            return ('busca_rank', 'id')
+        return super().get_ordering_padrao(queryset)
+
+    def usa_deslocamento(self, request, queryset, view):
+        # A relevância (bm25, similaridade) muda quando outros horários entram no
+        # índice: como chave, a próxima página poderia pular ou repetir linhas
+        return self.ordering_atual[0] == 'busca_rank'
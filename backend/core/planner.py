@@ -0,0 +1,243 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+# Caminho da raiz do queryset (o próprio modelo da view)
+RAIZ = ''
+
+
+def juntar_caminho(*partes):
+    return '__'.join(parte for parte in partes if parte)
+
+
+class PlanoConsulta:
+    """
+    O que um serializer lê do banco: relações para select_related (FK e
+    one-to-one, resolvidas no mesmo JOIN), relações para prefetch_related
+    (reversas e many-to-many, uma consulta extra por relação, não por linha)
+    e as colunas usadas de cada modelo, para o only().
+
+    Em `colunas`, cada caminho de relação ('' é o modelo da raiz) aponta para
+    o conjunto de campos lidos ou para None quando algum campo não pôde ser
+    resolvido (uma property, um SerializerMethodField sem campos_consulta):
+    nesse caso o modelo é carregado inteiro, que é sempre seguro.
+    """
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = {}
+        self.colunas = {RAIZ: set()}
+
+    def usar_coluna(self, caminho, campo):
+        if self.colunas.get(caminho, set()) is not None:
+            self.colunas.setdefault(caminho, set()).add(campo)
+
+    def carregar_inteiro(self, caminho):
+        self.colunas[caminho] = None
+
+    def campos_only(self):
+        """Argumentos para only(), ou None se o modelo da raiz vai inteiro."""
+        if self.colunas[RAIZ] is None:
+            return None
+        campos = set()
+        for caminho, nomes in self.colunas.items():
+            if caminho and caminho not in self.select_related:
+                continue
+            if nomes is None:
+                # Relação carregada inteira: basta citá-la no only()
+                campos.add(caminho)
+            else:
+                campos.update(juntar_caminho(caminho, nome) for nome in nomes)
+        return sorted(campos)
+
+    def aplicar(self, queryset, colunas=True):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related.values())
+        campos = self.campos_only() if colunas else None
+        if campos:
+            queryset = queryset.only(*campos)
+        return queryset
+
+
+def _resolver(plano, modelo, caminho, atributos):
+    """
+    Percorre um caminho de atributos ('disciplina', 'nome') a partir de
+    `modelo`, registrando JOINs e colunas. Retorna (modelo, caminho) da última
+    relação atravessada, ou None se o caminho sai do banco ou cai num prefetch.
+    """
+    for atributo in atributos:
+        try:
+            campo = modelo._meta.get_field(atributo)
+        except FieldDoesNotExist:
+            plano.carregar_inteiro(caminho)
+            return None
+
+        if not campo.is_relation:
+            plano.usar_coluna(caminho, campo.name)
+            return None
+
+        if campo.many_to_many or campo.one_to_many:
+            destino = juntar_caminho(caminho, campo.name if campo.concrete else campo.get_accessor_name())
+            plano.prefetch_related.setdefault(destino, destino)
+            return None
+
+        if not campo.concrete:
+            # One-to-one reverso: também vai no JOIN
+            plano.select_related.add(juntar_caminho(caminho, atributo))
+        else:
+            plano.usar_coluna(caminho, campo.name)
+            plano.select_related.add(juntar_caminho(caminho, campo.name))
+        caminho = juntar_caminho(caminho, atributo)
+        modelo = campo.related_model
+    return modelo, caminho
+
+
+def _planejar_serializer(plano, serializer, modelo, caminho):
+    """Registra no plano o que cada campo de leitura do serializer acessa."""
+    meta = getattr(serializer, 'Meta', None)
+    campos_consulta = getattr(meta, 'campos_consulta', {})
+    plano.colunas.setdefault(caminho, set())
+    # A chave primária sempre vem (o only() a inclui de qualquer forma)
+    plano.usar_coluna(caminho, modelo._meta.pk.name)
+
+    for nome, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+
+        if isinstance(campo, serializers.SerializerMethodField):
+            if nome not in campos_consulta:
+                plano.carregar_inteiro(caminho)
+            for dependencia in campos_consulta.get(nome, ()):
+                _resolver(plano, modelo, caminho, dependencia.split('__'))
+            continue
+
+        if campo.source == '*':
+            if isinstance(campo, serializers.BaseSerializer):
+                _planejar_serializer(plano, campo, modelo, caminho)
+            else:
+                plano.carregar_inteiro(caminho)
+            continue
+
+        if isinstance(campo, serializers.ListSerializer):
+            _planejar_lista(plano, campo, modelo, caminho)
+            continue
+
+        if isinstance(campo, ManyRelatedField):
+            _resolver(plano, modelo, caminho, campo.source_attrs)
+            continue
+
+        if isinstance(campo, RelatedField) and campo.use_pk_only_optimization() and len(campo.source_attrs) == 1:
+            # PrimaryKeyRelatedField lê só a coluna da FK (disciplina_id)
+            _resolver_coluna_fk(plano, modelo, caminho, campo.source_attrs[0])
+            continue
+
+        destino = _resolver(plano, modelo, caminho, campo.source_attrs)
+        if destino is None:
+            continue
+        modelo_relacionado, caminho_relacionado = destino
+        if isinstance(campo, serializers.ModelSerializer):
+            _planejar_serializer(plano, campo, modelo_relacionado, caminho_relacionado)
+        else:
+            # Campo que usa o objeto relacionado inteiro (SlugRelatedField, str()...)
+            plano.carregar_inteiro(caminho_relacionado)
+
+
+def _resolver_coluna_fk(plano, modelo, caminho, atributo):
+    try:
+        campo = modelo._meta.get_field(atributo)
+    except FieldDoesNotExist:
+        plano.carregar_inteiro(caminho)
+        return
+    if campo.concrete and not campo.many_to_many:
+        plano.usar_coluna(caminho, campo.name)
+    else:
+        _resolver(plano, modelo, caminho, [atributo])
+
+
+def _planejar_lista(plano, campo, modelo, caminho):
+    """Serializer aninhado com many=True: Prefetch com o próprio plano do filho."""
+    try:
+        relacao = modelo._meta.get_field(campo.source_attrs[0])
+    except FieldDoesNotExist:
+        plano.carregar_inteiro(caminho)
+        return
+    if len(campo.source_attrs) != 1 or not (relacao.many_to_many or relacao.one_to_many):
+        _resolver(plano, modelo, caminho, campo.source_attrs)
+        return
+
+    filho = campo.child
+    acessor = relacao.name if relacao.concrete else relacao.get_accessor_name()
+    destino = juntar_caminho(caminho, acessor)
+    queryset = relacao.related_model._default_manager.all()
+    if isinstance(filho, serializers.ModelSerializer):
+        plano_filho = PlanoConsulta()
+        _planejar_serializer(plano_filho, filho, relacao.related_model, RAIZ)
+        if relacao.one_to_many and plano_filho.colunas[RAIZ] is not None:
+            # O prefetch reverso precisa da FK de volta para agrupar os filhos
+            plano_filho.usar_coluna(RAIZ, relacao.field.name)
+        queryset = plano_filho.aplicar(queryset)
+    plano.prefetch_related[destino] = Prefetch(destino, queryset=queryset)
+
+
+# Limitado: ?fields= cria uma subclasse do serializer por combinação de campos (core.sparse)
+@lru_cache(maxsize=1024)
+def plano_do_serializer(serializer_class, modelo):
+    """Plano (memorizado por classe) de um serializer sobre um modelo."""
+    plano = PlanoConsulta()
+    _planejar_serializer(plano, serializer_class(), modelo, RAIZ)
+    return plano
+
+
+def planejar_consulta(queryset, serializer_class, colunas=True, extras=()):
+    """
+    Aplica ao queryset o plano derivado dos campos do serializer:
+    select_related e prefetch_related para que a serialização não faça uma
+    consulta por linha, e only() com as colunas lidas (quando `colunas`).
+    `extras` são campos do modelo que a view também lê (ex.: os da ordenação,
+    usados pelo cursor da paginação).
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    if getattr(meta, 'model', None) is not queryset.model:
+        # Serializer que não é do modelo da view (ex.: importação): nada a planejar
+        return queryset
+
+    plano = plano_do_serializer(serializer_class, queryset.model)
+    if extras and colunas:
+        plano_com_extras = PlanoConsulta()
+        plano_com_extras.select_related = set(plano.select_related)
+        plano_com_extras.prefetch_related = dict(plano.prefetch_related)
+        plano_com_extras.colunas = {
+            caminho: None if nomes is None else set(nomes) for caminho, nomes in plano.colunas.items()
+        }
+        for campo in extras:
+            _resolver(plano_com_extras, queryset.model, RAIZ, campo.lstrip('-').split('__'))
+        plano = plano_com_extras
+    return plano.aplicar(queryset, colunas=colunas)
+
+
+class PlanejamentoConsultaMixin:
+    """
+    Deriva o select_related / prefetch_related / only() do queryset a partir do
+    serializer de cada ação (get_serializer_class), em vez de listas fixas que
+    se perdem quando get_queryset monta outro queryset.
+
+    O only() fica restrito às ações de leitura: nas de escrita a instância é
+    salva, e o save() do modelo (texto_busca, campos rastreados) lê colunas
+    que o serializer não declara.
+    """
+    acoes_somente_leitura = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        ordenacao = getattr(self, 'ordering_fields', None)
+        extras = ordenacao if isinstance(ordenacao, (list, tuple)) else ()
+        return planejar_consulta(
+            queryset,
+            self.get_serializer_class(),
+            colunas=self.action in self.acoes_somente_leitura,
+            extras=extras,
+        )
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Tamanho máximo do SQL guardado como exemplo de consulta repetida
+TAMANHO_EXEMPLO_SQL = 300
+
+
+class ColetorConsultas:
+    """
+    Wrapper de execução (connection.execute_wrapper) que mede cada consulta.
+    O SQL recebido ainda tem os placeholders (%s), então consultas iguais com
+    parâmetros diferentes - o padrão de um N+1 - ficam com o mesmo texto.
+    """
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0
+        self.por_sql = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.total += 1
+            self.por_sql[sql] += 1
+
+    def repetidas(self, limiar):
+        """Consultas executadas pelo menos `limiar` vezes na mesma requisição."""
+        return [(sql, vezes) for sql, vezes in self.por_sql.most_common() if vezes >= limiar]
+
+
+class EstatisticasRequisicoes:
+    """Agregados por endpoint (view + ação), acumulados em memória no processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+
+    def registrar(self, chave, tempo_total, tempo_db, consultas, repetidas, tamanho):
+        with self._lock:
+            item = self._dados.setdefault(chave, {
+                'requisicoes': 0,
+                'tempo_total_ms': 0.0,
+                'tempo_max_ms': 0.0,
+                'tempo_db_ms': 0.0,
+                'consultas': 0,
+                'consultas_max': 0,
+                'requisicoes_com_repeticao': 0,
+                'bytes': 0,
+                'exemplo_repeticao': None,
+            })
+            item['requisicoes'] += 1
+            item['tempo_total_ms'] += tempo_total * 1000
+            item['tempo_max_ms'] = max(item['tempo_max_ms'], tempo_total * 1000)
+            item['tempo_db_ms'] += tempo_db * 1000
+            item['consultas'] += consultas
+            item['consultas_max'] = max(item['consultas_max'], consultas)
+            item['bytes'] += tamanho or 0
+            if repetidas:
+                sql, vezes = repetidas[0]
+                item['requisicoes_com_repeticao'] += 1
+                item['exemplo_repeticao'] = {'sql': sql[:TAMANHO_EXEMPLO_SQL], 'vezes': vezes}
+
+    def resumo(self):
+        """Agregados com médias, do endpoint mais custoso (tempo total) ao menos."""
+        with self._lock:
+            itens = [(chave, dict(item)) for chave, item in self._dados.items()]
+
+        resumo = []
+        for chave, item in sorted(itens, key=lambda par: par[1]['tempo_total_ms'], reverse=True):
+            n = item['requisicoes']
+            resumo.append({
+                'endpoint': chave,
+                'requisicoes': n,
+                'tempo_medio_ms': round(item['tempo_total_ms'] / n, 2),
+                'tempo_max_ms': round(item['tempo_max_ms'], 2),
+                'tempo_db_medio_ms': round(item['tempo_db_ms'] / n, 2),
+                'consultas_media': round(item['consultas'] / n, 2),
+                'consultas_max': item['consultas_max'],
+                'requisicoes_com_repeticao': item['requisicoes_com_repeticao'],
+                'bytes_medio': round(item['bytes'] / n),
+                'exemplo_repeticao': item['exemplo_repeticao'],
+            })
+        return resumo
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+
+estatisticas = EstatisticasRequisicoes()
+
+
+def nome_do_endpoint(request):
+    """'horario-list:list', 'horario-detail:partial_update'... ou o caminho, se não resolvido."""
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return f"{request.method} {request.path}"
+    nome = resolver_match.view_name or resolver_match._func_path
+    acoes = getattr(resolver_match.func, 'actions', None) or {}
+    acao = acoes.get(request.method.lower())
+    return f"{nome}:{acao}" if acao else f"{request.method} {nome}"
+
+
+class ProfilingMiddleware:
+    """
+    Instrumentação opcional (AGENDA_PROFILING = True) de cada requisição:
+    tempo total, tempo no banco, número de consultas, consultas repetidas
+    (indício de N+1) e tamanho da resposta. Os números vão no cabeçalho
+    Server-Timing (visível nas ferramentas do navegador) e nos agregados por
+    endpoint de /api/admin/perfil/. Desativada, não é nem carregada.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'AGENDA_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limiar_repeticao = getattr(settings, 'AGENDA_PROFILING_LIMIAR_REPETICAO', 3)
+
+    def __call__(self, request):
+        coletor = ColetorConsultas()
+        inicio = time.perf_counter()
+        with self._coletando(coletor):
+            response = self.get_response(request)
+        tempo_total = time.perf_counter() - inicio
+
+        if response.streaming and not response.is_async:
+            # As linhas são lidas do banco enquanto o corpo é enviado, depois
+            # daqui: os agregados são registrados no fim do streaming
+            response.streaming_content = self._medir_streaming(request, response.streaming_content, coletor, inicio)
+        else:
+            tamanho = None if response.streaming else len(response.content)
+            self._registrar(request, coletor, tempo_total, tamanho)
+
+        # Em streaming, o cabeçalho só cobre o que aconteceu antes do corpo
+        metricas = [
+            f'total;dur={tempo_total * 1000:.1f}',
+            f'db;dur={coletor.tempo * 1000:.1f};desc="{coletor.total} consultas"',
+            f'app;dur={(tempo_total - coletor.tempo) * 1000:.1f}',
+        ]
+        repetidas = coletor.repetidas(self.limiar_repeticao)
+        if repetidas:
+            metricas.append(f'repetidas;desc="{sum(vezes for _, vezes in repetidas)} consultas repetidas"')
+        response['Server-Timing'] = ', '.join(metricas)
+        return response
+
+    @staticmethod
+    def _coletando(coletor):
+        pilha = ExitStack()
+        for connection in connections.all():
+            pilha.enter_context(connection.execute_wrapper(coletor))
+        return pilha
+
+    def _registrar(self, request, coletor, tempo_total, tamanho):
+        estatisticas.registrar(
+            nome_do_endpoint(request), tempo_total, coletor.tempo, coletor.total,
+            coletor.repetidas(self.limiar_repeticao), tamanho,
+        )
+
+    def _medir_streaming(self, request, conteudo, coletor, inicio):
+        """Cada parte do corpo é gerada com o coletor ativo; no fim, registra a requisição inteira."""
+        iterador = iter(conteudo)
+        tamanho = 0
+        try:
+            while True:
+                with self._coletando(coletor):
+                    try:
+                        parte = next(iterador)
+                    except StopIteration:
+                        return
+                tamanho += len(parte)
+                yield parte
+        finally:
+            self._registrar(request, coletor, time.perf_counter() - inicio, tamanho)
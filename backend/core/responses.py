@@ -1,6 +1,8 @@
 from rest_framework.response import Response
 from rest_framework import status
 
+SYSTEM_INFO = "Este sistema é para visualização de horários disponíveis, não para agendamento."
+
 
 class ApiResponse:
     """
@@ -32,7 +34,7 @@ class ApiResponse:
             response_data['data'] = data
             
         # Adicionar mensagem informativa sobre o propósito do sistema
-        response_data['system_info'] = "Este sistema é para visualização de horários disponíveis, não para agendamento."
+        response_data['system_info'] = SYSTEM_INFO
         
         return Response(response_data, status=status_code)
     
@@ -58,6 +60,6 @@ class ApiResponse:
             response_data['errors'] = errors
             
         # Adicionar mensagem informativa sobre o propósito do sistema
-        response_data['system_info'] = "Este sistema é para visualização de horários disponíveis, não para agendamento."
+        response_data['system_info'] = SYSTEM_INFO
         
         return Response(response_data, status=status_code)
\ No newline at end of file
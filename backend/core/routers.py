@@ -0,0 +1,173 @@
+"""
+Roteamento das leituras para as réplicas (AGENDA_DB_REPLICAS).
+
+A réplica é escolhida uma vez por requisição, nas ações somente leitura das
+views com LeituraReplicaMixin, e guardada em uma ContextVar: o ReplicaRouter
+manda para ela as leituras feitas durante a requisição (inclusive nas threads
+do ORM assíncrono, que copiam o contexto). Fora disso, e em toda escrita, o
+banco é o principal.
+
+As réplicas podem estar alguns segundos atrasadas (AGENDA_DB_REPLICA_ATRASO).
+Quem acabou de alterar algo lê do principal durante esse tempo
+(PrincipalAposEscritaMiddleware), para ver a própria alteração, e respostas
+lidas da réplica logo depois de uma alteração ficam pouco tempo no cache.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+from agenda_aberta.database import aliases_replica
+
+from .cache import ultima_alteracao
+
+PREFIXO_PRINCIPAL = 'agenda:principal:'
+
+_replica_atual = ContextVar('agenda_replica_atual', default=None)
+
+
+def atraso_replicas():
+    """Atraso máximo considerado entre o principal e as réplicas, em segundos."""
+    return getattr(settings, 'AGENDA_DB_REPLICA_ATRASO', 5)
+
+
+def replica_atual():
+    return _replica_atual.get()
+
+
+def escolher_replica():
+    """Uma réplica ao acaso, ou None se não houver réplicas configuradas."""
+    aliases = aliases_replica(settings.DATABASES)
+    return random.choice(aliases) if aliases else None
+
+
+@contextmanager
+def usar_replica(alias):
+    token = _replica_atual.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica_atual.reset(token)
+
+
+def usar_principal():
+    """Lê do principal mesmo numa requisição atendida pela réplica (também serve de decorador)."""
+    return usar_replica(None)
+
+
+def _chave_principal(usuario_id):
+    return f'{PREFIXO_PRINCIPAL}{usuario_id}'
+
+
+def marcar_escrita(usuario):
+    """O usuário passa a ler do principal até as réplicas alcançarem a alteração."""
+    cache.set(_chave_principal(usuario.pk), True, atraso_replicas())
+
+
+def escreveu_recentemente(usuario):
+    return bool(usuario and usuario.is_authenticated and cache.get(_chave_principal(usuario.pk)))
+
+
+def iterar_na_replica(alias, conteudo):
+    """Respostas em streaming consultam o banco depois do dispatch: cada parte roda na réplica."""
+    iterador = iter(conteudo)
+    while True:
+        with usar_replica(alias):
+            try:
+                parte = next(iterador)
+            except StopIteration:
+                return
+        yield parte
+
+
+class ReplicaRouter:
+    """Leituras na réplica da requisição (se houver); escritas e migrações só no principal."""
+
+    def db_for_read(self, model, **hints):
+        return _replica_atual.get()
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sem isso o Django gravaria no banco de onde a instância foi lida
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Principal e réplicas têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in aliases_replica(settings.DATABASES):
+            return False
+        return None
+
+
+class PrincipalAposEscritaMiddleware:
+    """
+    Leitura das próprias escritas: depois de uma requisição de escrita bem
+    sucedida, o usuário autenticado lê do principal por AGENDA_DB_REPLICA_ATRASO
+    segundos. Sem réplicas configuradas, não é nem carregado.
+    """
+    def __init__(self, get_response):
+        if not aliases_replica(settings.DATABASES):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            # O DRF repassa à request do Django o usuário autenticado pelo JWT
+            usuario = getattr(request, 'user', None)
+            if usuario is not None and usuario.is_authenticated:
+                marcar_escrita(usuario)
+        return response
+
+
+class LeituraReplicaMixin:
+    """
+    Atende as ações em `acoes_replica` (GET) em uma réplica de leitura. A
+    réplica é escolhida depois da autenticação (feita no principal) e vale
+    para toda a requisição, para que contagem, página e validadores (ETag)
+    venham do mesmo estado do banco.
+    """
+    acoes_replica = ('list', 'retrieve')
+    replica_leitura = None
+
+    def get_replica_leitura(self, request):
+        if request.method not in ('GET', 'HEAD') or self.action not in self.acoes_replica:
+            return None
+        if escreveu_recentemente(request.user):
+            return None
+        return escolher_replica()
+
+    def dispatch(self, request, *args, **kwargs):
+        # initial() troca a réplica da requisição; o bloco restaura o valor anterior
+        # (respostas em streaming levam a réplica consigo: ver core.streaming)
+        with usar_principal():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_leitura = self.get_replica_leitura(request)
+        _replica_atual.set(self.replica_leitura)
+
+    def get_chave_cache(self, request):
+        chave = super().get_chave_cache(request)
+        # Quem lê do principal não recebe uma resposta lida da réplica, que pode estar atrasada
+        return chave if self.replica_leitura is None else f'{chave}:replica'
+
+    def get_cache_timeout(self):
+        """
+        Uma resposta lida da réplica logo após uma alteração pode não refleti-la
+        e ficaria no cache sob a geração nova: nesse caso, só até a réplica alcançar.
+        """
+        timeout = super().get_cache_timeout()
+        if self.replica_leitura is None:
+            return timeout
+        atraso = atraso_replicas()
+        if time.time() - ultima_alteracao(self.get_escopos_cache(self.request)) <= atraso:
+            return min(timeout, atraso) if timeout is not None else atraso
+        return timeout
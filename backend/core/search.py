@@ -0,0 +1,176 @@
+from functools import reduce
+from operator import add
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from .models import Horario
+from .utils import normalizar_texto
+
+# Limites da consulta de busca (evitam consultas gigantes vindas da URL)
+MAX_TERMOS = 8
+MAX_TAMANHO_TERMO = 50
+
+# Índices de texto criados pelas migrações (FTS5 no SQLite, pg_trgm no PostgreSQL):
+# texto_busca dos horários (0017) e nome_busca dos usuários (0018)
+TABELA_FTS = 'core_horario_busca'
+INDICE_TRIGRAMA = 'core_horario_busca_trgm'
+TABELA_FTS_NOMES = 'core_usuario_nome_busca'
+INDICE_TRIGRAMA_NOMES = 'core_usuario_nome_busca_trgm'
+
+INDICES = {
+    'horarios': {'sqlite': TABELA_FTS, 'postgresql': INDICE_TRIGRAMA},
+    'nomes': {'sqlite': TABELA_FTS_NOMES, 'postgresql': INDICE_TRIGRAMA_NOMES},
+}
+
+# (banco, índice) já confirmados
+_indices_prontos = set()
+
+
+def termos_de_busca(texto):
+    """Quebra a busca em termos normalizados (minúsculas, sem acentos)."""
+    termos = normalizar_texto(texto or '').split()
+    return [termo[:MAX_TAMANHO_TERMO] for termo in termos[:MAX_TERMOS]]
+
+
+def _indice_pronto(connection, indice):
+    # A migração deixa o índice de fora se o banco não o suporta (SQLite sem
+    # FTS5, PostgreSQL sem permissão para o pg_trgm): a busca fica na básica
+    nome = INDICES[indice][connection.vendor]
+    chave = (connection.settings_dict['NAME'], nome)
+    if chave in _indices_prontos:
+        return True
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [nome])
+        else:
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [nome])
+        pronto = cursor.fetchone() is not None
+    if pronto:
+        _indices_prontos.add(chave)
+    return pronto
+
+
+def _consulta_fts5(termos):
+    return ' '.join('"{}"'.format(termo.replace('"', '""')) for termo in termos)
+
+
+def reindexar_horarios(horarios):
+    """
+    Recalcula texto_busca de um queryset de horários em uma consulta de leitura
+    e um bulk_update (os gatilhos/índices do banco acompanham a coluna).
+    Usado quando muda algo fora da linha do horário: nome da disciplina,
+    nome do professor.
+    """
+    linhas = horarios.values_list(
+        'pk', 'disciplina__nome', 'disciplina__codigo', 'professor_monitor__username',
+        'professor_monitor__first_name', 'professor_monitor__last_name', 'local',
+    )
+    atualizados = [Horario(pk=pk, texto_busca=Horario.compor_texto_busca(*partes)) for pk, *partes in linhas]
+    Horario.objects.bulk_update(atualizados, ['texto_busca'], batch_size=500)
+    return len(atualizados)
+
+
+class BuscaBasica:
+    """
+    Sem índice de texto: cada termo vira um LIKE sobre a coluna normalizada
+    texto_busca (uma única coluna, sem JOINs). Não ordena por relevância.
+    """
+    def filtrar(self, queryset, termos):
+        for termo in termos:
+            queryset = queryset.filter(texto_busca__contains=termo)
+        return queryset
+
+    def filtrar_nomes(self, usuarios, termos):
+        """Usuários cujo nome_busca contém todos os termos."""
+        for termo in termos:
+            usuarios = usuarios.filter(nome_busca__contains=termo)
+        return usuarios
+
+
+class BuscaFTS5(BuscaBasica):
+    """
+    SQLite FTS5 (trigram). Termos com menos de 3 letras não geram trigramas e
+    ficam com o filtro básico. A relevância (bm25, menor é melhor) fica em
+    busca_rank.
+    """
+    def filtrar(self, queryset, termos):
+        longos = [termo for termo in termos if len(termo) >= 3]
+        queryset = super().filtrar(queryset, [termo for termo in termos if len(termo) < 3])
+        if not longos:
+            return queryset
+
+        consulta = _consulta_fts5(longos)
+        # O MATCH é avaliado uma vez, na subconsulta que escolhe os ids; a
+        # relevância (rank, do próprio FTS5) é lida só para as linhas encontradas
+        encontrados = RawSQL(f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s", [consulta])
+        relevancia = RawSQL(
+            f"SELECT rank FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s "
+            f"AND rowid = {Horario._meta.db_table}.id",
+            [consulta],
+        )
+        return queryset.filter(pk__in=encontrados).annotate(busca_rank=relevancia)
+
+    def filtrar_nomes(self, usuarios, termos):
+        longos = [termo for termo in termos if len(termo) >= 3]
+        usuarios = super().filtrar_nomes(usuarios, [termo for termo in termos if len(termo) < 3])
+        if not longos:
+            return usuarios
+        encontrados = RawSQL(
+            f"SELECT rowid FROM {TABELA_FTS_NOMES} WHERE {TABELA_FTS_NOMES} MATCH %s", [_consulta_fts5(longos)],
+        )
+        return usuarios.filter(pk__in=encontrados)
+
+
+class BuscaTrigrama(BuscaBasica):
+    """
+    PostgreSQL pg_trgm: o LIKE '%termo%' de cada termo (em texto_busca e em
+    nome_busca) é atendido pelo índice GIN de trigramas; a relevância é a similaridade por palavra (negativa, para
+    que a ordem crescente traga os melhores primeiro).
+    """
+    def filtrar(self, queryset, termos):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        queryset = super().filtrar(queryset, termos)
+        similaridade = reduce(add, [TrigramWordSimilarity(termo, 'texto_busca') for termo in termos])
+        return queryset.annotate(busca_rank=-similaridade)
+
+
+BACKENDS_BUSCA = {
+    'basica': BuscaBasica,
+    'fts5': BuscaFTS5,
+    'trigrama': BuscaTrigrama,
+}
+
+
+def obter_backend_busca(using='default', indice='horarios'):
+    """
+    Backend definido em AGENDA_BUSCA_BACKEND ou, por padrão, o melhor
+    disponível para o banco em uso (FTS5 no SQLite, trigramas no PostgreSQL)
+    e o índice ('horarios' ou 'nomes', ver INDICES).
+    """
+    nome = getattr(settings, 'AGENDA_BUSCA_BACKEND', None)
+    if nome:
+        return BACKENDS_BUSCA[nome]()
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and _indice_pronto(connection, indice):
+        return BuscaFTS5()
+    if connection.vendor == 'postgresql' and _indice_pronto(connection, indice):
+        return BuscaTrigrama()
+    return BuscaBasica()
+
+
+class HorarioSearchFilter(SearchFilter):
+    """
+    Busca textual dos horários (?search=) sobre o índice de texto_busca:
+    ignora maiúsculas e acentos e, quando o backend suporta, anota a
+    relevância em busca_rank (usada na ordenação por HorarioKeysetPagination).
+    """
+    def filter_queryset(self, request, queryset, view):
+        termos = termos_de_busca(request.query_params.get(self.search_param, ''))
+        if not termos:
+            return queryset
+        return obter_backend_busca(queryset.db).filtrar(queryset, termos)
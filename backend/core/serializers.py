@@ -1,10 +1,75 @@
+from datetime import time
+
+from django.conf import settings
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth.password_validation import validate_password
-from .models import CustomUser, Disciplina, Horario
-from .utils import humanize_time_since
+from .catalog import disciplina_por_pk
+from .conflicts import verificar_conflitos
+from .models import CustomUser, DiaSemana, Disciplina, Horario
+from .routers import usar_principal
+from .utils import tempo_desde
 from .validators import HorarioValidator
 
+class DiaSemanaField(serializers.Field):
+    """
+    O dia é gravado como inteiro (DiaSemana), mas a API continua recebendo e
+    devolvendo o rótulo em português ('Segunda-feira'). Na entrada também são
+    aceitas a forma curta ('segunda') e o número do dia.
+    """
+    default_error_messages = {'invalid': 'Dia da semana inválido.'}
+
+    def to_internal_value(self, data):
+        dia = DiaSemana.de_texto(data)
+        if dia is None:
+            self.fail('invalid')
+        return dia
+
+    def to_representation(self, value):
+        return DiaSemana(value).label
+
+# Violações de unicidade do cadastro (nome da restrição no PostgreSQL, do
+# índice ou da coluna na mensagem do SQLite) -> campo e mensagem de erro
+VIOLACOES_CADASTRO = (
+    ('usuario_username_ci_unico', 'username', "Este nome de usuário já está em uso."),
+    ('core_customuser_username_key', 'username', "Este nome de usuário já está em uso."),
+    ('core_customuser.username', 'username', "Este nome de usuário já está em uso."),
+    ('usuario_email_ci_unico', 'email', "Este endereço de email já está em uso."),
+)
+
+
+def _violacao_cadastro(erro):
+    """
+    (campo, mensagem) da restrição de VIOLACOES_CADASTRO violada em `erro`, ou
+    None. O driver do PostgreSQL (psycopg) informa o nome da restrição em
+    diag.constraint_name; no SQLite ele só aparece no texto do erro
+    ("UNIQUE constraint failed: index 'usuario_username_ci_unico'").
+    """
+    diag = getattr(erro.__cause__, 'diag', None)
+    restricao = getattr(diag, 'constraint_name', None)
+    for nome, campo, texto in VIOLACOES_CADASTRO:
+        if nome == restricao if restricao else nome in str(erro):
+            return campo, texto
+    return None
+
+
+class DisciplinaCatalogoField(serializers.PrimaryKeyRelatedField):
+    """Id da disciplina resolvido pelo catálogo em cache (core.catalog), sem consultar o banco."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        disciplina = disciplina_por_pk(pk)
+        if disciplina is None:
+            self.fail('does_not_exist', pk_value=data)
+        return disciplina
+
 class UserSerializer(serializers.ModelSerializer):
     first_name = serializers.CharField(required=True)
     last_name = serializers.CharField(required=True)
@@ -12,21 +77,21 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'email', 'password', 'first_name', 'last_name')
-        extra_kwargs = {'password': {'write_only': True}}
+        extra_kwargs = {
+            'password': {'write_only': True},
+            # Sem o UniqueValidator (uma consulta): a unicidade fica com os índices
+            'username': {'validators': [UnicodeUsernameValidator()]},
+        }
 
     def validate_username(self, value):
         if ' ' in value:
             raise serializers.ValidationError("O nome de usuário não pode conter espaços.")
-        if CustomUser.objects.filter(username__iexact=value).exists():
-            raise serializers.ValidationError("Este nome de usuário já está em uso.")
         return value
 
     def validate_email(self, value):
         email = value.lower()
         if not (email.endswith('@ufersa.edu.br') or email.endswith('@alunos.ufersa.edu.br')):
             raise serializers.ValidationError("O email deve ser de um domínio da UFERSA (@ufersa.edu.br ou @alunos.ufersa.edu.br).")
-        if CustomUser.objects.filter(email__iexact=email).exists():
-            raise serializers.ValidationError("Este endereço de email já está em uso.")
         return email
 
     def validate_password(self, value):
@@ -36,6 +101,8 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Cria o usuário e atribui o 'tipo' automaticamente com base no domínio do e-mail.
+        Username e email repetidos (sem diferenciar maiúsculas) são barrados pelos
+        índices únicos de CustomUser: a violação vira o erro de validação do campo.
         """
         email = validated_data.get('email', '').lower()
         
@@ -48,7 +115,15 @@ class UserSerializer(serializers.ModelSerializer):
         # Adiciona o tipo determinado aos dados antes de criar o usuário
         validated_data['tipo'] = tipo_usuario
         
-        user = CustomUser.objects.create_user(**validated_data)
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create_user(**validated_data)
+        except IntegrityError as erro:
+            violacao = _violacao_cadastro(erro)
+            if violacao is None:
+                raise
+            campo, texto = violacao
+            raise serializers.ValidationError({campo: [texto]}) from erro
         return user
 
 class UserBasicSerializer(serializers.ModelSerializer):
@@ -58,6 +133,8 @@ class UserBasicSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'tipo', 'nome_completo')
+        # Colunas lidas pelos SerializerMethodFields (usadas por core.planner)
+        campos_consulta = {'nome_completo': ('first_name', 'last_name', 'username')}
     
     def get_nome_completo(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip() or obj.username
@@ -72,6 +149,9 @@ class HorarioSerializer(serializers.ModelSerializer):
     Serializer para criar e atualizar horários.
     Agora centraliza toda a lógica de validação de dados chamando HorarioValidator.
     """
+    dia_semana = DiaSemanaField()
+    disciplina = DisciplinaCatalogoField(queryset=Disciplina.objects.all())
+
     class Meta:
         model = Horario
         # Lista explícita de campos é uma boa prática
@@ -90,9 +170,11 @@ class HorarioSerializer(serializers.ModelSerializer):
         # Garante que o usuário não pode atribuir um horário a outra pessoa
         read_only_fields = ['professor_monitor']
 
+    @usar_principal()
     def validate(self, data):
         """
         Método de validação centralizado. É executado em operações de create e update.
+        Consulta o banco principal: conflitos verificados numa réplica atrasada passariam.
         """
         # O DRF passa a instância (em updates) e o contexto (que contém a request)
         instance = self.instance
@@ -116,30 +198,20 @@ class HorarioSerializer(serializers.ModelSerializer):
         if hora_inicio and hora_fim and hora_inicio >= hora_fim:
             raise serializers.ValidationError({"hora_fim": "A hora de fim deve ser posterior à hora de início."})
 
-        # --- ETAPA 3: Validar conflito de horário para o próprio professor/monitor ---
-        exclude_id = instance.id if instance else None
-        if not HorarioValidator.validate_schedule_conflict(
-            professor=user,
-            dia_semana=dia_semana,
-            hora_inicio=hora_inicio,
-            hora_fim=hora_fim,
-            exclude_id=exclude_id
-        ):
-            # Este é um erro geral, não específico de um campo
-            raise serializers.ValidationError("Conflito de horário. Você já possui um atendimento neste intervalo.")
-
-        # --- ETAPA 4: Validar conflito de uso da sala/local ---
-        if local and dia_semana and hora_inicio and hora_fim:
-            conflito_de_sala = Horario.objects.filter(
+        # --- ETAPA 3: Validar conflitos do professor/monitor e da sala em uma única consulta ---
+        if dia_semana is not None and hora_inicio and hora_fim:
+            conflitos = verificar_conflitos(
+                professor=user,
                 local=local,
                 dia_semana=dia_semana,
-                hora_inicio__lt=hora_fim,
-                hora_fim__gt=hora_inicio
+                hora_inicio=hora_inicio,
+                hora_fim=hora_fim,
+                exclude_id=instance.pk if instance else None
             )
-            if instance:
-                conflito_de_sala = conflito_de_sala.exclude(pk=instance.pk)
-            
-            if conflito_de_sala.exists():
+            if conflitos.professor:
+                # Este é um erro geral, não específico de um campo
+                raise serializers.ValidationError("Conflito de horário. Você já possui um atendimento neste intervalo.")
+            if conflitos.local:
                 raise serializers.ValidationError(
                     {"local": "Conflito de agendamento: Esta sala já está reservada neste mesmo horário."}
                 )
@@ -148,22 +220,78 @@ class HorarioSerializer(serializers.ModelSerializer):
         return data
 
 
+class HorarioImportacaoSerializer(serializers.Serializer):
+    """
+    Valida os campos de uma linha da importação em lote.
+    A disciplina é informada pelo id ou pelo código e resolvida depois pelo
+    ImportadorHorarios, no catálogo em cache (sem uma consulta por linha).
+    """
+    disciplina = serializers.CharField(max_length=20)
+    dia_semana = DiaSemanaField()
+    hora_inicio = serializers.TimeField()
+    hora_fim = serializers.TimeField()
+    local = serializers.CharField(max_length=100)
+    ativo = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, data):
+        if data['hora_inicio'] >= data['hora_fim']:
+            raise serializers.ValidationError({"hora_fim": "A hora de fim deve ser posterior à hora de início."})
+        return data
+
+
+class DisponibilidadeSerializer(serializers.Serializer):
+    """
+    Parâmetros da busca de intervalos livres (core.availability). Salas e
+    professores/monitores são informados repetindo o parâmetro
+    (?local=Sala 101&local=Sala 102&professor=3).
+    """
+    dia_semana = DiaSemanaField()
+    duracao = serializers.IntegerField(min_value=1, max_value=24 * 60)
+    inicio = serializers.TimeField(required=False)
+    fim = serializers.TimeField(required=False)
+    local = serializers.ListField(child=serializers.CharField(max_length=100), required=False, default=list)
+    # max_value: ids acima do INTEGER do banco quebrariam a consulta (OverflowError)
+    professor = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=2 ** 31 - 1), required=False, default=list,
+    )
+
+    def validate(self, data):
+        total = len(data['local']) + len(data['professor'])
+        if not total:
+            raise serializers.ValidationError("Informe pelo menos um local ou professor.")
+        maximo = getattr(settings, 'AGENDA_DISPONIBILIDADE_MAX_RECURSOS', 500)
+        if total > maximo:
+            raise serializers.ValidationError(f"Informe no máximo {maximo} locais e professores.")
+        # Sem um dos limites, vale o padrão (o mesmo de core.availability)
+        inicio = data.get('inicio') or getattr(settings, 'AGENDA_DISPONIBILIDADE_INICIO', time(7, 0))
+        fim = data.get('fim') or getattr(settings, 'AGENDA_DISPONIBILIDADE_FIM', time(22, 0))
+        if inicio >= fim:
+            if 'fim' in data:
+                raise serializers.ValidationError({"fim": f"O fim da janela deve ser posterior ao início ({inicio:%H:%M})."})
+            raise serializers.ValidationError({"inicio": f"O início da janela deve ser anterior ao fim ({fim:%H:%M})."})
+        return data
+
+
 class HorarioDetailSerializer(serializers.ModelSerializer):
     """Serializer detalhado para horários, incluindo dados relacionados"""
     disciplina = DisciplinaSerializer(read_only=True)
     professor_monitor = UserBasicSerializer(read_only=True)
+    dia_semana = DiaSemanaField(read_only=True)
     tempo_desde_atualizacao = serializers.SerializerMethodField()
     
     class Meta:
         model = Horario
-        fields = '__all__'
+        # texto_busca é interno (índice da busca textual), não faz parte da API
+        exclude = ['texto_busca']
+        campos_consulta = {'tempo_desde_atualizacao': ('ultima_atualizacao',)}
     
     def get_tempo_desde_atualizacao(self, obj):
-        return humanize_time_since(obj.ultima_atualizacao)
+        return tempo_desde(obj.ultima_atualizacao)
 
 
 class HorarioPublicSerializer(serializers.ModelSerializer):
     """Serializer para visualização pública de horários, sem informações sensíveis"""
+    dia_semana = DiaSemanaField(read_only=True)
     disciplina_nome = serializers.CharField(source='disciplina.nome', read_only=True)
     disciplina_codigo = serializers.CharField(source='disciplina.codigo', read_only=True)
     curso = serializers.CharField(source='disciplina.curso', read_only=True)
@@ -177,6 +305,12 @@ class HorarioPublicSerializer(serializers.ModelSerializer):
             'disciplina_nome', 'disciplina_codigo', 'curso',
             'professor_nome', 'ultima_atualizacao_formatada'
         ]
+        campos_consulta = {
+            'professor_nome': (
+                'professor_monitor__first_name', 'professor_monitor__last_name', 'professor_monitor__username'
+            ),
+            'ultima_atualizacao_formatada': ('ultima_atualizacao',),
+        }
     
     def get_professor_nome(self, obj):
         """Retorna o nome do professor/monitor"""
@@ -185,6 +319,6 @@ class HorarioPublicSerializer(serializers.ModelSerializer):
         return obj.professor_monitor.username
     
     def get_ultima_atualizacao_formatada(self, obj):
-        return humanize_time_since(obj.ultima_atualizacao)
+        return tempo_desde(obj.ultima_atualizacao)
 
 
@@ -0,0 +1,143 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import ESCOPO_GLOBAL, escopo, escopos_do_horario, incrementar_geracao
+from .events import evento_do_horario, publicar_apos_commit
+from .grid import atualizar_grades, chaves_dos_escopos
+from .models import CustomUser, DiaSemana, Disciplina, Horario
+from .search import reindexar_horarios
+
+
+def propagar_alteracao(escopos):
+    """
+    Aplica uma alteração a tudo o que é derivado dos horários: invalida os
+    caches dos escopos e recalcula as grades semanais materializadas afetadas.
+    """
+    incrementar_geracao(*escopos)
+    chaves = chaves_dos_escopos(escopos)
+    if chaves:
+        atualizar_grades(chaves)
+
+
+def escopos_afetados_horario(horario):
+    """
+    Escopos de cache afetados por um horário, considerando tanto os valores
+    atuais quanto os que estavam no banco antes da alteração.
+    """
+    originais = horario.valores_originais()
+    versoes = [(
+        horario.dia_semana, horario.disciplina_id, horario.professor_monitor_id, horario.local,
+    )]
+    if originais:
+        versoes.append((
+            originais.get('dia_semana', horario.dia_semana),
+            originais.get('disciplina_id', horario.disciplina_id),
+            originais.get('professor_monitor_id', horario.professor_monitor_id),
+            originais.get('local', horario.local),
+        ))
+
+    disciplina = horario.disciplina if Horario.disciplina.is_cached(horario) else None
+    ids_disciplinas = {disciplina_id for _, disciplina_id, _, _ in versoes}
+    if disciplina is not None and ids_disciplinas == {disciplina.pk}:
+        cursos = {disciplina.pk: disciplina.curso}
+    else:
+        cursos = dict(Disciplina.objects.filter(pk__in=ids_disciplinas).values_list('pk', 'curso'))
+
+    escopos = set()
+    for dia, disciplina_id, professor_id, local in versoes:
+        escopos.update(escopos_do_horario(dia, cursos.get(disciplina_id), professor_id, local, disciplina_id))
+    return escopos
+
+
+def invalidar_horarios(horarios, tipo_evento='criado'):
+    """
+    Propaga a alteração de uma coleção de horários (ex: após um bulk_create)
+    e publica um evento por horário no feed de alterações.
+    """
+    escopos = set()
+    eventos = []
+    for horario in horarios:
+        afetados = escopos_afetados_horario(horario)
+        escopos.update(afetados)
+        eventos.append(evento_do_horario(tipo_evento, horario, afetados))
+    propagar_alteracao(escopos)
+    publicar_apos_commit(eventos)
+
+
+def _escopos_de_todos_os_dias():
+    return [escopo('dia', dia) for dia in DiaSemana.values]
+
+
+def _escopos_dos_horarios(horarios):
+    """Escopos de professor, sala e dia de um queryset de horários (uma consulta)."""
+    escopos = set()
+    for dia, professor_id, local in horarios.values_list('dia_semana', 'professor_monitor_id', 'local').distinct():
+        escopos.update([escopo('dia', dia), escopo('professor', professor_id), escopo('local', local)])
+    return escopos
+
+
+@receiver(post_save, sender=Horario)
+@receiver(post_delete, sender=Horario)
+def invalidar_cache_horario(sender, instance, **kwargs):
+    escopos = escopos_afetados_horario(instance)
+    propagar_alteracao(escopos)
+    if kwargs['signal'] is post_delete:
+        tipo = 'removido'
+    else:
+        tipo = 'criado' if kwargs.get('created') else 'atualizado'
+    publicar_apos_commit([evento_do_horario(tipo, instance, escopos)])
+
+
+@receiver(post_save, sender=Disciplina)
+@receiver(post_delete, sender=Disciplina)
+def invalidar_cache_disciplina(sender, instance, **kwargs):
+    """
+    Uma disciplina aparece (nome, código, curso) em todos os seus horários,
+    então a alteração afeta os dias, professores e salas desses horários.
+    """
+    if kwargs.get('created'):
+        # Ainda não há horários desta disciplina: só o catálogo muda
+        incrementar_geracao(escopo('disciplinas'))
+        return
+    horarios = Horario.objects.filter(disciplina_id=instance.pk)
+    if kwargs['signal'] is post_save:
+        # Nome e código da disciplina fazem parte do texto de busca dos horários
+        reindexar_horarios(horarios)
+    cursos = {instance.curso, instance.valores_originais().get('curso', instance.curso)}
+    escopos = {
+        ESCOPO_GLOBAL, escopo('disciplinas'), escopo('disciplina', instance.pk),
+        *(escopo('curso', curso) for curso in cursos),
+    }
+    escopos.update(_escopos_de_todos_os_dias())
+    escopos.update(_escopos_dos_horarios(horarios))
+    propagar_alteracao(escopos)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidar_versao_usuario(sender, instance, **kwargs):
+    """Tokens emitidos antes da alteração deixam de valer como fonte dos dados do usuário (core.authentication)."""
+    incrementar_geracao(escopo('usuario', instance.pk))
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidar_cache_professor(sender, instance, created, update_fields=None, **kwargs):
+    """O nome do professor/monitor aparece nas listagens públicas dos seus horários."""
+    if created:
+        return
+    originais = instance.valores_originais()
+    campos = instance.campos_rastreados
+    if update_fields is not None and not set(update_fields) & set(campos):
+        return
+    if originais and all(originais.get(campo) == getattr(instance, campo) for campo in campos):
+        return
+
+    horarios = Horario.objects.filter(professor_monitor_id=instance.pk)
+    escopos = _escopos_dos_horarios(horarios)
+    if not escopos:
+        return
+    reindexar_horarios(horarios)
+    for disciplina_id, curso in horarios.values_list('disciplina_id', 'disciplina__curso').distinct():
+        escopos.update([escopo('curso', curso), escopo('disciplina', disciplina_id)])
+    escopos.add(ESCOPO_GLOBAL)
+    propagar_alteracao(escopos)
@@ -0,0 +1,207 @@
+"""
+Dados sintéticos de um campus (professores/monitores, disciplinas e
+horários), para medir o desempenho em escala (ver os comandos
+gerar_dados_sinteticos e medir_desempenho).
+
+A geração é determinística pela semente: a mesma semente e as mesmas
+quantidades produzem os mesmos registros. Os horários não têm conflitos de
+professor nem de sala, como os cadastrados pela API, e a distribuição imita
+a de um semestre: mais aulas nos dias úteis e de manhã, cada professor com
+poucas disciplinas de um ou dois cursos, salas compartilhadas entre cursos.
+
+Os registros são gravados com bulk_create (sem os sinais): no fim, os caches
+dos escopos afetados são invalidados e as grades semanais, reconstruídas.
+"""
+import random
+from datetime import time
+
+from django.db import transaction
+
+from .cache import ESCOPO_GLOBAL, escopo, escopos_do_horario, incrementar_geracao
+from .grid import rematerializar_todas
+from .hashing import calcular_hash
+from .models import CustomUser, DiaSemana, Disciplina, Horario
+
+PREFIXO = 'sint_'
+PREFIXO_CODIGO = 'SX'
+SENHA = 'senha-sintetica'
+
+TAMANHO_LOTE = 2000
+
+CURSOS = (
+    'Engenharia Civil', 'Engenharia Elétrica', 'Engenharia Mecânica', 'Engenharia de Software',
+    'Ciência da Computação', 'Ciência e Tecnologia', 'Agronomia', 'Medicina Veterinária', 'Zootecnia',
+    'Direito', 'Administração', 'Ciências Contábeis', 'Arquitetura e Urbanismo', 'Biotecnologia', 'Ecologia',
+)
+AREAS = (
+    'Cálculo', 'Álgebra Linear', 'Física', 'Química Geral', 'Programação', 'Estruturas de Dados',
+    'Resistência dos Materiais', 'Mecânica dos Fluidos', 'Circuitos Elétricos', 'Estatística', 'Bioquímica',
+    'Anatomia', 'Fisiologia', 'Ciência do Solo', 'Economia', 'Contabilidade', 'Direito Civil', 'Direito Penal',
+    'Desenho Técnico', 'Topografia', 'Termodinâmica', 'Redes de Computadores', 'Banco de Dados', 'Genética',
+    'Microbiologia', 'Sistemas Operacionais', 'Hidráulica', 'Gestão de Projetos', 'Metodologia Científica',
+)
+SUFIXOS = ('I', 'II', 'III', 'Aplicada', 'Experimental', 'Básica', 'Avançada', 'Computacional')
+NOMES = (
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela', 'João',
+    'Larissa', 'Marcos', 'Natália', 'Otávio', 'Patrícia', 'Rafael', 'Sofia', 'Thiago', 'Vitória', 'Wesley',
+    'Aline', 'Caio', 'Débora', 'Fábio', 'Helena', 'Igor', 'Júlia', 'Lucas', 'Márcia', 'Paulo',
+)
+SOBRENOMES = (
+    'Silva', 'Souza', 'Oliveira', 'Santos', 'Lima', 'Pereira', 'Costa', 'Rodrigues', 'Almeida', 'Nascimento',
+    'Carvalho', 'Araújo', 'Ribeiro', 'Fernandes', 'Gomes', 'Martins', 'Rocha', 'Barbosa', 'Medeiros', 'Dantas',
+    'Fontes', 'Bezerra', 'Queiroz', 'Conceição', 'Cavalcanti', 'Freitas', 'Moura', 'Maia', 'Nogueira', 'Pinto',
+)
+
+# Meias horas das 7h às 22h; duração de 1h, 1h30 ou 2h
+PRIMEIRO_HORARIO = 7 * 60
+MEIAS_HORAS = 30
+DURACOES = (2, 3, 4)
+# Peso de cada dia (segunda a domingo) e do início do atendimento por turno
+PESOS_DIAS = (10, 10, 10, 10, 8, 2, 0)
+PESOS_TURNOS = {range(0, 10): 5, range(10, 22): 4, range(22, MEIAS_HORAS): 2}
+TENTATIVAS = 20
+
+
+def _hora(meia_hora):
+    minutos = PRIMEIRO_HORARIO + meia_hora * 30
+    return time(minutos // 60, minutos % 60)
+
+
+def _salas(quantidade):
+    salas = []
+    for numero in range(quantidade):
+        bloco, sala = divmod(numero, 40)
+        if sala >= 36:
+            salas.append(f'Laboratório {bloco + 1}.{sala - 35}')
+        else:
+            andar, posicao = divmod(sala, 12)
+            salas.append(f'Bloco {bloco + 1} - Sala {andar + 1}{posicao + 1:02d}')
+    return salas
+
+
+class GeradorCampus:
+    def __init__(self, professores, disciplinas, horarios, semente=42, prefixo=PREFIXO):
+        self.quantidades = {'professores': professores, 'disciplinas': disciplinas, 'horarios': horarios}
+        self.aleatorio = random.Random(semente)
+        self.prefixo = prefixo
+        self.descartados = 0
+        self._inicios = [meia_hora for turno, peso in PESOS_TURNOS.items() for meia_hora in turno for _ in range(peso)]
+
+    def gerar(self):
+        """Grava os registros e retorna as quantidades criadas."""
+        with transaction.atomic():
+            disciplinas = self._criar_disciplinas()
+            professores = self._criar_professores()
+            horarios = self._criar_horarios(professores, disciplinas)
+        self._propagar(horarios, disciplinas)
+        return {'professores': len(professores), 'disciplinas': len(disciplinas), 'horarios': len(horarios)}
+
+    def _criar_disciplinas(self):
+        aleatorio = self.aleatorio
+        disciplinas = []
+        for numero in range(self.quantidades['disciplinas']):
+            disciplinas.append(Disciplina(
+                nome=f'{aleatorio.choice(AREAS)} {aleatorio.choice(SUFIXOS)}',
+                curso=aleatorio.choice(CURSOS),
+                codigo=f'{PREFIXO_CODIGO}{numero + 1:06d}',
+                semestre=aleatorio.randint(1, 10),
+                ativo=aleatorio.random() < 0.95,
+            ))
+        return Disciplina.objects.bulk_create(disciplinas, batch_size=TAMANHO_LOTE)
+
+    def _criar_professores(self):
+        aleatorio = self.aleatorio
+        # Um único hash para todos: o custo do PBKDF2 não faz parte dos dados
+        senha = calcular_hash(SENHA)
+        professores = []
+        for numero in range(self.quantidades['professores']):
+            username = f'{self.prefixo}{numero + 1:06d}'
+            professor = CustomUser(
+                username=username, email=f'{username}@ufersa.edu.br', password=senha,
+                first_name=aleatorio.choice(NOMES),
+                last_name=f'{aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}',
+                tipo='professor' if aleatorio.random() < 0.8 else 'monitor',
+            )
+            professor.nome_busca = professor.montar_nome_busca()
+            professores.append(professor)
+        return CustomUser.objects.bulk_create(professores, batch_size=TAMANHO_LOTE)
+
+    def _criar_horarios(self, professores, disciplinas):
+        aleatorio = self.aleatorio
+        if not professores or not disciplinas:
+            return []
+        por_curso = {}
+        for disciplina in disciplinas:
+            por_curso.setdefault(disciplina.curso, []).append(disciplina)
+        cursos = sorted(por_curso)
+        # Cada professor ensina de 1 a 4 disciplinas de um ou dois cursos
+        ensina = {}
+        for professor in professores:
+            seus_cursos = aleatorio.sample(cursos, min(len(cursos), aleatorio.choice((1, 1, 2))))
+            opcoes = [disciplina for curso in seus_cursos for disciplina in por_curso[curso]]
+            ensina[professor.pk] = aleatorio.sample(opcoes, min(len(opcoes), aleatorio.randint(1, 4)))
+
+        salas = _salas(max(10, self.quantidades['horarios'] // 20))
+        dias = [dia for dia, peso in zip(DiaSemana, PESOS_DIAS) for _ in range(peso)]
+        # Meias horas ocupadas (bits) por (professor, dia) e por (sala, dia)
+        ocupado_professor, ocupado_sala = {}, {}
+        horarios = []
+        for _ in range(self.quantidades['horarios']):
+            for _ in range(TENTATIVAS):
+                professor = aleatorio.choice(professores)
+                dia = aleatorio.choice(dias)
+                duracao = aleatorio.choice(DURACOES)
+                inicio = min(aleatorio.choice(self._inicios), MEIAS_HORAS - duracao)
+                sala = aleatorio.choice(salas)
+                bits = ((1 << duracao) - 1) << inicio
+                chave_professor, chave_sala = (professor.pk, dia), (sala, dia)
+                if ocupado_professor.get(chave_professor, 0) & bits or ocupado_sala.get(chave_sala, 0) & bits:
+                    continue
+                ocupado_professor[chave_professor] = ocupado_professor.get(chave_professor, 0) | bits
+                ocupado_sala[chave_sala] = ocupado_sala.get(chave_sala, 0) | bits
+                disciplina = aleatorio.choice(ensina[professor.pk])
+                horarios.append(Horario(
+                    professor_monitor=professor, disciplina=disciplina, dia_semana=dia,
+                    hora_inicio=_hora(inicio), hora_fim=_hora(inicio + duracao), local=sala,
+                    ativo=aleatorio.random() < 0.9,
+                    texto_busca=Horario.compor_texto_busca(
+                        disciplina.nome, disciplina.codigo, professor.username,
+                        professor.first_name, professor.last_name, sala,
+                    ),
+                ))
+                break
+            else:
+                # Sem espaço livre depois de várias tentativas (escala muito densa)
+                self.descartados += 1
+        return Horario.objects.bulk_create(horarios, batch_size=TAMANHO_LOTE)
+
+    def _propagar(self, horarios, disciplinas):
+        escopos = {ESCOPO_GLOBAL, escopo('disciplinas')}
+        escopos.update(escopo('curso', disciplina.curso) for disciplina in disciplinas)
+        for horario in horarios:
+            escopos.update(escopos_do_horario(
+                horario.dia_semana, horario.disciplina.curso, horario.professor_monitor_id,
+                horario.local, horario.disciplina_id,
+            ))
+        incrementar_geracao(*escopos)
+        rematerializar_todas()
+
+
+def remover_sinteticos(prefixo=PREFIXO):
+    """Remove os dados gerados (pelo prefixo do username e do código). Retorna os horários removidos."""
+    horarios = Horario.objects.filter(professor_monitor__username__startswith=prefixo)
+    linhas = set(horarios.values_list(
+        'dia_semana', 'disciplina__curso', 'professor_monitor_id', 'local', 'disciplina_id',
+    ).distinct())
+    with transaction.atomic():
+        # Sem os sinais de cada registro (eventos, escopos, grades): os escopos são propagados no fim
+        removidos = horarios._raw_delete(horarios.db)
+        disciplinas = Disciplina.objects.filter(codigo__startswith=PREFIXO_CODIGO, horarios__isnull=True)
+        Disciplina.objects.filter(pk__in=list(disciplinas.values_list('pk', flat=True)))._raw_delete(disciplinas.db)
+        CustomUser.objects.filter(username__startswith=prefixo).delete()
+    escopos = {ESCOPO_GLOBAL, escopo('disciplinas')}
+    for linha in linhas:
+        escopos.update(escopos_do_horario(*linha))
+    incrementar_geracao(*escopos)
+    rematerializar_todas()
+    return removidos
@@ -0,0 +1,175 @@
+"""
+Seleção de campos (?fields=id,dia_semana,hora_inicio) e modo compacto
+(?compacto=1) das listagens.
+
+A seleção gera uma subclasse do serializer só com os campos pedidos. Como o
+plano de consulta (core.planner) e o serializer compilado (core.fastpath) são
+memorizados por classe, cada combinação de campos ganha os seus: o only() e o
+values() buscam apenas as colunas dos campos selecionados.
+
+No modo compacto os resultados vêm em colunas (nomes uma vez, cada horário
+uma lista) e os dados de uma relação - o objeto aninhado (disciplina,
+professor_monitor) ou os campos derivados dela (disciplina_nome, curso,
+professor_nome) - vão uma vez para `relacionados`, indexados pelo id
+referenciado na coluna com o nome da relação.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Combinações de campos memorizadas (subclasses, planos e serializers compilados)
+MAX_COMBINACOES = 1024
+
+
+@lru_cache(maxsize=MAX_COMBINACOES)
+def campos_legiveis(serializer_class):
+    return [nome for nome, campo in serializer_class().fields.items() if not campo.write_only]
+
+
+@lru_cache(maxsize=MAX_COMBINACOES)
+def serializer_com_campos(serializer_class, campos):
+    """Subclasse (memorizada) de `serializer_class` só com os campos em `campos` (frozenset)."""
+    def get_fields(self):
+        return {nome: campo for nome, campo in super(parcial, self).get_fields().items() if nome in campos}
+
+    parcial = type(f'{serializer_class.__name__}Parcial', (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__doc__': serializer_class.__doc__,
+        'get_fields': get_fields,
+    })
+    return parcial
+
+
+def _chave_estrangeira(modelo, nome):
+    try:
+        campo = modelo._meta.get_field(nome)
+    except FieldDoesNotExist:
+        return None
+    if campo.is_relation and campo.concrete and (campo.many_to_one or campo.one_to_one):
+        return campo
+    return None
+
+
+def _relacao_do_campo(campo, modelo, campos_consulta):
+    """FK da qual o campo é derivado (objeto aninhado, 'disciplina.nome', método sobre a relação) ou None."""
+    if isinstance(campo, serializers.SerializerMethodField):
+        # Método cujas colunas (Meta.campos_consulta) são todas da mesma relação
+        prefixos = {
+            dependencia.split('__')[0] if '__' in dependencia else None
+            for dependencia in campos_consulta.get(campo.field_name, ())
+        }
+        if len(prefixos) != 1 or None in prefixos:
+            return None
+        return _chave_estrangeira(modelo, prefixos.pop())
+    if campo.source == '*' or isinstance(campo, (serializers.ListSerializer, serializers.ManyRelatedField)):
+        return None
+    if isinstance(campo, serializers.ModelSerializer) and len(campo.source_attrs) == 1:
+        return _chave_estrangeira(modelo, campo.source_attrs[0])
+    if len(campo.source_attrs) > 1:
+        return _chave_estrangeira(modelo, campo.source_attrs[0])
+    return None
+
+
+class LayoutCompacto:
+    """Colunas e tabelas de relacionados de um serializer no modo compacto."""
+
+    def __init__(self, serializer_class):
+        meta = serializer_class.Meta
+        campos_consulta = getattr(meta, 'campos_consulta', {})
+        derivados = [
+            (nome, _relacao_do_campo(campo, meta.model, campos_consulta))
+            for nome, campo in serializer_class().fields.items() if not campo.write_only
+        ]
+        # Relação -> (attname da FK, campos que vão para a tabela da relação)
+        self.relacoes = {}
+        for nome, fk in derivados:
+            if fk is not None:
+                self.relacoes.setdefault(fk.name, (fk.attname, []))[1].append(nome)
+
+        # A coluna de uma relação (com o id) fica na posição do primeiro campo dela;
+        # um campo próprio com o mesmo nome (ex: a FK como pk) é a mesma coluna
+        self.colunas = []
+        for nome, fk in derivados:
+            coluna = fk.name if fk is not None else nome
+            if coluna not in self.colunas:
+                self.colunas.append(coluna)
+
+    def _id(self, origem, relacao, attname):
+        # Linha de values() (caminho rápido) ou instância do modelo
+        if isinstance(origem, dict):
+            return origem[relacao]
+        return getattr(origem, attname)
+
+    def compactar(self, dados, origens):
+        """`dados`: itens serializados; `origens`: as linhas/instâncias de onde vieram, na mesma ordem."""
+        relacionados = {relacao: {} for relacao in self.relacoes}
+        linhas = []
+        for item, origem in zip(dados, origens):
+            ids = {}
+            for relacao, (attname, campos) in self.relacoes.items():
+                identificador = self._id(origem, relacao, attname)
+                ids[relacao] = identificador
+                tabela = relacionados[relacao]
+                if identificador is not None and str(identificador) not in tabela:
+                    if len(campos) == 1 and isinstance(item[campos[0]], dict):
+                        tabela[str(identificador)] = item[campos[0]]
+                    else:
+                        tabela[str(identificador)] = {campo: item[campo] for campo in campos}
+            linhas.append([ids[coluna] if coluna in ids else item[coluna] for coluna in self.colunas])
+        return {'colunas': list(self.colunas), 'linhas': linhas, 'relacionados': relacionados}
+
+
+@lru_cache(maxsize=MAX_COMBINACOES)
+def layout_compacto(serializer_class):
+    return LayoutCompacto(serializer_class)
+
+
+class CamposSelecionadosMixin:
+    """
+    ?fields= (campos separados por vírgula) nas ações em `acoes_campos` e
+    ?compacto=1 nas listagens paginadas. O serializer da ação vem de
+    super().get_serializer_class().
+    """
+    campos_query_param = 'fields'
+    compacto_query_param = 'compacto'
+    acoes_campos = ('list', 'retrieve')
+
+    def get_campos_selecionados(self, serializer_class):
+        """frozenset com os campos pedidos em ?fields=, ou None para todos."""
+        valor = self.request.query_params.get(self.campos_query_param) if self.request else None
+        if not valor or self.action not in self.acoes_campos:
+            return None
+        pedidos = [nome.strip() for nome in valor.split(',') if nome.strip()]
+        disponiveis = campos_legiveis(serializer_class)
+        desconhecidos = [nome for nome in pedidos if nome not in disponiveis]
+        if desconhecidos:
+            raise ValidationError({self.campos_query_param: (
+                f"Campo(s) desconhecido(s): {', '.join(desconhecidos)}. "
+                f"Disponíveis: {', '.join(disponiveis)}."
+            )})
+        return frozenset(pedidos) or None
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        campos = self.get_campos_selecionados(serializer_class)
+        if campos is None:
+            return serializer_class
+        return serializer_com_campos(serializer_class, campos)
+
+    def pediu_compacto(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        return request.query_params.get(self.compacto_query_param, '').lower() in ('1', 'true', 'sim')
+
+    def modo_compacto(self):
+        """Listagem paginada em colunas (ver LayoutCompacto)."""
+        return self.action == 'list' and self.pediu_compacto()
+
+    def get_paginated_response(self, data):
+        if self.modo_compacto():
+            # A página guardada pelo paginador traz os ids das relações
+            data = layout_compacto(self.get_serializer_class()).compactar(data, self.paginator.page)
+        return super().get_paginated_response(data)
@@ -0,0 +1,131 @@
+import csv
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from .fastpath import SerializacaoRapidaMixin
+from .routers import iterar_na_replica, replica_atual
+
+FORMATOS_EXPORTACAO = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def codificar_json(dados):
+    """Mesma codificação do JSONRenderer do DRF (compacta, UTF-8, datas ISO)."""
+    texto = json.dumps(
+        dados,
+        cls=encoders.JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    )
+    return texto.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+
+def _membros(dados):
+    """'"a":1,"b":2' - os membros de um objeto JSON, sem as chaves externas."""
+    return codificar_json(dados)[1:-1]
+
+
+def stream_json(linhas, cabecalho, rodape, chave='results'):
+    """
+    Um objeto JSON escrito aos poucos: os membros de `cabecalho`, a lista
+    `chave` com uma linha por vez e, no fim, os membros de rodape(total) -
+    calculados só depois da última linha.
+    """
+    inicio = _membros(cabecalho)
+    yield '{' + (inicio + ',' if inicio else '') + codificar_json(chave) + ':['
+    total = 0
+    for linha in linhas:
+        yield (',' if total else '') + codificar_json(linha)
+        total += 1
+    fim = _membros(rodape(total))
+    yield ']' + (',' + fim if fim else '') + '}'
+
+
+def stream_ndjson(linhas, rodape):
+    """Uma linha JSON por horário; a última linha traz o envelope (rodape(total))."""
+    total = 0
+    for linha in linhas:
+        yield codificar_json(linha) + '\n'
+        total += 1
+    yield codificar_json(rodape(total)) + '\n'
+
+
+class _Eco:
+    """Buffer do csv.writer que apenas devolve o que recebe (sem acumular)."""
+    def write(self, valor):
+        return valor
+
+
+def _achatar(linha, prefixo=''):
+    """{'disciplina': {'nome': ...}} -> {'disciplina.nome': ...} para o CSV."""
+    plano = {}
+    for nome, valor in linha.items():
+        chave = f'{prefixo}{nome}'
+        if isinstance(valor, dict):
+            plano.update(_achatar(valor, chave + '.'))
+        elif isinstance(valor, (list, tuple)):
+            plano[chave] = codificar_json(valor)
+        else:
+            plano[chave] = '' if valor is None else valor
+    return plano
+
+
+def stream_csv(linhas):
+    """CSV com cabeçalho tirado da primeira linha (objetos aninhados viram 'pai.filho')."""
+    escritor = csv.writer(_Eco())
+    colunas = None
+    for linha in linhas:
+        plano = _achatar(linha)
+        if colunas is None:
+            colunas = list(plano)
+            yield escritor.writerow(colunas)
+        yield escritor.writerow([plano.get(coluna, '') for coluna in colunas])
+
+
+class ExportacaoStreamingMixin(SerializacaoRapidaMixin):
+    """
+    Respostas em streaming (StreamingHttpResponse) para listagens grandes: o
+    queryset é percorrido com iterator(chunk_size) e cada linha é serializada
+    e escrita assim que lida, então a memória não cresce com o número de
+    horários. As linhas saem do serializer compilado (core.fastpath) quando
+    possível, ou do serializer da view, uma instância por vez.
+    """
+    def get_chunk_size(self):
+        return getattr(settings, 'AGENDA_EXPORTACAO_CHUNK', 1000)
+
+    def get_queryset_exportacao(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'get_ordering'):
+            # Mesma ordem da listagem paginada (inclusive ?ordering= e relevância da busca)
+            queryset = queryset.order_by(*paginator.get_ordering(request, queryset, self))
+        return queryset
+
+    def iterar_linhas(self, queryset):
+        chunk_size = self.get_chunk_size()
+        compilado = self.get_serializador_compilado()
+        if compilado is not None:
+            for linha in queryset.values(*compilado.campos).iterator(chunk_size=chunk_size):
+                yield compilado.serializar_linha(linha)
+            return
+
+        serializer = self.get_serializer()
+        for instancia in queryset.iterator(chunk_size=chunk_size):
+            yield serializer.to_representation(instancia)
+
+    def resposta_streaming(self, conteudo, formato, nome_arquivo=None):
+        # O corpo é gerado depois que a view retorna, fora do contexto da
+        # requisição: cada parte volta para o banco de leitura escolhido nela
+        conteudo = iterar_na_replica(replica_atual(), conteudo)
+        response = StreamingHttpResponse(conteudo, content_type=FORMATOS_EXPORTACAO[formato])
+        if nome_arquivo:
+            response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+        return response
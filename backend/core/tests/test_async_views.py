@@ -0,0 +1,149 @@
+from datetime import time
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+
+from core.authentication import TokenComDadosSerializer
+from core.models import CustomUser, Disciplina, Horario
+from core.routers import marcar_escrita
+
+
+class LeituraPublicaAsyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+        calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        fisica = Disciplina.objects.create(nome='Física Básica', curso='Engenharia', codigo='FIS001')
+        self.horarios = [
+            Horario.objects.create(
+                professor_monitor=professor, disciplina=calculo if n % 2 else fisica,
+                dia_semana=n % 5, hora_inicio=time(8 + n, 0), hora_fim=time(9 + n, 0), local=f'Sala {n}',
+            )
+            for n in range(6)
+        ]
+        Horario.objects.create(
+            professor_monitor=professor, disciplina=calculo, dia_semana=0,
+            hora_inicio=time(18, 0), hora_fim=time(19, 0), local='Inativa', ativo=False,
+        )
+
+    async def _comparar(self, sincrona, assincrona, params=None):
+        esperada = await sync_to_async(self.client.get)(sincrona, params or {})
+        response = await self.async_client.get(assincrona, params or {})
+        self.assertEqual(response.status_code, esperada.status_code)
+        self.assertEqual(response['Content-Type'], esperada['Content-Type'])
+        return esperada, response
+
+    async def test_listagem_igual_a_sincrona(self):
+        for params in [{}, {'search': 'calculo'}, {'dia_semana': 'segunda'}, {'ordering': '-hora_inicio'}]:
+            with self.subTest(params=params):
+                esperada, response = await self._comparar(
+                    reverse('horario-publico-list'), reverse('horario-publico-async-list'), params,
+                )
+                self.assertEqual(response.json()['results'], esperada.json()['results'])
+                self.assertEqual(response.json()['message'], esperada.json()['message'])
+
+    async def test_paginacao_por_cursor(self):
+        url = reverse('horario-publico-async-list')
+        primeira = (await self.async_client.get(url, {'page_size': 4})).json()
+        self.assertEqual(len(primeira['results']), 4)
+        self.assertIn('/api/async/horarios-publicos/', primeira['next'])
+
+        segunda = (await self.async_client.get(primeira['next'])).json()
+        self.assertEqual(len(segunda['results']), 2)
+        self.assertIsNone(segunda['next'])
+        vistos = [item['id'] for item in primeira['results'] + segunda['results']]
+        self.assertEqual(sorted(vistos), sorted(horario.pk for horario in self.horarios))
+
+        # {"p":["x","y","z"]}: cursor adulterado, com valores que não são da ordenação
+        for cursor in ('xyz', 'eyJwIjpbIngiLCJ5IiwieiJdfQ'):
+            invalido = await self.async_client.get(url, {'cursor': cursor})
+            self.assertEqual(invalido.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(invalido.json()['code'], 'ERROR_404')
+
+    async def test_detalhe_e_inexistente(self):
+        pk = self.horarios[0].pk
+        esperada, response = await self._comparar(
+            reverse('horario-publico-detail', args=[pk]), reverse('horario-publico-async-detail', args=[pk]),
+        )
+        self.assertEqual(response.json(), esperada.json())
+
+        response = await self.async_client.get(reverse('horario-publico-async-detail', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_grade(self):
+        esperada, response = await self._comparar(
+            reverse('horario-publico-grade'), reverse('horario-publico-async-grade'), {'curso': 'Engenharia'},
+        )
+        self.assertEqual(response.json(), esperada.json())
+
+        response = await self.async_client.get(reverse('horario-publico-async-grade'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['status'], 'error')
+
+        for params, codigo in [
+            ({'professor': '99999999999999999999999'}, status.HTTP_400_BAD_REQUEST),
+            ({'local': 'Sala 999'}, status.HTTP_404_NOT_FOUND),
+        ]:
+            esperada, response = await self._comparar(
+                reverse('horario-publico-grade'), reverse('horario-publico-async-grade'), params,
+            )
+            self.assertEqual(response.status_code, codigo)
+            self.assertEqual(response.json(), esperada.json())
+
+    def test_get_condicional_e_cache(self):
+        get = async_to_sync(self.async_client.get)
+        url = reverse('horario-publico-async-list')
+        response = get(url)
+        self.assertTrue(response.has_header('ETag'))
+
+        nao_modificada = get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(nao_modificada.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Em cache: corpo e validador sem consultar o banco
+        with self.assertNumQueries(0):
+            repetida = get(url)
+        self.assertEqual(repetida.content, response.content)
+
+    def test_quem_escreveu_le_do_principal(self):
+        token = str(TokenComDadosSerializer.get_token(self.professor).access_token)
+        marcar_escrita(self.professor)
+        get = async_to_sync(self.async_client.get)
+        url = reverse('horario-publico-async-list')
+        with mock.patch('core.routers.escolher_replica', return_value='default') as escolher:
+            response = get(url, headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            escolher.assert_not_called()
+
+            get(url)
+            escolher.assert_called_once()
+
+    async def test_token_invalido_como_na_sincrona(self):
+        esperada = await sync_to_async(self.client.get)(
+            reverse('horario-publico-list'), headers={'Authorization': 'Bearer xyz'},
+        )
+        response = await self.async_client.get(
+            reverse('horario-publico-async-list'), headers={'Authorization': 'Bearer xyz'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), esperada.json())
+        self.assertEqual(response['WWW-Authenticate'], esperada['WWW-Authenticate'])
+
+
+class CargaLeituraCommandTests(TransactionTestCase):
+    def test_compara_wsgi_e_asgi(self):
+        saida = StringIO()
+        call_command('carga_leitura', requisicoes=12, concorrencia=4, threads=2, sem_cache=True, stdout=saida)
+        linhas = {linha.split()[0]: linha.split() for linha in saida.getvalue().splitlines() if linha}
+        for caminho in ('WSGI', 'ASGI'):
+            self.assertIn(caminho, linhas)
+            self.assertEqual(linhas[caminho][-1], '0')  # erros
+        self.assertLessEqual(int(linhas['WSGI'][-2]), 2)  # pico limitado pelas threads
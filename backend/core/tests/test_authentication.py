@@ -0,0 +1,160 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import JWTComCacheAuthentication
+from core.models import CustomUser
+
+
+class JWTComCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.usuario = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+
+    def login(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'professor', 'password': 'password'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['access']
+
+    def consultas_de_usuario(self, consultas):
+        return [consulta['sql'] for consulta in consultas.captured_queries if 'core_customuser' in consulta['sql']]
+
+    def get_me(self, token):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('me'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        return response, self.consultas_de_usuario(consultas)
+
+    def test_token_leva_dados_do_usuario(self):
+        token = AccessToken(self.login())
+        self.assertEqual(token['tipo'], 'professor')
+        self.assertEqual(token['nome'], 'Ana Conceição')
+        self.assertFalse(token['is_staff'])
+        self.assertIn('versao', token)
+
+    def test_requisicao_sem_consultar_usuario(self):
+        token = self.login()
+        response, consultas = self.get_me(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['tipo'], 'professor')
+        self.assertEqual(response.json()['nome_completo'], 'Ana Conceição')
+        self.assertEqual(consultas, [])
+
+    def test_alteracao_do_usuario_invalida_dados_do_token(self):
+        token = self.login()
+        self.usuario.tipo = 'monitor'
+        self.usuario.save()
+
+        # Token anterior à alteração: uma consulta, depois o cache
+        response, consultas = self.get_me(token)
+        self.assertEqual(response.json()['tipo'], 'monitor')
+        self.assertEqual(len(consultas), 1)
+        response, consultas = self.get_me(token)
+        self.assertEqual(response.json()['tipo'], 'monitor')
+        self.assertEqual(consultas, [])
+
+    def test_usuario_inativo_ou_excluido(self):
+        token = self.login()
+        self.usuario.is_active = False
+        self.usuario.save()
+        response, _ = self.get_me(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.usuario.delete()
+        response, _ = self.get_me(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_campos_fora_do_token_sao_carregados_sob_demanda(self):
+        token = AccessToken(self.login())
+        usuario = JWTComCacheAuthentication().get_user(token)
+        self.assertEqual(usuario.pk, self.usuario.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(usuario.email, 'professor@ufersa.edu.br')
+
+
+class CadastroTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        CustomUser.objects.create_user(
+            username='Professor', email='professor@ufersa.edu.br', password='password', tipo='professor',
+        )
+
+    def registrar(self, **dados):
+        corpo = {
+            'username': 'aluno', 'email': 'aluno@alunos.ufersa.edu.br', 'password': 'S3nh@Forte!2024',
+            'first_name': 'Bia', 'last_name': 'Souza', **dados,
+        }
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(reverse('register'), corpo)
+        return response, [consulta['sql'] for consulta in consultas.captured_queries]
+
+    def test_cadastro_com_um_insert(self):
+        response, consultas = self.registrar()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(CustomUser.objects.get(username='aluno').tipo, 'aluno')
+        self.assertFalse([sql for sql in consultas if sql.startswith('SELECT') and 'core_customuser' in sql])
+        self.assertEqual(len([sql for sql in consultas if sql.startswith('INSERT')]), 1)
+
+    def test_username_repetido_sem_diferenciar_caixa(self):
+        response, _ = self.registrar(username='PROFESSOR')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['errors']['username'], 'Este nome de usuário já está em uso.')
+
+    def test_email_repetido_sem_diferenciar_caixa(self):
+        response, _ = self.registrar(email='Professor@UFERSA.edu.br')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['errors']['email'], 'Este endereço de email já está em uso.')
+        self.assertEqual(CustomUser.objects.count(), 1)
+
+    def test_violacao_pelo_nome_da_restricao_do_driver(self):
+        # Como o psycopg: o nome da restrição vem em diag, não no texto do erro
+        class ErroDoDriver(Exception):
+            def __init__(self, restricao):
+                super().__init__('duplicate key value violates unique constraint')
+                self.diag = SimpleNamespace(constraint_name=restricao)
+
+        for restricao, campo in [('usuario_username_ci_unico', 'username'), ('usuario_email_ci_unico', 'email')]:
+            with self.subTest(restricao=restricao):
+                erro = IntegrityError('duplicate key value violates unique constraint')
+                erro.__cause__ = ErroDoDriver(restricao)
+                with mock.patch.object(CustomUser.objects, 'create_user', side_effect=erro):
+                    response, _ = self.registrar()
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(list(response.json()['errors']), [campo])
+
+
+class UnicidadeSemCaixaMigracaoTests(TransactionTestCase):
+    antes = [('core', '0015_customuser_nome_busca')]
+    depois = [('core', '0016_customuser_unicidade_sem_caixa')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_repetidos_sem_caixa_interrompem_a_migracao_com_a_lista(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.antes)
+        usuario = executor.loader.project_state(self.antes).apps.get_model('core', 'CustomUser')
+        # Como o admin e o createsuperuser faziam: só o cadastro da API comparava sem caixa
+        usuario.objects.create(username='Ana', email='ana@ufersa.edu.br', tipo='professor')
+        usuario.objects.create(username='ana', email='outra@ufersa.edu.br', tipo='professor')
+
+        executor.loader.build_graph()
+        with self.assertRaisesMessage(RuntimeError, "username 'ana': id"):
+            executor.migrate(self.depois)
+
+        usuario.objects.filter(username='ana').delete()
+        executor.loader.build_graph()
+        executor.migrate(self.depois)
@@ -0,0 +1,98 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.availability import intervalos_livres, mapa_de_ocupacao, mesclar_intervalos
+from core.conflicts import verificar_conflitos
+from core.models import CustomUser, Disciplina, Horario
+
+
+class MapaDeOcupacaoTest(TestCase):
+    def test_mescla_intervalos_sobrepostos_e_encostados(self):
+        self.assertEqual(
+            mesclar_intervalos([(480, 540), (500, 600), (600, 620), (700, 720)]),
+            [[480, 620], [700, 720]],
+        )
+
+    def test_arredonda_para_fora_e_extrai_livres(self):
+        # 08:03-08:58 ocupa as fatias de 08:00 a 09:00
+        mapa = mapa_de_ocupacao([(483, 538)])
+        janela = ((1 << 24) - 1) << 90  # 07:30 às 09:30
+        self.assertEqual(intervalos_livres(janela & ~mapa, 1), [('07:30', '08:00'), ('09:00', '09:30')])
+        self.assertEqual(intervalos_livres(janela & ~mapa, 7), [])
+
+
+class DisponibilidadeTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.outro = CustomUser.objects.create_user(
+            username='outro', email='outro@ufersa.edu.br', password='password', tipo='monitor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        for professor, local, inicio, fim, ativo in [
+            (self.outro, 'Sala 101', time(8, 0), time(10, 0), True),
+            (self.outro, 'Sala 101', time(9, 30), time(11, 0), True),   # sobreposto ao anterior
+            (self.outro, 'Sala 101', time(14, 0), time(15, 0), False),  # inativo também ocupa
+            (self.professor, 'Sala 202', time(13, 0), time(14, 0), True),
+        ]:
+            Horario.objects.create(
+                professor_monitor=professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+                hora_inicio=inicio, hora_fim=fim, local=local, ativo=ativo,
+            )
+        self.client.force_authenticate(user=self.professor)
+        self.url = reverse('horario-disponibilidade')
+
+    def _consultar(self, **params):
+        response = self.client.get(self.url, {'dia_semana': 'segunda', 'duracao': 60, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def test_intervalos_livres_por_sala_e_em_comum(self):
+        dados = self._consultar(local=['Sala 101', 'Sala 202'], inicio='07:00', fim='18:00')
+        self.assertEqual(dados['locais']['Sala 101'], [('07:00', '08:00'), ('11:00', '14:00'), ('15:00', '18:00')])
+        self.assertEqual(dados['locais']['Sala 202'], [('07:00', '13:00'), ('14:00', '18:00')])
+        self.assertEqual(dados['em_comum'], [('07:00', '08:00'), ('11:00', '13:00'), ('15:00', '18:00')])
+        self.assertEqual(dados['dia_semana'], 'Segunda-feira')
+
+    def test_sala_e_professor(self):
+        dados = self._consultar(local=['Sala 101'], professor=[self.professor.pk], inicio='10:00', fim='16:00')
+        self.assertEqual(dados['professores'][str(self.professor.pk)], [('10:00', '13:00'), ('14:00', '16:00')])
+        self.assertEqual(dados['em_comum'], [('11:00', '13:00'), ('15:00', '16:00')])
+
+    def test_intervalo_livre_nao_gera_conflito(self):
+        dados = self._consultar(local=['Sala 101'], duracao=30)
+        for inicio, fim in dados['locais']['Sala 101']:
+            hora_inicio, hora_fim = time.fromisoformat(inicio), time.fromisoformat(fim)
+            conflitos = verificar_conflitos(self.professor, 'Sala 101', 0, hora_inicio, hora_fim)
+            self.assertFalse(conflitos.local, (inicio, fim))
+
+    def test_mapas_em_cache_e_invalidados(self):
+        self._consultar(local=['Sala 101'])
+        with self.assertNumQueries(0):
+            self._consultar(local=['Sala 101'])
+
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(16, 0), hora_fim=time(22, 0), local='Sala 101',
+        )
+        dados = self._consultar(local=['Sala 101'])
+        self.assertEqual(dados['locais']['Sala 101'], [('07:00', '08:00'), ('11:00', '14:00'), ('15:00', '16:00')])
+
+    def test_parametros_invalidos(self):
+        for params in [
+            {}, {'duracao': 0, 'local': 'Sala 101'}, {'dia_semana': 'feriado', 'local': 'Sala 101'},
+            {'professor': '99999999999999999999999'},
+            # Um só limite da janela é comparado com o padrão do outro (07:00 às 22:00)
+            {'fim': '06:00', 'local': 'Sala 101'}, {'inicio': '23:00', 'local': 'Sala 101'},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, {'dia_semana': 'segunda', 'duracao': 60, **params})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data['status'], 'error')
@@ -0,0 +1,94 @@
+from datetime import time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.cache import incrementar_geracao, obter_geracoes
+from core.models import CustomUser, Disciplina, Horario
+
+
+class GeracaoCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_incrementar_muda_apenas_o_escopo_informado(self):
+        antes = obter_geracoes(['global', 'dia:Segunda-feira'])
+        incrementar_geracao('dia:Segunda-feira')
+        depois = obter_geracoes(['global', 'dia:Segunda-feira'])
+        self.assertEqual(antes['global'], depois['global'])
+        self.assertNotEqual(antes['dia:Segunda-feira'], depois['dia:Segunda-feira'])
+
+    def test_contador_perdido_nao_reaproveita_geracao_antiga(self):
+        antes = obter_geracoes(['global'])['global']
+        cache.clear()
+        self.assertNotEqual(obter_geracoes(['global'])['global'], antes)
+
+
+class HorarioPublicCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Lima',
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horario = Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+        self.url = reverse('horario-publico-list')
+
+    def _locais(self, url=None):
+        return [item['local'] for item in self.client.get(url or self.url).data['results']]
+
+    def test_resposta_vem_do_cache(self):
+        self._locais()
+        with self.assertNumQueries(0):  # corpo e validador vêm do cache
+            self.assertEqual(self._locais(), ['Sala 101'])
+
+    def test_tempo_relativo_recalculado_na_resposta_do_cache(self):
+        self.assertEqual(self.client.get(self.url).json()['results'][0]['ultima_atualizacao_formatada'], 'Agora mesmo')
+        daqui_a_pouco = timezone.now() + timedelta(minutes=5)
+        with mock.patch('core.utils.timezone.now', return_value=daqui_a_pouco), self.assertNumQueries(0):
+            item = self.client.get(self.url).json()['results'][0]
+        self.assertEqual(item['ultima_atualizacao_formatada'], '5 minuto(s) atrás')
+
+    def test_edicao_de_horario_invalida_cache(self):
+        self.assertEqual(self._locais(), ['Sala 101'])
+        self.horario.local = 'Sala 202'
+        self.horario.save()
+        self.assertEqual(self._locais(), ['Sala 202'])
+
+    def test_edicao_em_outro_dia_preserva_cache_filtrado_por_dia(self):
+        url = f'{self.url}?dia_semana=Segunda-feira'
+        self._locais(url)
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Terça-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 303',
+        )
+        with self.assertNumQueries(0):  # corpo e validador vêm do cache
+            self._locais(url)
+        self.assertEqual(sorted(self._locais()), ['Sala 101', 'Sala 303'])
+
+    def test_mudanca_de_dia_invalida_dia_antigo(self):
+        url = f'{self.url}?dia_semana=Segunda-feira'
+        self.assertEqual(self._locais(url), ['Sala 101'])
+        horario = Horario.objects.get(pk=self.horario.pk)
+        horario.dia_semana = 'Quarta-feira'
+        horario.save()
+        self.assertEqual(self._locais(url), [])
+
+    def test_edicao_de_disciplina_e_professor_invalida_cache(self):
+        self.client.get(self.url)
+        self.disciplina.nome = 'Cálculo II'
+        self.disciplina.save()
+        self.assertEqual(self.client.get(self.url).data['results'][0]['disciplina_nome'], 'Cálculo II')
+
+        professor = CustomUser.objects.get(pk=self.professor.pk)
+        professor.first_name = 'Beatriz'
+        professor.save()
+        self.assertEqual(self.client.get(self.url).data['results'][0]['professor_nome'], 'Beatriz Lima')
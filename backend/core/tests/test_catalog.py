@@ -0,0 +1,104 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.catalog import _indice
+from core.models import CustomUser, Disciplina, Horario
+
+
+class CatalogoDisciplinasTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        _indice.cache_clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor',
+        )
+        self.client.force_authenticate(self.professor)
+        self.calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia Civil', codigo='CAL001', semestre=1)
+        self.fisica = Disciplina.objects.create(nome='Física Básica', curso='Engenharia Elétrica', codigo='FIS001', semestre=2)
+        self.algoritmos = Disciplina.objects.create(
+            nome='Algoritmos', curso='Computação', codigo='ALG001', semestre=1, ativo=False,
+        )
+
+    def consultas_ao_catalogo(self, consultas):
+        return [consulta['sql'] for consulta in consultas.captured_queries if 'FROM "core_disciplina"' in consulta['sql']]
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), self.consultas_ao_catalogo(consultas)
+
+    def test_listagem_sem_consultar_o_banco(self):
+        url = reverse('disciplina-list')
+        dados, consultas = self.get(url)
+        self.assertEqual([item['codigo'] for item in dados], ['CAL001', 'FIS001', 'ALG001'])
+        self.assertEqual(len(consultas), 1)
+
+        # L1 (memória do processo) e, sem ela, L2 (cache compartilhado)
+        self.assertEqual(self.get(url, {'search': 'engenharia'})[1], [])
+        _indice.cache_clear()
+        self.assertEqual(self.get(url)[1], [])
+        self.assertEqual(self.get(reverse('disciplina-detail', args=[self.fisica.pk]))[1], [])
+
+    def test_alteracao_invalida_o_catalogo(self):
+        url = reverse('disciplina-list')
+        self.get(url)
+        self.fisica.nome = 'Física I'
+        self.fisica.save()
+        dados, consultas = self.get(url)
+        self.assertIn('Física I', [item['nome'] for item in dados])
+        self.assertEqual(len(consultas), 1)
+
+        self.algoritmos.delete()
+        self.assertEqual(len(self.get(url)[0]), 2)
+
+    def test_filtros_busca_e_ordenacao(self):
+        url = reverse('disciplina-list')
+
+        def codigos(**params):
+            return [item['codigo'] for item in self.get(url, params)[0]]
+
+        self.assertEqual(codigos(ativo='true'), ['CAL001', 'FIS001'])
+        self.assertEqual(codigos(semestre='1'), ['CAL001', 'ALG001'])
+        self.assertEqual(codigos(semestre='x'), ['CAL001', 'FIS001', 'ALG001'])
+        self.assertEqual(codigos(curso='engenharia'), ['CAL001', 'FIS001'])
+        self.assertEqual(codigos(search='engenharia fis'), ['FIS001'])
+        self.assertEqual(codigos(ordering='-semestre,nome'), ['FIS001', 'ALG001', 'CAL001'])
+        self.assertEqual(codigos(ordering='nome', ativo='false'), ['ALG001'])
+
+        response = self.client.get(reverse('disciplina-detail', args=[9999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filtro_e_criacao_de_horario_usam_o_catalogo(self):
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.calculo, dia_semana=0,
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 1', ativo=True,
+        )
+        self.get(reverse('disciplina-list'))
+
+        dados, consultas = self.get(reverse('horario-publico-list'), {'disciplina': self.calculo.pk})
+        self.assertEqual(len(dados['results']), 1)
+        self.assertEqual(consultas, [])
+        response = self.client.get(reverse('horario-publico-list'), {'disciplina': 9999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(reverse('horario-list'), {
+                'disciplina': self.fisica.pk, 'dia_semana': 'Terça-feira',
+                'hora_inicio': '08:00', 'hora_fim': '10:00', 'local': 'Sala 2',
+            })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.consultas_ao_catalogo(consultas), [])
+        self.assertEqual(Horario.objects.get(local='Sala 2').disciplina, self.fisica)
+
+        response = self.client.post(reverse('horario-list'), {
+            'disciplina': 9999, 'dia_semana': 'Terça-feira', 'hora_inicio': '14:00', 'hora_fim': '16:00', 'local': 'Sala 2',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('disciplina', response.json()['errors'])
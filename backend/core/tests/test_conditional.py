@@ -0,0 +1,73 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horario = Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+
+    def test_if_none_match_responde_304_sem_serializar(self):
+        url = reverse('horario-publico-list')
+        primeira = self.client.get(url)
+        self.assertEqual(primeira.status_code, status.HTTP_200_OK)
+        etag = primeira['ETag']
+        self.assertTrue(primeira.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):  # validador guardado junto da resposta em cache
+            segunda = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(segunda.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(segunda['ETag'], etag)
+
+    def test_etag_muda_apos_alteracao_e_exclusao(self):
+        url = reverse('horario-publico-list')
+        etag = self.client.get(url)['ETag']
+
+        self.horario.local = 'Sala 202'
+        self.horario.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        outro = Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Terça-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 303',
+        )
+        etag = self.client.get(url)['ETag']
+        outro.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_etag_muda_quando_a_disciplina_muda(self):
+        url = reverse('horario-publico-detail', kwargs={'pk': self.horario.pk})
+        etag = self.client.get(url)['ETag']
+        self.disciplina.nome = 'Cálculo II'
+        self.disciplina.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since_em_endpoints_privados(self):
+        self.client.force_authenticate(user=self.professor)
+        for url in (reverse('horario-list'), reverse('disciplina-list')):
+            primeira = self.client.get(url)
+            self.assertEqual(primeira.status_code, status.HTTP_200_OK)
+            self.assertIn('Authorization', primeira['Vary'])
+            segunda = self.client.get(url, HTTP_IF_MODIFIED_SINCE=primeira['Last-Modified'])
+            self.assertEqual(segunda.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_id_malformado_responde_404(self):
+        response = self.client.get(reverse('horario-publico-detail', kwargs={'pk': 'abc'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(self.professor)
+        response = self.client.get(reverse('horario-detail', kwargs={'pk': 'abc'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
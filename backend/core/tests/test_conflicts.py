@@ -0,0 +1,66 @@
+from datetime import time
+
+from django.test import TestCase
+
+from core.conflicts import VerificadorEmLote, verificar_conflitos
+from core.models import CustomUser, Disciplina, Horario
+
+
+class VerificarConflitosTest(TestCase):
+    def setUp(self):
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.outro = CustomUser.objects.create_user(
+            username='outro', email='outro@ufersa.edu.br', password='password', tipo='professor'
+        )
+        disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horario = Horario.objects.create(
+            professor_monitor=self.professor,
+            disciplina=disciplina,
+            dia_semana='Segunda-feira',
+            hora_inicio=time(10, 0),
+            hora_fim=time(12, 0),
+            local='Sala 101',
+        )
+
+    def test_uma_unica_consulta(self):
+        with self.assertNumQueries(1):
+            conflitos = verificar_conflitos(
+                self.outro, 'Sala 101', 'Segunda-feira', time(11, 0), time(13, 0)
+            )
+        self.assertFalse(conflitos.professor)
+        self.assertTrue(conflitos.local)
+
+    def test_conflito_de_professor(self):
+        conflitos = verificar_conflitos(
+            self.professor, 'Sala 202', 'Segunda-feira', time(9, 0), time(10, 30)
+        )
+        self.assertTrue(conflitos.professor)
+        self.assertFalse(conflitos.local)
+
+    def test_intervalos_adjacentes_nao_conflitam(self):
+        conflitos = verificar_conflitos(
+            self.professor, 'Sala 101', 'Segunda-feira', time(12, 0), time(13, 0)
+        )
+        self.assertEqual(conflitos, (False, False))
+
+    def test_exclude_id_ignora_o_proprio_horario(self):
+        conflitos = verificar_conflitos(
+            self.professor, 'Sala 101', 'Segunda-feira', time(10, 0), time(12, 0),
+            exclude_id=self.horario.pk,
+        )
+        self.assertEqual(conflitos, (False, False))
+
+
+class VerificadorEmLoteTest(TestCase):
+    def test_detecta_sobreposicoes_por_recurso_e_dia(self):
+        verificador = VerificadorEmLote()
+        verificador.adicionar('Sala 101', 'Segunda-feira', time(8, 0), time(12, 0), ref='a')
+        verificador.adicionar('Sala 101', 'Segunda-feira', time(12, 0), time(13, 0), ref='b')
+        verificador.adicionar('Sala 101', 'Segunda-feira', time(9, 0), time(10, 0), ref='c')
+        verificador.adicionar('Sala 101', 'Terça-feira', time(9, 0), time(10, 0), ref='d')
+        verificador.adicionar('Sala 102', 'Segunda-feira', time(9, 0), time(10, 0), ref='e')
+
+        pares = {(s.anterior, s.atual) for s in verificador.sobreposicoes()}
+        self.assertEqual(pares, {('a', 'c')})
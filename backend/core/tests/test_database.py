@@ -0,0 +1,236 @@
+import sqlite3
+import tempfile
+from datetime import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from agenda_aberta.database import configurar_bancos, ler_url
+from core.models import CustomUser, Disciplina, Horario
+from core.routers import ReplicaRouter, replica_atual, usar_replica
+from core.serializers import HorarioSerializer
+
+
+class ConfiguracaoBancosTest(SimpleTestCase):
+    def test_padrao_sqlite_ajustado(self):
+        bancos = configurar_bancos(Path('/srv/agenda'), {})
+        self.assertEqual(list(bancos), ['default'])
+        banco = bancos['default']
+        self.assertEqual(banco['NAME'], '/srv/agenda/db.sqlite3')
+        self.assertEqual(banco['CONN_MAX_AGE'], 60)
+        self.assertEqual(banco['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(banco['OPTIONS']['timeout'], 20)
+        self.assertIn('PRAGMA journal_mode=WAL', banco['OPTIONS']['init_command'])
+
+    def test_postgresql_com_replicas(self):
+        bancos = configurar_bancos(Path('/srv'), {
+            'AGENDA_DB_URL': 'postgres://agenda:s%40nha@db:5432/agenda?sslmode=require',
+            'AGENDA_DB_REPLICAS': 'postgres://agenda@replica1/agenda, postgres://agenda@replica2/agenda',
+            'AGENDA_DB_CONN_MAX_AGE': '300',
+        })
+        principal = bancos['default']
+        self.assertEqual(principal['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((principal['USER'], principal['PASSWORD']), ('agenda', 's@nha'))
+        self.assertEqual((principal['HOST'], principal['PORT']), ('db', '5432'))
+        self.assertEqual(principal['OPTIONS'], {'sslmode': 'require'})
+        self.assertEqual(principal['CONN_MAX_AGE'], 300)
+        self.assertTrue(principal['CONN_HEALTH_CHECKS'])
+        self.assertEqual(bancos['replica_2']['HOST'], 'replica2')
+        self.assertEqual(bancos['replica_1']['TEST'], {'MIRROR': 'default'})
+
+    def test_pool_substitui_conexoes_persistentes(self):
+        banco = configurar_bancos(Path('/srv'), {
+            'AGENDA_DB_URL': 'postgresql://agenda@db/agenda', 'AGENDA_DB_POOL': '2:20', 'AGENDA_DB_PGBOUNCER': '1',
+        })['default']
+        self.assertEqual(banco['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20})
+        self.assertEqual(banco['CONN_MAX_AGE'], 0)
+        self.assertTrue(banco['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_url_invalida(self):
+        with self.assertRaises(ValueError):
+            ler_url('mysql://agenda@db/agenda')
+
+    def test_pragmas_aplicados_na_conexao(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            bancos = ConnectionHandler(configurar_bancos(Path(diretorio), {'AGENDA_SQLITE_BUSY_TIMEOUT': '5'}))
+            # Conexão avulsa, fora das conexões do Django usadas pelos testes
+            conexao = DatabaseWrapper(bancos.settings['default'], alias='agenda')
+            try:
+                with conexao.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+                    cursor.execute('PRAGMA synchronous')
+                    self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone()[0], 5000)
+                self.assertEqual(conexao.transaction_mode, 'IMMEDIATE')
+            finally:
+                conexao.close()
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    def test_leituras_seguem_a_replica_e_escritas_o_principal(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Horario))
+        with usar_replica('replica_1'):
+            self.assertEqual(router.db_for_read(Horario), 'replica_1')
+            self.assertEqual(router.db_for_write(Horario), 'default')
+        self.assertIsNone(replica_atual())
+
+
+class LeituraNaReplicaTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana=0,
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+
+    def _bancos_consultados(self, requisitar):
+        # Nos testes a "réplica" é o próprio banco padrão; registra o alias escolhido em cada consulta
+        bancos = []
+
+        def registrar(execute, sql, params, many, context):
+            bancos.append(replica_atual())
+            return execute(sql, params, many, context)
+
+        with mock.patch('core.routers.escolher_replica', return_value='default'), \
+                connection.execute_wrapper(registrar):
+            response = requisitar()
+        return response, bancos
+
+    def test_leituras_publicas_na_replica(self):
+        response, bancos = self._bancos_consultados(lambda: self.client.get(reverse('horario-publico-list')))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(bancos)
+        self.assertEqual(set(bancos), {'default'})
+
+        response, bancos = self._bancos_consultados(
+            lambda: b''.join(self.client.get(reverse('horario-publico-exportar')).streaming_content)
+        )
+        self.assertEqual(set(bancos), {'default'})
+
+    def test_escritas_no_principal(self):
+        self.client.force_authenticate(self.professor)
+        response, bancos = self._bancos_consultados(lambda: self.client.post(reverse('horario-list'), {
+            'disciplina': self.disciplina.pk, 'dia_semana': 'Terça-feira',
+            'hora_inicio': '08:00', 'hora_fim': '10:00', 'local': 'Sala 102',
+        }))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(set(bancos), {None})
+
+
+class ReplicaEmArquivoTests(TransactionTestCase):
+    """
+    Principal (o banco de teste) e réplica em outro arquivo SQLite: a réplica
+    é uma cópia do principal que não recebe as escritas seguintes, como uma
+    réplica atrasada.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registrada depois da preparação da classe: o Django não cria banco de teste para ela
+        cls.diretorio = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.diretorio.cleanup)
+        banco = ConnectionHandler(configurar_bancos(Path(cls.diretorio.name), {})).settings['default']
+        connections.settings['replica_1'] = banco
+        cls.addClassCleanup(connections.settings.pop, 'replica_1')
+        cls.addClassCleanup(lambda: connections['replica_1'].close())
+        cls.databases = cls.databases | {'replica_1'}
+        aliases = mock.patch('core.routers.aliases_replica', return_value=['replica_1'])
+        aliases.start()
+        cls.addClassCleanup(aliases.stop)
+
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.aluno = CustomUser.objects.create_user(
+            username='aluno', email='aluno@alunos.ufersa.edu.br', password='password', tipo='aluno'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self._criar('Sala 101', time(8, 0))
+        self._replicar()
+        # Só no principal: a réplica ainda não recebeu
+        self._criar('Sala 102', time(10, 0))
+
+    def _criar(self, local, inicio):
+        return Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana=0,
+            hora_inicio=inicio, hora_fim=time(inicio.hour + 2, 0), local=local,
+        )
+
+    def _replicar(self):
+        replica = connections['replica_1']
+        replica.close()
+        connections['default'].ensure_connection()
+        destino = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            connections['default'].connection.backup(destino)
+        finally:
+            destino.close()
+
+    def _locais(self, usuario=None):
+        cliente = APIClient()
+        if usuario is not None:
+            cliente.force_authenticate(usuario)
+        response = cliente.get(reverse('horario-publico-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(item['local'] for item in response.json()['results'])
+
+    def test_leitura_publica_na_replica_e_propria_escrita_no_principal(self):
+        self.assertEqual(self._locais(), ['Sala 101'])
+
+        cliente = APIClient()
+        cliente.force_authenticate(self.professor)
+        response = cliente.post(reverse('horario-list'), {
+            'disciplina': self.disciplina.pk, 'dia_semana': 'Terça-feira',
+            'hora_inicio': '08:00', 'hora_fim': '10:00', 'local': 'Sala 103', 'ativo': True,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Quem escreveu lê do principal (e não recebe a resposta da réplica em cache)
+        self.assertEqual(self._locais(self.professor), ['Sala 101', 'Sala 102', 'Sala 103'])
+        self.assertEqual(self._locais(), ['Sala 101'])
+        self.assertEqual(self._locais(self.aluno), ['Sala 101'])
+
+    def test_listagem_de_disciplinas(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.professor)
+        response = cliente.post(reverse('disciplina-list'), {'nome': 'Física I', 'curso': 'Engenharia', 'codigo': 'FIS001'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        def nomes(usuario):
+            cliente = APIClient()
+            cliente.force_authenticate(usuario)
+            return sorted(item['nome'] for item in cliente.get(reverse('disciplina-list')).json())
+
+        self.assertEqual(nomes(self.professor), ['Cálculo I', 'Física I'])
+        # O catálogo de disciplinas (core.catalog) é carregado do principal, mesmo na réplica
+        with CaptureQueriesContext(connections['replica_1']) as consultas:
+            self.assertEqual(nomes(self.aluno), ['Cálculo I', 'Física I'])
+        self.assertFalse([c['sql'] for c in consultas.captured_queries if 'core_disciplina' in c['sql']])
+
+    def test_validacao_de_conflitos_no_principal(self):
+        request = mock.Mock(user=self.professor)
+        serializer = HorarioSerializer(data={
+            'disciplina': self.disciplina.pk, 'dia_semana': 'Segunda-feira',
+            'hora_inicio': '10:30', 'hora_fim': '11:30', 'local': 'Sala 102',
+        }, context={'request': request})
+        with usar_replica('replica_1'):
+            # O conflito com a Sala 102 só existe no principal
+            self.assertFalse(serializer.is_valid())
@@ -0,0 +1,66 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, DiaSemana, Disciplina, Horario
+
+
+class DiaSemanaTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+
+    def _criar(self, dia, hora=8, local='Sala 101'):
+        return Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana=dia,
+            hora_inicio=time(hora, 0), hora_fim=time(hora + 1, 0), local=local,
+        )
+
+    def test_aceita_rotulos_formas_curtas_e_numeros(self):
+        for valor in ('Terça-feira', 'terca', 'TERÇA', '1', 1, DiaSemana.TERCA):
+            self.assertEqual(DiaSemana.de_texto(valor), DiaSemana.TERCA)
+        self.assertIsNone(DiaSemana.de_texto('feriado'))
+        self.assertIsNone(DiaSemana.de_texto(7))
+
+    def test_grava_inteiro_e_consulta_por_rotulo(self):
+        horario = self._criar('Sábado')
+        self.assertEqual(horario.dia_semana, DiaSemana.SABADO)
+        valor_no_banco = Horario.objects.filter(pk=horario.pk).values_list('dia_semana', flat=True).get()
+        self.assertEqual(valor_no_banco, 5)
+        self.assertTrue(Horario.objects.filter(dia_semana='sabado').exists())
+
+    def test_ordenacao_pela_semana_no_banco(self):
+        for dia in ('Domingo', 'Quarta-feira', 'Segunda-feira', 'Sexta-feira'):
+            self._criar(dia, local=f'Sala {dia}')
+        dias = [dia.label for dia in Horario.objects.order_by('dia_semana').values_list('dia_semana', flat=True)]
+        self.assertEqual(dias, ['Segunda-feira', 'Quarta-feira', 'Sexta-feira', 'Domingo'])
+
+    def test_api_recebe_e_devolve_rotulo(self):
+        self.client.force_authenticate(user=self.professor)
+        response = self.client.post(reverse('horario-list'), {
+            'disciplina': self.disciplina.pk, 'dia_semana': 'quinta',
+            'hora_inicio': '10:00', 'hora_fim': '11:00', 'local': 'Sala 101',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['dia_semana'], 'Quinta-feira')
+
+        response = self.client.get(reverse('horario-publico-list'), {'dia_semana': 'Quinta-feira'})
+        self.assertEqual([item['dia_semana'] for item in response.data['results']], ['Quinta-feira'])
+        response = self.client.get(reverse('horario-publico-list'), {'dia_semana': 'feriado'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_conflito_na_segunda_feira(self):
+        # Segunda-feira é o dia 0: não pode ser tratada como "dia não informado"
+        self._criar('Segunda-feira', hora=10)
+        self.client.force_authenticate(user=self.professor)
+        response = self.client.post(reverse('horario-list'), {
+            'disciplina': self.disciplina.pk, 'dia_semana': 'Segunda-feira',
+            'hora_inicio': '10:30', 'hora_fim': '11:30', 'local': 'Sala 202',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
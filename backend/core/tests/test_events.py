@@ -0,0 +1,189 @@
+import asyncio
+import json
+import threading
+from datetime import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.events import TransmissorCache, TransmissorLocal, _criar_transmissor, obter_transmissor
+from core.models import CustomUser, Disciplina, Horario
+
+
+def _evento(tipo='criado', escopos=('curso:Engenharia',)):
+    return {'tipo': tipo, 'horario': {'id': 1}, 'escopos': list(escopos)}
+
+
+async def _coletar(assinatura, quantidade):
+    eventos = []
+    async for evento in assinatura:
+        eventos.append(evento)
+        if len(eventos) == quantidade:
+            break
+    await assinatura.aclose()
+    return eventos
+
+
+class TransmissoresTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_local_entrega_eventos_publicados_de_outra_thread(self):
+        transmissor = TransmissorLocal()
+
+        async def cenario():
+            assinatura = transmissor.assinar(espera=5)
+            proximo = asyncio.ensure_future(assinatura.__anext__())
+            await asyncio.sleep(0)  # assinatura registrada
+            thread = threading.Thread(target=lambda: (
+                transmissor.publicar(_evento('criado')), transmissor.publicar(_evento('removido'))
+            ))
+            thread.start()
+            thread.join()
+            return [await proximo, *await _coletar(assinatura, 1)]
+
+        eventos = asyncio.run(cenario())
+        self.assertEqual([evento['tipo'] for evento in eventos], ['criado', 'removido'])
+        self.assertEqual([evento['id'] for evento in eventos], [1, 2])
+
+    def test_local_recupera_eventos_perdidos_pelo_last_event_id(self):
+        transmissor = TransmissorLocal()
+        for tipo in ('criado', 'atualizado', 'removido'):
+            transmissor.publicar(_evento(tipo))
+        eventos = asyncio.run(_coletar(transmissor.assinar(desde=1), 2))
+        self.assertEqual([evento['tipo'] for evento in eventos], ['atualizado', 'removido'])
+
+    def test_local_heartbeat_sem_eventos(self):
+        eventos = asyncio.run(_coletar(TransmissorLocal().assinar(espera=0.01), 1))
+        self.assertEqual(eventos, [None])
+
+    def test_local_encerra_assinante_lento(self):
+        transmissor = TransmissorLocal(tamanho_fila=2)
+
+        async def cenario():
+            assinatura = transmissor.assinar()
+            proximo = asyncio.ensure_future(assinatura.__anext__())
+            await asyncio.sleep(0)
+            for _ in range(5):
+                transmissor.publicar(_evento())
+            await asyncio.sleep(0)
+            with self.assertRaises(StopAsyncIteration):
+                await proximo
+
+        asyncio.run(cenario())
+
+    def test_cache_entrega_pela_sequencia(self):
+        transmissor = TransmissorCache(intervalo=0.01)
+        transmissor.publicar(_evento('criado'))
+        transmissor.publicar(_evento('atualizado'))
+        eventos = asyncio.run(_coletar(transmissor.assinar(desde=0), 2))
+        self.assertEqual([(evento['id'], evento['tipo']) for evento in eventos], [(1, 'criado'), (2, 'atualizado')])
+
+    def test_recentes_sem_esperar(self):
+        for transmissor in (TransmissorLocal(), TransmissorCache()):
+            with self.subTest(transmissor=type(transmissor).__name__):
+                cache.clear()
+                transmissor.publicar(_evento('criado'))
+                transmissor.publicar(_evento('atualizado'))
+                self.assertEqual(transmissor.recentes(), ([], 2))
+                eventos, ultimo = transmissor.recentes(desde=1)
+                self.assertEqual([evento['tipo'] for evento in eventos], ['atualizado'])
+                self.assertEqual(ultimo, 2)
+
+
+class FeedDeAlteracoesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _criar_transmissor.cache_clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.direito = Disciplina.objects.create(nome='Direito Civil', curso='Direito', codigo='DIR001')
+
+    def _criar(self, disciplina, local='Sala 101'):
+        return Horario.objects.create(
+            professor_monitor=self.professor, disciplina=disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local=local,
+        )
+
+    def test_sinais_publicam_apos_o_commit(self):
+        transmissor = obter_transmissor()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            horario = self._criar(self.calculo)
+        self.assertEqual(transmissor.recentes(desde=0)[0], [])
+        for callback in callbacks:
+            callback()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            horario.local = 'Sala 202'
+            horario.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            horario.delete()
+
+        eventos = transmissor.recentes(desde=0)[0]
+        self.assertEqual([evento['tipo'] for evento in eventos], ['criado', 'atualizado', 'removido'])
+        self.assertEqual(eventos[0]['horario']['dia_semana'], 'Segunda-feira')
+        self.assertEqual(eventos[0]['horario']['hora_inicio'], '08:00:00')
+        # A mudança de sala interessa a quem acompanha as duas salas
+        self.assertIn('local:Sala 101', eventos[1]['escopos'])
+        self.assertIn('local:Sala 202', eventos[1]['escopos'])
+        self.assertIn('curso:Engenharia', eventos[2]['escopos'])
+
+    async def test_stream_sse_filtrado(self):
+        await sync_to_async(self._publicar_dois_horarios)()
+        response = await self.async_client.get(
+            reverse('horario-alteracoes'), {'curso': 'Engenharia'}, headers={'Last-Event-ID': '0'},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        partes = []
+        async for parte in response.streaming_content:
+            partes.append(parte.decode('utf-8'))
+            if len(partes) == 2:
+                break
+        await response.streaming_content.aclose()
+
+        self.assertEqual(partes[0], 'retry: 3000\n\n')
+        identificador, dados = partes[1].strip().split('\n')
+        self.assertEqual(identificador, 'id: 2')  # o 1 é de outro curso
+        evento = json.loads(dados[len('data: '):])
+        self.assertEqual(evento['tipo'], 'criado')
+        self.assertEqual(evento['horario']['disciplina'], self.calculo.pk)
+
+    def test_sob_wsgi_responde_os_eventos_pendentes_e_termina(self):
+        self._publicar_dois_horarios()
+        response = self.client.get(
+            reverse('horario-alteracoes'), {'curso': 'Engenharia'}, headers={'Last-Event-ID': '0'},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        partes = [parte.decode('utf-8') for parte in response.streaming_content]
+        self.assertEqual(partes[0], 'retry: 10000\n\n')
+        self.assertEqual([parte.split('\n')[0] for parte in partes[1:]], ['id: 2', 'id: 2'])
+        self.assertIn('data: ', partes[1])
+        self.assertEqual(partes[2], 'id: 2\n\n')
+
+        # Sem Last-Event-ID: nada pendente, só o id a partir do qual consultar
+        response = self.client.get(reverse('horario-alteracoes'))
+        self.assertEqual(b''.join(response.streaming_content), b'retry: 10000\n\nid: 2\n\n')
+
+    @override_settings(AGENDA_EVENTOS_TRANSMISSOR='local')
+    def test_transmissor_local_so_quando_configurado(self):
+        self.assertIsInstance(obter_transmissor(), TransmissorLocal)
+
+    def test_transmissor_padrao_e_o_cache(self):
+        # Sequência única entre processos (com um cache compartilhado)
+        self.assertIsInstance(obter_transmissor(), TransmissorCache)
+
+    def _publicar_dois_horarios(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._criar(self.direito, local='Sala 301')
+            self._criar(self.calculo)
+
+    async def test_filtro_invalido(self):
+        response = await self.async_client.get(reverse('horario-alteracoes'), {'professor': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['status'], 'error')
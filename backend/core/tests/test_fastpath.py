@@ -0,0 +1,112 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from core.fastpath import obter_serializador_compilado
+from core.models import CustomUser, Disciplina, Horario
+from core.planner import planejar_consulta
+from core.serializers import HorarioDetailSerializer, HorarioPublicSerializer, HorarioSerializer
+
+
+def criar_dados():
+    ana = CustomUser.objects.create_user(
+        username='ana', email='ana@ufersa.edu.br', password='password',
+        tipo='professor', first_name='Ana', last_name='Conceição',
+    )
+    semnome = CustomUser.objects.create_user(
+        username='semnome', email='semnome@ufersa.edu.br', password='password', tipo='monitor'
+    )
+    calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001', semestre=1)
+    fisica = Disciplina.objects.create(nome='Física', curso='Física', codigo='FIS001', ativo=False)
+    for n, (professor, disciplina, dia) in enumerate([
+        (ana, calculo, 'Segunda-feira'), (semnome, fisica, 'Sexta-feira'),
+        (ana, fisica, 'Domingo'), (semnome, calculo, 'Segunda-feira'),
+    ]):
+        Horario.objects.create(
+            professor_monitor=professor, disciplina=disciplina, dia_semana=dia,
+            hora_inicio=time(8 + n, 15), hora_fim=time(9 + n, 45), local=f'Sala "{n}"', ativo=n != 2,
+        )
+    return ana
+
+
+class SerializadorCompiladoTest(TestCase):
+    def setUp(self):
+        criar_dados()
+
+    def assertSaidaIdentica(self, serializer_class):
+        compilado = obter_serializador_compilado(serializer_class, Horario)
+        self.assertIsNotNone(compilado)
+        queryset = planejar_consulta(Horario.objects.order_by('id'), serializer_class)
+        esperado = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        obtido = JSONRenderer().render(compilado.serializar(Horario.objects.order_by('id').values(*compilado.campos)))
+        self.assertEqual(obtido, esperado)
+
+    def test_saida_identica_aos_serializers(self):
+        for serializer_class in (HorarioPublicSerializer, HorarioDetailSerializer, HorarioSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertSaidaIdentica(serializer_class)
+
+    def test_serializer_nao_compilavel_usa_o_caminho_padrao(self):
+        class ComMetodoSemDependencias(serializers.ModelSerializer):
+            descricao = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Horario
+                fields = ['id', 'descricao']
+
+            def get_descricao(self, obj):
+                return str(obj)
+
+        self.assertIsNone(obter_serializador_compilado(ComMetodoSemDependencias, Horario))
+
+
+class ListagensRapidasTests(APITestCase):
+    """As listagens pelo caminho rápido devolvem exatamente os mesmos bytes."""
+
+    def setUp(self):
+        self.professor = criar_dados()
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@ufersa.edu.br', password='password'
+        )
+
+    def _corpos(self, url, params=None):
+        corpos = []
+        for rapida in (True, False):
+            cache.clear()
+            with override_settings(AGENDA_SERIALIZACAO_RAPIDA=rapida):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            corpos.append(response.content)
+        return corpos
+
+    def assertMesmosBytes(self, url, params=None):
+        rapida, padrao = self._corpos(url, params)
+        self.assertEqual(rapida, padrao)
+
+    def test_listagem_publica(self):
+        url = reverse('horario-publico-list')
+        self.assertMesmosBytes(url)
+        self.assertMesmosBytes(url, {'search': 'calculo'})
+        self.assertMesmosBytes(url, {'ordering': '-hora_fim', 'page_size': 2})
+        self.assertMesmosBytes(url, {'dia_semana': 'Segunda-feira'})
+
+    def test_listagens_autenticadas(self):
+        url = reverse('horario-list')
+        for usuario in (self.professor, self.admin):
+            self.client.force_authenticate(user=usuario)
+            self.assertMesmosBytes(url)
+            self.assertMesmosBytes(url, {'page_size': 1})
+
+    def test_cursor_da_pagina_seguinte(self):
+        url = reverse('horario-publico-list')
+        cache.clear()
+        primeira = self.client.get(url, {'page_size': 2}).data
+        segunda = self.client.get(primeira['next']).data
+        ids = [item['id'] for item in primeira['results'] + segunda['results']]
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
@@ -0,0 +1,58 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+class ProfessorNomeFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horarios = {}
+        for hora, (username, first_name, last_name) in enumerate([
+            ('ana', 'Ana Beatriz', 'Conceição Lima'),
+            ('joao', 'João', 'Lima'),
+            ('semnome', '', ''),
+        ], start=8):
+            professor = CustomUser.objects.create_user(
+                username=username, email=f'{username}@ufersa.edu.br', password='password',
+                tipo='professor', first_name=first_name, last_name=last_name,
+            )
+            self.horarios[username] = Horario.objects.create(
+                professor_monitor=professor, disciplina=disciplina, dia_semana='Segunda-feira',
+                hora_inicio=time(hora, 0), hora_fim=time(hora, 30), local=f'Sala {hora}',
+            ).pk
+        self.url = reverse('horario-publico-list')
+
+    def _filtrar(self, nome):
+        response = self.client.get(self.url, {'professor_nome': nome})
+        return sorted(item['id'] for item in response.data['results'])
+
+    def test_nome_completo_e_varios_termos(self):
+        self.assertEqual(self._filtrar('ana lima'), [self.horarios['ana']])
+        self.assertEqual(self._filtrar('Beatriz Conceição'), [self.horarios['ana']])
+        self.assertEqual(self._filtrar('lima'), sorted([self.horarios['ana'], self.horarios['joao']]))
+
+    def test_ignora_acentos_e_maiusculas(self):
+        self.assertEqual(self._filtrar('JOAO'), [self.horarios['joao']])
+        self.assertEqual(self._filtrar('conceicao'), [self.horarios['ana']])
+
+    def test_sem_nome_usa_o_username(self):
+        self.assertEqual(self._filtrar('semnome'), [self.horarios['semnome']])
+
+    def test_nome_busca_acompanha_alteracoes(self):
+        professor = CustomUser.objects.get(username='joao')
+        professor.last_name = 'Araújo'
+        professor.save(update_fields=['last_name'])
+        self.assertEqual(CustomUser.objects.get(pk=professor.pk).nome_busca, 'joao araujo')
+        self.assertEqual(self._filtrar('joao araujo'), [self.horarios['joao']])
+
+    def test_usa_o_indice_de_texto_dos_nomes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self._filtrar('beatriz li'), [self.horarios['ana']])
+        self.assertTrue(any('core_usuario_nome_busca MATCH' in consulta['sql'] for consulta in consultas))
@@ -0,0 +1,124 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.grid import COLUNAS, obter_grade, rematerializar_todas
+from core.models import CustomUser, Disciplina, GradeSemanal, Horario
+
+LOCAL = COLUNAS.index('local')
+
+
+def _locais(dados):
+    return [[horario[LOCAL] for horario in dia] for dia in dados['grade']]
+
+
+class GradeSemanalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.outro = CustomUser.objects.create_user(
+            username='monitor', email='monitor@ufersa.edu.br', password='password', tipo='monitor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horario = Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+
+    def _grade(self, tipo, chave):
+        return GradeSemanal.objects.get(tipo=tipo, chave=chave).dados
+
+    def test_criacao_materializa_grades_do_professor_curso_e_local(self):
+        for tipo, chave in (('professor', str(self.professor.pk)), ('curso', 'Engenharia'), ('local', 'Sala 101')):
+            self.assertEqual(_locais(self._grade(tipo, chave))[0], ['Sala 101'])
+
+    def test_leitura_nao_recalcula(self):
+        obter_grade('local', 'Sala 101')
+        with self.assertNumQueries(1):
+            dados = obter_grade('local', 'Sala 101')
+        self.assertEqual(dados['dias'][0], 'Segunda-feira')
+
+    def test_mudanca_de_local_e_professor_atualiza_grades_antigas(self):
+        horario = Horario.objects.get(pk=self.horario.pk)
+        horario.local = 'Sala 202'
+        horario.professor_monitor = self.outro
+        horario.dia_semana = 'Quarta-feira'
+        horario.save()
+
+        self.assertEqual(_locais(self._grade('local', 'Sala 101'))[0], [])
+        self.assertEqual(_locais(self._grade('professor', str(self.professor.pk)))[0], [])
+        self.assertEqual(_locais(self._grade('local', 'Sala 202'))[2], ['Sala 202'])
+        self.assertEqual(_locais(self._grade('professor', str(self.outro.pk)))[2], ['Sala 202'])
+
+    def test_exclusao_e_desativacao_removem_da_grade(self):
+        self.horario.ativo = False
+        self.horario.save()
+        self.assertEqual(_locais(self._grade('curso', 'Engenharia'))[0], [])
+
+        self.horario.ativo = True
+        self.horario.save()
+        self.horario.delete()
+        self.assertEqual(_locais(self._grade('curso', 'Engenharia'))[0], [])
+
+    def test_rematerializar_remove_grades_obsoletas(self):
+        GradeSemanal.objects.create(tipo='local', chave='Sala extinta', dados={})
+        self.assertEqual(rematerializar_todas(), 3)
+        self.assertFalse(GradeSemanal.objects.filter(chave='Sala extinta').exists())
+
+
+class GradeEndpointTests(APITestCase):
+    def setUp(self):
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=disciplina, dia_semana='Sexta-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+
+    def test_grade_publica_exige_um_unico_filtro(self):
+        url = reverse('horario-publico-grade')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {'curso': 'Engenharia', 'local': 'Sala 101'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        response = self.client.get(url, {'curso': 'Engenharia'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(_locais(response.data)[4], ['Sala 101'])
+
+    def test_grade_publica_de_chave_invalida_ou_desconhecida(self):
+        url = reverse('horario-publico-grade')
+        for params in [{'professor': 'abc'}, {'professor': '99999999999999999999999'}, {'professor': '-1'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+        outro = CustomUser.objects.create_user(
+            username='sem_horarios', email='sem@ufersa.edu.br', password='password', tipo='professor',
+        )
+        for params in [{'professor': outro.pk}, {'curso': 'Medicina'}, {'local': 'Sala 999'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(GradeSemanal.objects.filter(chave__in=['Medicina', 'Sala 999']).exists())
+
+        # Chaves desconhecidas não consultam o banco a cada pedido
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'local': 'Sala 998'}).status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url, {'professor': f'0{self.professor.pk}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['chave'], str(self.professor.pk))
+
+    def test_grade_do_usuario_logado(self):
+        self.client.force_authenticate(user=self.professor)
+        response = self.client.get(reverse('horario-grade'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['chave'], str(self.professor.pk))
+        self.assertEqual(_locais(response.data)[4], ['Sala 101'])
@@ -0,0 +1,80 @@
+from concurrent.futures import Future
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.hashing import encerrar_executor, executor_de_hash
+from core.models import CustomUser
+
+
+@override_settings(AGENDA_HASH_PROCESSOS=1, AGENDA_HASH_FILA=0)
+class PoolDeHashTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(encerrar_executor)
+        self.usuario = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor',
+        )
+
+    def login(self, senha='password'):
+        return self.client.post(reverse('token_obtain_pair'), {'username': 'professor', 'password': senha})
+
+    def ocupar_pool(self):
+        executor = executor_de_hash()
+        executor._vagas.acquire()
+        self.addCleanup(executor._vagas.release)
+
+    def test_hash_calculado_no_pool(self):
+        self.assertTrue(self.usuario.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login('errada').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(executor_de_hash()._pool._processes)
+
+    def test_pool_cheio_responde_429(self):
+        self.ocupar_pool()
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        response = self.client.post(reverse('register'), {
+            'username': 'aluno', 'email': 'aluno@alunos.ufersa.edu.br', 'password': 'S3nh@Forte!2024',
+            'first_name': 'Bia', 'last_name': 'Souza',
+        })
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(CustomUser.objects.filter(username='aluno').exists())
+
+    @override_settings(AGENDA_HASH_TIMEOUT=0.01)
+    def test_tempo_esgotado_responde_503(self):
+        executor = executor_de_hash()
+        futuro = Future()
+        self.addCleanup(futuro.set_result, None)  # devolve a vaga
+        with mock.patch.object(executor._pool, 'submit', return_value=futuro):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertIn('demorou', response.json()['message'])
+
+    def test_fora_da_api_hash_na_thread(self):
+        # Admin (ModelBackend, inclusive o hash fictício de usuários inexistentes) e
+        # comandos como changepassword não sabem responder 429: nunca usam o pool
+        self.ocupar_pool()
+        self.assertTrue(self.client.login(username='professor', password='password'))
+        self.assertIsNone(authenticate(username='ninguem', password='password'))
+        self.usuario.set_password('nova-senha')
+        self.assertTrue(self.usuario.check_password('nova-senha'))
+
+    def test_login_atualiza_hash_antigo(self):
+        hasher = PBKDF2PasswordHasher()
+        CustomUser.objects.filter(pk=self.usuario.pk).update(
+            password=hasher.encode('password', hasher.salt(), iterations=1000)
+        )
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.usuario.refresh_from_db()
+        self.assertEqual(hasher.decode(self.usuario.password)['iterations'], hasher.iterations)
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
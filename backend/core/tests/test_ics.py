@@ -0,0 +1,122 @@
+from datetime import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.cache import obter_geracoes
+from core.ics import PREFIXO_ICS, _dobrar, _escapar
+from core.models import CustomUser, Disciplina, Horario
+
+
+class CalendarioFeedTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='ana', email='ana@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.horario = Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101, Bloco A',
+        )
+        Horario.objects.create(
+            professor_monitor=self.professor, disciplina=self.disciplina, dia_semana='Quarta-feira',
+            hora_inicio=time(14, 0), hora_fim=time(16, 0), local='Sala 102', ativo=False,
+        )
+        self.url = reverse('calendario', args=['professor', self.professor.pk])
+
+    def test_feed_do_professor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        conteudo = response.content.decode('utf-8')
+        self.assertTrue(conteudo.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(conteudo.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(conteudo.count('BEGIN:VEVENT'), 1)  # só o horário ativo
+        self.assertIn('RRULE:FREQ=WEEKLY;BYDAY=MO\r\n', conteudo)
+        self.assertIn('DTSTART;TZID=America/Fortaleza:', conteudo)
+        self.assertIn('T080000\r\n', conteudo)
+        self.assertIn('LOCATION:Sala 101\\, Bloco A\r\n', conteudo)
+        self.assertIn('SUMMARY:Cálculo I - Ana Conceição\r\n', conteudo)
+        self.assertIn(f'UID:horario-{self.horario.pk}@', conteudo)
+
+    def test_feeds_por_disciplina_curso_e_local(self):
+        for tipo, chave in [('disciplina', self.disciplina.pk), ('curso', 'Engenharia'), ('local', 'Sala 101, Bloco A')]:
+            with self.subTest(tipo=tipo):
+                response = self.client.get(reverse('calendario', args=[tipo, chave]))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.content.decode('utf-8').count('BEGIN:VEVENT'), 1)
+
+    def test_feed_em_cache_sem_consultas_e_get_condicional(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            repetida = self.client.get(self.url)
+        self.assertEqual(repetida.content, response.content)
+
+        with self.assertNumQueries(0):
+            condicional = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(condicional.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_alteracoes_invalidam_os_feeds(self):
+        por_disciplina = reverse('calendario', args=['disciplina', self.disciplina.pk])
+        etag_professor = self.client.get(self.url)['ETag']
+        etag_disciplina = self.client.get(por_disciplina)['ETag']
+
+        self.disciplina.nome = 'Álgebra Linear'
+        self.disciplina.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag_professor)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('SUMMARY:Álgebra Linear - Ana Conceição', response.content.decode('utf-8'))
+
+        self.professor.first_name = 'Beatriz'
+        self.professor.save()
+        response = self.client.get(por_disciplina, HTTP_IF_NONE_MATCH=etag_disciplina)
+        self.assertIn('SUMMARY:Álgebra Linear - Beatriz Conceição', response.content.decode('utf-8'))
+
+        self.horario.delete()
+        self.assertNotIn('BEGIN:VEVENT', self.client.get(self.url).content.decode('utf-8'))
+
+    def test_feed_inexistente(self):
+        for tipo, chave in [
+            ('professor', 999), ('professor', 'abc'), ('disciplina', 999), ('sala', 'x'),
+            ('curso', 'Medicina'), ('local', 'Sala 999'),
+        ]:
+            with self.subTest(tipo=tipo, chave=chave):
+                response = self.client.get(reverse('calendario', args=[tipo, chave]))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_curso_e_local_desconhecidos_nao_criam_entradas_no_cache(self):
+        with patch('core.ics.obter_geracoes', wraps=obter_geracoes) as geracoes, \
+                patch('core.ics.cache.set', wraps=cache.set) as guardar:
+            for numero in range(3):
+                self.client.get(reverse('calendario', args=['curso', f'Curso {numero}']))
+                self.client.get(reverse('calendario', args=['local', f'Sala {numero}']))
+        # Nenhum escopo ou feed por nome inventado
+        geracoes.assert_not_called()
+        self.assertFalse([chamada for chamada in guardar.call_args_list if chamada.args[0].startswith(PREFIXO_ICS)])
+
+    def test_nome_com_espacos_nas_pontas_usa_o_mesmo_feed(self):
+        response = self.client.get(reverse('calendario', args=['curso', 'Engenharia']))
+        with self.assertNumQueries(0):
+            repetida = self.client.get(reverse('calendario', args=['curso', ' Engenharia ']))
+        self.assertEqual(repetida.status_code, status.HTTP_200_OK)
+        self.assertEqual(repetida['ETag'], response['ETag'])
+
+
+class FormatacaoIcsTest(TestCase):
+    def test_escapa_textos(self):
+        self.assertEqual(_escapar('a;b,c\\d\ne'), 'a\\;b\\,c\\\\d\\ne')
+
+    def test_dobra_linhas_longas_sem_partir_caracteres(self):
+        linha = 'DESCRIPTION:' + 'ção ' * 40
+        dobrada = _dobrar(linha)
+        partes = dobrada.split('\r\n')
+        self.assertGreater(len(partes), 1)
+        self.assertTrue(all(len(parte.encode('utf-8')) <= 75 for parte in partes))
+        self.assertTrue(all(parte.startswith(' ') for parte in partes[1:]))
+        self.assertEqual(partes[0] + ''.join(parte[1:] for parte in partes[1:]), linha)
@@ -0,0 +1,81 @@
+from datetime import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+class ImportacaoHorariosTests(APITestCase):
+    def setUp(self):
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.outro = CustomUser.objects.create_user(
+            username='outro', email='outro@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.url = reverse('horario-importar')
+        self.client.force_authenticate(user=self.professor)
+
+    def _linha(self, **dados):
+        linha = {
+            'disciplina': 'CAL001',
+            'dia_semana': 'Segunda-feira',
+            'hora_inicio': '08:00',
+            'hora_fim': '10:00',
+            'local': 'Sala 101',
+        }
+        linha.update(dados)
+        return linha
+
+    def test_importa_json(self):
+        linhas = [
+            self._linha(),
+            self._linha(hora_inicio='10:00', hora_fim='12:00'),
+            self._linha(disciplina=str(self.disciplina.pk), dia_semana='Terça-feira'),
+        ]
+        response = self.client.post(self.url, linhas, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['total'], 3)
+        self.assertEqual(Horario.objects.filter(professor_monitor=self.professor).count(), 3)
+
+    def test_importa_csv_com_ponto_e_virgula(self):
+        conteudo = (
+            'disciplina;dia_semana;hora_inicio;hora_fim;local\n'
+            'CAL001;Segunda-feira;08:00;10:00;Sala 101\n'
+            'CAL001;Quarta-feira;14:00;16:00;Lab 2\n'
+        ).encode('utf-8')
+        arquivo = SimpleUploadedFile('grade.csv', conteudo, content_type='text/csv')
+        response = self.client.post(self.url, {'arquivo': arquivo}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Horario.objects.count(), 2)
+
+    def test_erros_por_linha_e_nada_gravado(self):
+        Horario.objects.create(
+            professor_monitor=self.outro, disciplina=self.disciplina, dia_semana='Sexta-feira',
+            hora_inicio=time(9, 0), hora_fim=time(11, 0), local='Sala 300',
+        )
+        linhas = [
+            self._linha(),
+            self._linha(hora_inicio='09:00', hora_fim='11:00', local='Sala 102'),  # conflito no lote
+            self._linha(disciplina='NAOEXISTE'),
+            self._linha(hora_inicio='12:00', hora_fim='11:00'),
+            self._linha(dia_semana='Sexta-feira', hora_inicio='10:00', hora_fim='12:00', local='Sala 300'),
+        ]
+        with self.assertNumQueries(2):  # disciplinas + pré-carga de conflitos
+            response = self.client.post(self.url, linhas, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        erros = {item['linha']: item['erros'] for item in response.data['errors']['linhas']}
+        self.assertEqual(set(erros), {1, 2, 3, 4, 5})
+        self.assertIn('non_field_errors', erros[2])
+        self.assertIn('disciplina', erros[3])
+        self.assertIn('hora_fim', erros[4])
+        self.assertIn('local', erros[5])
+        self.assertEqual(Horario.objects.count(), 1)
+
+    def test_corpo_invalido(self):
+        response = self.client.post(self.url, {'foo': 'bar'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
-from core.models import CustomUser, Disciplina, Horario
+from core.models import CustomUser, DiaSemana, Disciplina, Horario
 from datetime import time
 
 User = get_user_model()
@@ -132,7 +132,7 @@ class HorarioModelTest(TestCase):
         """Teste se um horário é criado corretamente"""
         self.assertEqual(self.horario.professor_monitor, self.professor)
         self.assertEqual(self.horario.disciplina, self.disciplina)
-        self.assertEqual(self.horario.dia_semana, "Segunda-feira")
+        self.assertEqual(self.horario.dia_semana, DiaSemana.SEGUNDA)
         self.assertEqual(self.horario.hora_inicio, time(14, 0))
         self.assertEqual(self.horario.hora_fim, time(16, 0))
         self.assertEqual(self.horario.local, "Sala 101")
@@ -163,7 +163,7 @@ class HorarioModelTest(TestCase):
         # Verificar se foi atualizado
         self.horario.refresh_from_db()
         self.assertEqual(self.horario.local, "Sala 102")
-        self.assertEqual(self.horario.dia_semana, "Terça-feira")
+        self.assertEqual(self.horario.dia_semana, DiaSemana.TERCA)
     
     def test_horario_filter_by_dia_semana(self):
         """Teste se é possível filtrar horários por dia da semana"""
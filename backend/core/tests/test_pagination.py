@@ -0,0 +1,93 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import time
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+class HorarioKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        # Criados fora da ordem da grade para garantir que a ordenação vem da chave
+        for dia, hora in [
+            ('Sexta-feira', 8), ('Segunda-feira', 14), ('Terça-feira', 10),
+            ('Segunda-feira', 8), ('Quarta-feira', 16), ('Terça-feira', 8),
+            ('Domingo', 9),
+        ]:
+            Horario.objects.create(
+                professor_monitor=self.professor,
+                disciplina=self.disciplina,
+                dia_semana=dia,
+                hora_inicio=time(hora, 0),
+                hora_fim=time(hora + 1, 0),
+                local=f'Sala {dia} {hora}',
+            )
+        self.url = reverse('horario-publico-list')
+
+    def _percorrer(self, url):
+        vistos = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('message', response.data)
+            vistos.extend((item['dia_semana'], item['hora_inicio']) for item in response.data['results'])
+            url = response.data['next']
+        return vistos
+
+    def test_paginas_seguem_ordem_da_grade(self):
+        vistos = self._percorrer(f'{self.url}?page_size=2')
+        self.assertEqual(vistos, [
+            ('Segunda-feira', '08:00:00'), ('Segunda-feira', '14:00:00'),
+            ('Terça-feira', '08:00:00'), ('Terça-feira', '10:00:00'),
+            ('Quarta-feira', '16:00:00'), ('Sexta-feira', '08:00:00'),
+            ('Domingo', '09:00:00'),
+        ])
+
+    def test_link_previous_retorna_pagina_anterior(self):
+        primeira = self.client.get(f'{self.url}?page_size=3')
+        segunda = self.client.get(primeira.data['next'])
+        self.assertIsNone(primeira.data['previous'])
+        anterior = self.client.get(segunda.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in anterior.data['results']],
+            [item['id'] for item in primeira.data['results']],
+        )
+
+    def test_page_size_limitado_pelo_maximo(self):
+        with self.settings(AGENDA_MAX_PAGE_SIZE=4):
+            response = self.client.get(f'{self.url}?page_size=100')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_cursor_invalido(self):
+        response = self.client.get(f'{self.url}?cursor=nao-e-um-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_adulterado(self):
+        for params, posicao in [
+            ('', ['x', 'y', 'z']),
+            ('', [0, '25:99', 1]),
+            ('', [0, None, 1]),
+            ('', [0, '08:00:00', 10 ** 30]),
+            ('&ordering=-ultima_atualizacao', ['ontem', 1]),
+        ]:
+            with self.subTest(posicao=posicao):
+                cursor = urlsafe_b64encode(json.dumps({'p': posicao}).encode()).decode()
+                response = self.client.get(f'{self.url}?cursor={cursor}{params}')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertEqual(response.data['message'], 'Cursor inválido.')
+
+    def test_ordering_decrescente(self):
+        vistos = self._percorrer(f'{self.url}?page_size=3&ordering=-hora_inicio')
+        horas = [hora for _, hora in vistos]
+        self.assertEqual(horas, sorted(horas, reverse=True))
+        self.assertEqual(len(vistos), 7)
@@ -0,0 +1,110 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+from core.planner import planejar_consulta
+from core.serializers import HorarioDetailSerializer, HorarioPublicSerializer, HorarioSerializer
+
+
+class ConsultasConstantesMixin:
+    """
+    Mede as consultas de uma requisição com poucas e com mais linhas: se o
+    número cresce junto com as linhas, algum relacionamento é lido por linha.
+    """
+    def contar_consultas(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(consultas)
+
+    def assertConsultasConstantes(self, url, criar_linhas, params=None):
+        criar_linhas(3)
+        poucas = self.contar_consultas(url, params)
+        criar_linhas(6)
+        muitas = self.contar_consultas(url, params)
+        self.assertEqual(poucas, muitas, f"{url}: {poucas} consultas com 3 linhas, {muitas} com 9")
+
+
+class ConsultasConstantesTests(ConsultasConstantesMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@ufersa.edu.br', password='password'
+        )
+        self.criados = 0
+
+    def criar_horarios(self, quantidade):
+        # Cada horário com disciplina e professor próprios (o pior caso para N+1)
+        for _ in range(quantidade):
+            n = self.criados
+            self.criados += 1
+            professor = self.professor if n % 2 == 0 else CustomUser.objects.create_user(
+                username=f'monitor{n}', email=f'monitor{n}@ufersa.edu.br', password='password', tipo='monitor'
+            )
+            disciplina = Disciplina.objects.create(nome=f'Disciplina {n}', curso='Engenharia', codigo=f'DIS{n:03}')
+            Horario.objects.create(
+                professor_monitor=professor, disciplina=disciplina, dia_semana=n % 5,
+                hora_inicio=time(6 + n % 14, 0), hora_fim=time(6 + n % 14, 30), local=f'Sala {n}',
+            )
+
+    def test_listagem_do_professor(self):
+        self.client.force_authenticate(user=self.professor)
+        self.assertConsultasConstantes(reverse('horario-list'), self.criar_horarios)
+
+    def test_listagem_do_administrador(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertConsultasConstantes(reverse('horario-list'), self.criar_horarios)
+        self.assertConsultasConstantes(
+            reverse('horario-list'), self.criar_horarios, {'ordering': '-hora_fim'}
+        )
+
+    def test_listagem_publica(self):
+        self.assertConsultasConstantes(reverse('horario-publico-list'), self.criar_horarios)
+        self.assertConsultasConstantes(
+            reverse('horario-publico-list'), self.criar_horarios, {'search': 'disciplina'}
+        )
+
+    def test_detalhe_com_relacionamentos_em_uma_consulta(self):
+        self.criar_horarios(1)
+        horario = Horario.objects.get()
+        self.client.force_authenticate(user=self.professor)
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('horario-detail', args=[horario.pk]))
+        self.assertEqual(response.data['disciplina']['codigo'], 'DIS000')
+        self.assertEqual(response.data['professor_monitor']['username'], 'professor')
+        self.assertNotIn('texto_busca', response.data)
+        leituras = [c['sql'] for c in consultas if c['sql'].startswith('SELECT "core_horario"')]
+        self.assertEqual(len(leituras), 1)
+
+
+class PlanejarConsultaTest(TestCase):
+    def test_deriva_joins_e_colunas_do_serializer(self):
+        queryset = planejar_consulta(Horario.objects.all(), HorarioPublicSerializer)
+        self.assertEqual(set(queryset.query.select_related), {'disciplina', 'professor_monitor'})
+        campos, adiar = queryset.query.deferred_loading
+        self.assertFalse(adiar)  # only(), não defer()
+        self.assertIn('professor_monitor__first_name', campos)
+        self.assertNotIn('professor_monitor__password', campos)
+        self.assertNotIn('texto_busca', campos)
+
+    def test_chave_estrangeira_por_id_nao_gera_join(self):
+        queryset = planejar_consulta(Horario.objects.all(), HorarioSerializer)
+        self.assertFalse(queryset.query.select_related)
+        self.assertIn('disciplina', queryset.query.deferred_loading[0])
+
+    def test_acoes_de_escrita_nao_restringem_colunas(self):
+        queryset = planejar_consulta(Horario.objects.all(), HorarioDetailSerializer, colunas=False)
+        self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+        self.assertEqual(set(queryset.query.select_related), {'disciplina', 'professor_monitor'})
@@ -0,0 +1,86 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+from core.profiling import ColetorConsultas, estatisticas
+
+
+class ColetorConsultasTest(TestCase):
+    def test_detecta_consultas_repetidas(self):
+        disciplinas = [
+            Disciplina.objects.create(nome=f'Disciplina {i}', curso='Engenharia', codigo=f'DIS00{i}')
+            for i in range(4)
+        ]
+        coletor = ColetorConsultas()
+        with connection.execute_wrapper(coletor):
+            Disciplina.objects.count()
+            for disciplina in disciplinas:  # N+1 clássico: mesma consulta, parâmetros diferentes
+                Disciplina.objects.get(pk=disciplina.pk)
+        self.assertEqual(coletor.total, 5)
+        repetidas = coletor.repetidas(limiar=3)
+        self.assertEqual(len(repetidas), 1)
+        self.assertEqual(repetidas[0][1], 4)
+
+
+@override_settings(AGENDA_PROFILING=True)
+class ProfilingMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        estatisticas.limpar()
+        professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password', tipo='professor'
+        )
+        disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        Horario.objects.create(
+            professor_monitor=professor, disciplina=disciplina, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@ufersa.edu.br', password='password'
+        )
+
+    def test_server_timing_e_agregados_por_endpoint(self):
+        response = self.client.get(reverse('horario-publico-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('consultas', response['Server-Timing'])
+
+        self.client.get(reverse('horario-publico-list'))
+        self.client.force_authenticate(user=self.admin)
+        resumo = self.client.get(reverse('perfil-requisicoes')).data
+        self.assertTrue(resumo['ativo'])
+        por_endpoint = {item['endpoint']: item for item in resumo['endpoints']}
+        item = por_endpoint['horario-publico-list:list']
+        self.assertEqual(item['requisicoes'], 2)
+        self.assertGreater(item['consultas_max'], 0)
+        self.assertGreater(item['bytes_medio'], 0)
+
+        self.assertEqual(self.client.delete(reverse('perfil-requisicoes')).status_code, status.HTTP_204_NO_CONTENT)
+        # Só resta a própria requisição DELETE, registrada depois da limpeza
+        self.assertEqual([item['endpoint'] for item in estatisticas.resumo()], ['DELETE perfil-requisicoes'])
+
+    def test_exportacao_em_streaming_conta_as_consultas_do_corpo(self):
+        response = self.client.get(reverse('horario-publico-exportar'), {'formato': 'csv'})
+        self.assertEqual(estatisticas.resumo(), [])  # registrada só no fim do corpo
+        corpo = b''.join(response.streaming_content)
+
+        item = {item['endpoint']: item for item in estatisticas.resumo()}['horario-publico-exportar:exportar']
+        self.assertGreater(item['consultas_max'], 0)
+        self.assertEqual(item['bytes_medio'], len(corpo))
+
+    def test_endpoint_restrito_a_administradores(self):
+        professor = CustomUser.objects.get(username='professor')
+        self.client.force_authenticate(user=professor)
+        self.assertEqual(self.client.get(reverse('perfil-requisicoes')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProfilingDesativadoTests(APITestCase):
+    def test_sem_cabecalho_quando_desativado(self):
+        response = self.client.get(reverse('horario-publico-list'))
+        self.assertFalse(response.has_header('Server-Timing'))
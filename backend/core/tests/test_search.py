@@ -0,0 +1,111 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+from core.search import BuscaBasica, BuscaFTS5, obter_backend_busca, termos_de_busca
+
+
+class BuscaHorariosTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = CustomUser.objects.create_user(
+            username='ana', email='ana@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+        self.bruno = CustomUser.objects.create_user(
+            username='bruno', email='bruno@ufersa.edu.br', password='password',
+            tipo='monitor', first_name='Bruno', last_name='Lima',
+        )
+        self.calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.fisica = Disciplina.objects.create(nome='Física Básica', curso='Engenharia', codigo='FIS001')
+        self.horario_calculo = Horario.objects.create(
+            professor_monitor=self.ana, disciplina=self.calculo, dia_semana='Segunda-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Sala 101',
+        )
+        self.horario_fisica = Horario.objects.create(
+            professor_monitor=self.bruno, disciplina=self.fisica, dia_semana='Terça-feira',
+            hora_inicio=time(8, 0), hora_fim=time(10, 0), local='Laboratório de Física',
+        )
+        self.url = reverse('horario-publico-list')
+
+    def _buscar(self, termo):
+        response = self.client.get(self.url, {'search': termo})
+        return [item['id'] for item in response.data['results']]
+
+    def test_backend_padrao_no_sqlite_e_fts5(self):
+        self.assertIsInstance(obter_backend_busca(), BuscaFTS5)
+
+    def test_ignora_acentos_e_maiusculas(self):
+        self.assertEqual(self._buscar('CALCULO'), [self.horario_calculo.pk])
+        self.assertEqual(self._buscar('conceicao'), [self.horario_calculo.pk])
+        self.assertEqual(self._buscar('Laboratório'), [self.horario_fisica.pk])
+
+    def test_trechos_e_varios_termos(self):
+        self.assertEqual(self._buscar('alcul'), [self.horario_calculo.pk])
+        self.assertEqual(self._buscar('fis lima'), [self.horario_fisica.pk])
+        self.assertEqual(self._buscar('calculo lima'), [])
+
+    def test_resultados_ordenados_por_relevancia(self):
+        # 'fisica' aparece duas vezes no horário de Física e nenhuma no de Cálculo
+        outro = Horario.objects.create(
+            professor_monitor=self.ana, disciplina=self.calculo, dia_semana='Segunda-feira',
+            hora_inicio=time(14, 0), hora_fim=time(16, 0), local='Bloco de Física',
+        )
+        self.assertEqual(self._buscar('fisica'), [self.horario_fisica.pk, outro.pk])
+
+        # O cursor segue a mesma ordem de relevância
+        response = self.client.get(self.url, {'search': 'fisica', 'page_size': 1})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.horario_fisica.pk])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [outro.pk])
+        self.assertIsNone(response.data['next'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], [self.horario_fisica.pk])
+
+    def test_cursor_da_busca_por_posicao(self):
+        # A relevância muda com o conteúdo do índice: o cursor guarda a posição, não o rank
+        Horario.objects.create(
+            professor_monitor=self.ana, disciplina=self.calculo, dia_semana='Segunda-feira',
+            hora_inicio=time(14, 0), hora_fim=time(16, 0), local='Bloco de Física',
+        )
+        response = self.client.get(self.url, {'search': 'fisica', 'page_size': 1})
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        self.assertEqual(json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))), {'o': 1})
+
+        for deslocamento in (-1, 10 ** 30):
+            invalido = urlsafe_b64encode(json.dumps({'o': deslocamento}).encode()).decode().rstrip('=')
+            response = self.client.get(self.url, {'search': 'fisica', 'cursor': invalido})
+            self.assertEqual(response.status_code, 404)
+
+    def test_alteracoes_de_disciplina_e_professor_atualizam_o_indice(self):
+        self.calculo.nome = 'Álgebra Linear'
+        self.calculo.save()
+        self.assertEqual(self._buscar('algebra'), [self.horario_calculo.pk])
+        self.assertEqual(self._buscar('calculo'), [])
+
+        ana = CustomUser.objects.get(pk=self.ana.pk)
+        ana.last_name = 'Rodrigues'
+        ana.save()
+        self.assertEqual(self._buscar('rodrigues'), [self.horario_calculo.pk])
+
+        self.horario_calculo.delete()
+        self.assertEqual(self._buscar('algebra'), [])
+
+    @override_settings(AGENDA_BUSCA_BACKEND='basica')
+    def test_backend_basico(self):
+        self.assertIsInstance(obter_backend_busca(), BuscaBasica)
+        self.assertEqual(self._buscar('conceicao'), [self.horario_calculo.pk])
+
+
+class TermosDeBuscaTest(TestCase):
+    def test_normaliza_e_limita_os_termos(self):
+        self.assertEqual(termos_de_busca('  Cálculo   CONCEIÇÃO '), ['calculo', 'conceicao'])
+        self.assertEqual(len(termos_de_busca(' '.join(['a'] * 50))), 8)
+        self.assertEqual(termos_de_busca(''), [])
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.catalog import _indice
+from core.models import CustomUser, Disciplina, Horario
+from core.sinteticos import PREFIXO, PREFIXO_CODIGO, GeradorCampus, remover_sinteticos
+
+
+class GeradorCampusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _indice.cache_clear()
+
+    def linhas(self):
+        return sorted(Horario.objects.values_list(
+            'professor_monitor__username', 'disciplina__codigo', 'dia_semana', 'hora_inicio', 'hora_fim', 'local',
+        ))
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        GeradorCampus(20, 10, 150, semente=7).gerar()
+        primeira = self.linhas()
+        remover_sinteticos()
+        GeradorCampus(20, 10, 150, semente=7).gerar()
+        self.assertEqual(self.linhas(), primeira)
+        self.assertEqual(len(primeira), 150)
+
+    def test_horarios_sem_conflito_de_professor_nem_de_sala(self):
+        GeradorCampus(10, 5, 200, semente=1).gerar()
+        for campo in ('professor_monitor_id', 'local'):
+            ocupados = {}
+            for horario in Horario.objects.all():
+                for outro in ocupados.get((getattr(horario, campo), horario.dia_semana), []):
+                    self.assertFalse(horario.hora_inicio < outro.hora_fim and outro.hora_inicio < horario.hora_fim)
+                ocupados.setdefault((getattr(horario, campo), horario.dia_semana), []).append(horario)
+
+    def test_remover_sinteticos(self):
+        disciplina = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia Civil', codigo='CAL001')
+        GeradorCampus(5, 5, 20).gerar()
+        self.assertEqual(remover_sinteticos(), 20)
+        self.assertFalse(CustomUser.objects.filter(username__startswith=PREFIXO).exists())
+        self.assertFalse(Disciplina.objects.filter(codigo__startswith=PREFIXO_CODIGO).exists())
+        self.assertTrue(Disciplina.objects.filter(pk=disciplina.pk).exists())
+
+
+class MedirDesempenhoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _indice.cache_clear()
+        pasta = tempfile.mkdtemp()
+        self.saida = os.path.join(pasta, 'desempenho.json')
+        self.anterior = os.path.join(pasta, 'anterior.json')
+
+    def test_grava_resultados_e_compara(self):
+        GeradorCampus(10, 5, 50).gerar()
+        call_command('medir_desempenho', repeticoes=1, aquecimento=0, saida=self.saida, stdout=StringIO())
+        with open(self.saida, encoding='utf-8') as arquivo:
+            relatorio = json.load(arquivo)
+        self.assertEqual(relatorio['dados']['horarios'], 50)
+        self.assertIn('filtro_professor_nome', relatorio['resultados'])
+        self.assertIn('itens_s', relatorio['resultados']['serializacao'])
+        self.assertEqual(set(relatorio['resultados']['lista_publica']['respostas']), {'200'})
+        self.assertNotIn('500', relatorio['resultados']['criar_horario']['respostas'])
+
+        # Tempos anteriores muito menores: tudo é marcado como regressão
+        for resultado in relatorio['resultados'].values():
+            resultado['mediana_ms'] = 0.0001
+        with open(self.anterior, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo)
+        with self.assertRaisesMessage(CommandError, 'Regressão em: lista_publica'):
+            call_command(
+                'medir_desempenho', repeticoes=1, aquecimento=0, saida=self.saida,
+                comparar=self.anterior, estrito=True, stdout=StringIO(),
+            )
+
+    def test_sem_dados(self):
+        with self.assertRaises(CommandError):
+            call_command('medir_desempenho', repeticoes=1, saida=self.saida, stdout=StringIO())
@@ -0,0 +1,107 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+class CamposSelecionadosTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+        self.calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        self.fisica = Disciplina.objects.create(nome='Física Básica', curso='Engenharia', codigo='FIS001')
+        for n in range(6):
+            Horario.objects.create(
+                professor_monitor=self.professor, disciplina=self.calculo if n % 2 else self.fisica,
+                dia_semana=n % 5, hora_inicio=time(8 + n, 0), hora_fim=time(9 + n, 0), local=f'Sala {n % 2}',
+            )
+
+    def test_fields_limita_campos_e_colunas(self):
+        url = reverse('horario-publico-list')
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, {'fields': 'id,dia_semana,hora_inicio'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for item in response.json()['results']:
+            self.assertEqual(set(item), {'id', 'dia_semana', 'hora_inicio'})
+        listagem = [consulta['sql'] for consulta in consultas.captured_queries if 'core_horario' in consulta['sql']][-1]
+        self.assertNotIn('core_disciplina', listagem)
+        self.assertNotIn('"local"', listagem)
+
+        completo = self.client.get(url).json()['results'][0]
+        self.assertIn('disciplina_nome', completo)
+
+        detalhe = self.client.get(reverse('horario-publico-detail', args=[completo['id']]), {'fields': 'local'})
+        self.assertEqual(set(detalhe.json()) - {'message'}, {'local'})
+
+    def test_fields_desconhecido(self):
+        response = self.client.get(reverse('horario-publico-list'), {'fields': 'id,senha'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('senha', response.json()['errors']['fields'])
+
+    def test_compacto_publico_agrupa_campos_da_relacao(self):
+        normal = self.client.get(reverse('horario-publico-list')).json()
+        response = self.client.get(reverse('horario-publico-list'), {'compacto': '1'})
+        dados = response.json()
+        self.assertNotIn('message', dados)
+        resultados = dados['results']
+        self.assertEqual(resultados['colunas'], [
+            'id', 'dia_semana', 'hora_inicio', 'hora_fim', 'local', 'disciplina',
+            'professor_monitor', 'ultima_atualizacao_formatada',
+        ])
+        self.assertEqual(len(resultados['linhas']), 6)
+        self.assertEqual(resultados['relacionados']['disciplina'][str(self.calculo.pk)], {
+            'disciplina_nome': 'Cálculo I', 'disciplina_codigo': 'CAL001', 'curso': 'Engenharia',
+        })
+        self.assertEqual(
+            resultados['relacionados']['professor_monitor'], {str(self.professor.pk): {'professor_nome': 'Ana Conceição'}}
+        )
+
+        # Reconstrói os itens da listagem normal a partir das colunas
+        colunas = resultados['colunas']
+        reconstruidos = []
+        for linha in resultados['linhas']:
+            item = dict(zip(colunas, linha))
+            item.update(resultados['relacionados']['disciplina'][str(item.pop('disciplina'))])
+            item.update(resultados['relacionados']['professor_monitor'][str(item.pop('professor_monitor'))])
+            reconstruidos.append(item)
+        self.assertEqual(reconstruidos, normal['results'])
+
+    def test_compacto_com_objetos_aninhados(self):
+        self.client.force_authenticate(self.professor)
+        for rapida in (True, False):
+            with self.subTest(serializacao_rapida=rapida), self.settings(AGENDA_SERIALIZACAO_RAPIDA=rapida):
+                resultados = self.client.get(
+                    reverse('horario-list'), {'compacto': '1', 'fields': 'id,disciplina,professor_monitor,local'}
+                ).json()['results']
+                self.assertEqual(resultados['colunas'], ['id', 'disciplina', 'professor_monitor', 'local'])
+                self.assertEqual(
+                    {linha[1] for linha in resultados['linhas']}, {self.calculo.pk, self.fisica.pk}
+                )
+                self.assertEqual(resultados['relacionados']['disciplina'][str(self.fisica.pk)]['codigo'], 'FIS001')
+                self.assertEqual(
+                    resultados['relacionados']['professor_monitor'][str(self.professor.pk)]['nome_completo'],
+                    'Ana Conceição',
+                )
+
+    def test_grade_compacta(self):
+        url = reverse('horario-publico-grade')
+        normal = self.client.get(url, {'curso': 'Engenharia'}).json()
+        compacta = self.client.get(url, {'curso': 'Engenharia', 'compacto': '1'}).json()
+        self.assertEqual(compacta['colunas'], ['id', 'hora_inicio', 'hora_fim', 'local', 'disciplina_id', 'professor_id'])
+        self.assertEqual(
+            [len(horarios) for horarios in compacta['grade']], [len(horarios) for horarios in normal['grade']]
+        )
+        self.assertEqual(
+            compacta['relacionados']['disciplina'][str(self.calculo.pk)],
+            {'disciplina_codigo': 'CAL001', 'disciplina_nome': 'Cálculo I', 'curso': 'Engenharia'},
+        )
+        self.assertEqual(compacta['relacionados']['professor'], {str(self.professor.pk): {'professor_nome': 'Ana Conceição'}})
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import time
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import CustomUser, Disciplina, Horario
+
+
+@override_settings(AGENDA_EXPORTACAO_CHUNK=2)
+class ExportacaoStreamingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        professor = CustomUser.objects.create_user(
+            username='professor', email='professor@ufersa.edu.br', password='password',
+            tipo='professor', first_name='Ana', last_name='Conceição',
+        )
+        calculo = Disciplina.objects.create(nome='Cálculo I', curso='Engenharia', codigo='CAL001')
+        fisica = Disciplina.objects.create(nome='Física, Básica', curso='Engenharia', codigo='FIS001')
+        for n in range(5):
+            Horario.objects.create(
+                professor_monitor=professor, disciplina=calculo if n % 2 else fisica,
+                dia_semana=n, hora_inicio=time(8, 0), hora_fim=time(10, 0), local=f'Sala "{n}"',
+            )
+        Horario.objects.create(
+            professor_monitor=professor, disciplina=calculo, dia_semana=0,
+            hora_inicio=time(14, 0), hora_fim=time(16, 0), local='Inativa', ativo=False,
+        )
+        self.url = reverse('horario-publico-exportar')
+
+    def _conteudo(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_listagem_em_streaming_igual_a_paginada(self):
+        lista = reverse('horario-publico-list')
+        paginada = self.client.get(lista, {'page_size': 100}).json()
+        completa = json.loads(self._conteudo(self.client.get(lista, {'stream': '1'})))
+        self.assertEqual(completa, {**paginada, 'next': None, 'previous': None})
+        self.assertEqual(list(completa), ['next', 'previous', 'results', 'message'])
+        self.assertEqual(len(completa['results']), 5)
+
+    def test_exportacao_json_com_envelope_no_fim(self):
+        dados = json.loads(self._conteudo(self.client.get(self.url)))
+        self.assertEqual(list(dados), ['status', 'data', 'message', 'system_info'])
+        self.assertEqual(len(dados['data']), 5)
+        self.assertEqual(dados['message'], '5 horário(s) exportado(s).')
+        self.assertEqual([item['dia_semana'] for item in dados['data']][:2], ['Segunda-feira', 'Terça-feira'])
+
+    def test_exportacao_ndjson(self):
+        linhas = self._conteudo(self.client.get(self.url, {'formato': 'ndjson'})).splitlines()
+        self.assertEqual(len(linhas), 6)
+        self.assertEqual(json.loads(linhas[0])['disciplina_nome'], 'Física, Básica')
+        self.assertEqual(json.loads(linhas[-1])['message'], '5 horário(s) exportado(s).')
+
+    def test_exportacao_csv_respeita_filtros(self):
+        response = self.client.get(self.url, {'formato': 'csv', 'search': 'calculo'})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="horarios.csv"')
+        linhas = list(csv.DictReader(io.StringIO(self._conteudo(response))))
+        self.assertEqual(len(linhas), 2)
+        self.assertEqual({linha['disciplina_codigo'] for linha in linhas}, {'CAL001'})
+        self.assertEqual(linhas[0]['local'], 'Sala "1"')
+        self.assertEqual(linhas[0]['professor_nome'], 'Ana Conceição')
+
+    def test_lista_vazia(self):
+        dados = json.loads(self._conteudo(self.client.get(self.url, {'search': 'inexistente'})))
+        self.assertEqual(dados['data'], [])
+        self.assertEqual(self._conteudo(self.client.get(self.url, {'formato': 'csv', 'search': 'inexistente'})), '')
+
+    def test_formato_invalido(self):
+        response = self.client.get(self.url, {'formato': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['status'], 'error')
@@ -1,12 +1,11 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import HorarioPublicoDetalheAsyncView, HorarioPublicoGradeAsyncView, HorarioPublicoListaAsyncView
 from .views import (
-    DeleteUserView, DisciplinaViewSet, 
-    HorarioViewSet, HorarioPublicViewSet, RegisterView, MeView
+    AlteracoesView, CalendarioView, DeleteUserView, DisciplinaViewSet, 
+    HorarioViewSet, HorarioPublicViewSet, LoginView, PerfilRequisicoesView, RegisterView, MeView
 )
 
 router = DefaultRouter()
@@ -14,12 +13,29 @@ router.register(r'disciplinas', DisciplinaViewSet)
 router.register(r'horarios', HorarioViewSet)
 router.register(r'horarios-publicos', HorarioPublicViewSet, basename='horario-publico')
 
+# Leituras públicas assíncronas (core.async_views), para servidores ASGI
+leitura_assincrona = [
+    path('horarios-publicos/', HorarioPublicoListaAsyncView.as_view(), name='horario-publico-async-list'),
+    path('horarios-publicos/grade/', HorarioPublicoGradeAsyncView.as_view(), name='horario-publico-async-grade'),
+    path('horarios-publicos/<int:pk>/', HorarioPublicoDetalheAsyncView.as_view(), name='horario-publico-async-detail'),
+]
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/', LoginView.as_view(), name='token_obtain_pair'),
     path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('users/me/', MeView.as_view(), name='me'),
     path('delete-user/', DeleteUserView.as_view(), name='delete_user'),
-    path('', include(router.urls)),
-]
\ No newline at end of file
+    path('admin/perfil/', PerfilRequisicoesView.as_view(), name='perfil-requisicoes'),
+    path('horarios-publicos/alteracoes/', AlteracoesView.as_view(), name='horario-alteracoes'),
+    re_path(r'^calendario/(?P<tipo>[a-z]+)/(?P<chave>.+)\.ics$', CalendarioView.as_view(), name='calendario'),
+    path('async/', include(leitura_assincrona)),
+]
+
+if getattr(settings, 'AGENDA_LEITURA_ASSINCRONA', False):
+    # Sob ASGI, as rotas públicas de leitura passam a usar as views assíncronas
+    urlpatterns += [
+        path(str(rota.pattern), rota.callback) for rota in leitura_assincrona
+    ]
+
+urlpatterns.append(path('', include(router.urls)))
\ No newline at end of file
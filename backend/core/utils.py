@@ -1,5 +1,15 @@
 # core/utils.py
+import unicodedata
+
 from django.utils import timezone
+from django.utils.functional import lazy
+
+
+def normalizar_texto(texto):
+    """Minúsculas e sem acentos ('Cálculo I' -> 'calculo i'), para buscas e comparações."""
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(texto.lower().split())
+
 
 def humanize_time_since(datetime_obj):
     """Retorna o tempo desde um datetime em formato legível."""
@@ -16,4 +26,9 @@ def humanize_time_since(datetime_obj):
         return f"{hours} hora(s) atrás"
     if minutes > 0:
         return f"{minutes} minuto(s) atrás"
-    return "Agora mesmo"
\ No newline at end of file
+    return "Agora mesmo"
+
+# O texto só é calculado ao renderizar a resposta: uma resposta guardada no
+# cache (core.cache) guarda o instante, e "5 minuto(s) atrás" continua certo
+# enquanto ela for servida
+tempo_desde = lazy(humanize_time_since, str)
@@ -1,6 +1,7 @@
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from .models import Horario
+from .conflicts import verificar_conflitos
+from .models import DiaSemana
 
 
 class HorarioValidator:
@@ -19,17 +20,6 @@ class HorarioValidator:
         today = timezone.now().date()
         current_time = timezone.now().time()
         
-        # Mapear dias da semana para números (0 = Segunda, 6 = Domingo)
-        dias_semana = {
-            'Segunda-feira': 0,
-            'Terça-feira': 1,
-            'Quarta-feira': 2,
-            'Quinta-feira': 3,
-            'Sexta-feira': 4,
-            'Sábado': 5,
-            'Domingo': 6
-        }
-        
         # Se foi passada uma instância de Horario
         if horario_instance:
             dia_semana = horario_instance.dia_semana
@@ -37,18 +27,17 @@ class HorarioValidator:
             hora_fim = horario_instance.hora_fim
         
         # Verificar se os dados necessários foram fornecidos
-        if not dia_semana or not hora_inicio or not hora_fim:
+        if dia_semana is None or dia_semana == '' or not hora_inicio or not hora_fim:
             raise ValueError("Dados insuficientes para validação de horário futuro")
         
         # Obter o dia da semana atual (0 = Segunda, 6 = Domingo)
         current_weekday = today.weekday()
         
-        # Obter o dia da semana do horário
-        if dia_semana not in dias_semana:
+        # Obter o dia da semana do horário (DiaSemana segue a numeração de weekday())
+        horario_weekday = DiaSemana.de_texto(dia_semana)
+        if horario_weekday is None:
             raise ValueError(f"Dia da semana inválido: {dia_semana}")
         
-        horario_weekday = dias_semana[dia_semana]
-        
         # Se o dia da semana já passou esta semana
         if horario_weekday < current_weekday:
             return False
@@ -74,19 +63,15 @@ class HorarioValidator:
         Retorna:
             True se não há conflitos, False se há conflitos
         """
-        # Verificar se há horários que se sobrepõem
-        conflicts = Horario.objects.filter(
-            professor_monitor=professor,
+        conflitos = verificar_conflitos(
+            professor=professor,
+            local=None,
             dia_semana=dia_semana,
-            hora_inicio__lt=hora_fim,
-            hora_fim__gt=hora_inicio
+            hora_inicio=hora_inicio,
+            hora_fim=hora_fim,
+            exclude_id=exclude_id
         )
-        
-        # Excluir o próprio horário da verificação (para edição)
-        if exclude_id:
-            conflicts = conflicts.exclude(id=exclude_id)
-        
-        return not conflicts.exists()
+        return not conflitos.professor
     
     @staticmethod
     def validate_required_fields(disciplina=None, local=None):
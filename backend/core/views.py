@@ -1,27 +1,57 @@
 from rest_framework import generics, viewsets, filters, status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import CustomUser, Disciplina, Horario
+from .availability import buscar_disponibilidade
+from .cache import ESCOPO_GLOBAL, CacheGeracionalMixin, escopo
+from .catalog import CatalogoDisciplinasMixin
+from .conditional import ConditionalGetMixin
+from .events import TIPOS_FILTRO, eventos_recentes, obter_transmissor, stream_eventos
+from .models import CustomUser, DiaSemana, Disciplina, Horario
 from .permissions import IsOwner, IsProfessorOrMonitor
 from .serializers import (
-    DisciplinaSerializer, HorarioSerializer, UserSerializer,
+    DisciplinaSerializer, DisponibilidadeSerializer, HorarioSerializer, UserSerializer,
     HorarioDetailSerializer, HorarioPublicSerializer, UserBasicSerializer
 )
 from .validators import HorarioValidator
-from .filters import HorarioFilter
-from .responses import ApiResponse
+from .filters import HorarioFilter, HorarioProfessorFilter
+from .fastpath import SerializacaoRapidaMixin
+from .grid import TIPOS_GRADE, ChaveInvalida, GradeInexistente, compactar_grade, obter_grade, validar_chave
+from .hashing import PoolDeHashMixin
+from .ics import FeedInexistente, obter_feed
+from .importers import ImportacaoInvalida, ImportadorHorarios
+from .pagination import HorarioKeysetPagination
+from .planner import PlanejamentoConsultaMixin
+from .profiling import estatisticas
+from .search import HorarioSearchFilter
+from .sparse import CamposSelecionadosMixin
+from .responses import SYSTEM_INFO, ApiResponse
+from .routers import LeituraReplicaMixin
+from .streaming import FORMATOS_EXPORTACAO, ExportacaoStreamingMixin, stream_csv, stream_json, stream_ndjson
 
-class RegisterView(generics.CreateAPIView):
+MENSAGEM_VISUALIZACAO = "Este sistema é apenas para visualização de horários disponíveis, não para agendamento."
+
+class RegisterView(PoolDeHashMixin, generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
 
+class LoginView(PoolDeHashMixin, TokenObtainPairView):
+    """Login (JWT) com a senha conferida no pool de hash (core.hashing)."""
+
+
 class DeleteUserView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -29,29 +59,41 @@ class DeleteUserView(APIView):
         request.user.delete()
         return Response(status=204)
 
-class HorarioViewSet(viewsets.ModelViewSet):
-    queryset = Horario.objects.all().select_related('disciplina', 'professor_monitor')
+class HorarioViewSet(CamposSelecionadosMixin, PlanejamentoConsultaMixin, ConditionalGetMixin,
+                     SerializacaoRapidaMixin, viewsets.ModelViewSet):
+    # select_related/only() vêm do serializer de cada ação (ver core.planner)
+    queryset = Horario.objects.all()
+    serializer_class = HorarioDetailSerializer
     permission_classes = [IsAuthenticated, IsProfessorOrMonitor, IsOwner]
+    pagination_class = HorarioKeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['dia_semana', 'disciplina__curso', 'disciplina']
+    filterset_class = HorarioProfessorFilter
     search_fields = ['professor_monitor__username', 'disciplina__nome', 'local']
     ordering_fields = ['dia_semana', 'hora_inicio', 'hora_fim', 'ultima_atualizacao']
     
     def get_serializer_class(self):
         """Retorna o serializer apropriado com base na ação."""
         if self.action in ['list', 'retrieve']:
-            return HorarioDetailSerializer
+            # HorarioDetailSerializer, só com os campos de ?fields= (ver core.sparse)
+            return super().get_serializer_class()
         return HorarioSerializer
         
     def get_queryset(self):
         """Filtra os horários para mostrar apenas os do usuário logado."""
         if getattr(self, 'swagger_fake_view', False) or not self.request.user.is_authenticated:
             return Horario.objects.none()
+        queryset = super().get_queryset()
         # Assume que 'professor' e 'monitor' são os tipos que podem criar horários
         if self.request.user.tipo in ['professor', 'monitor']:
-            return Horario.objects.filter(professor_monitor=self.request.user)
+            return queryset.filter(professor_monitor=self.request.user)
         # Admins podem ver tudo (ajuste conforme sua regra de negócio)
-        return Horario.objects.all()
+        return queryset
+
+    def get_escopos_validacao(self, request):
+        """A listagem de um professor/monitor só muda com os próprios horários."""
+        if request.user.is_authenticated and request.user.tipo in ['professor', 'monitor']:
+            return [escopo('professor', request.user.pk)]
+        return [ESCOPO_GLOBAL]
 
     def perform_create(self, serializer):
         serializer.save(professor_monitor=self.request.user)
@@ -101,55 +143,194 @@ class HorarioViewSet(viewsets.ModelViewSet):
             status_code=status.HTTP_200_OK
         )
 
-@method_decorator(cache_page(60 * 15), name='dispatch')
-class HorarioPublicViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=False, methods=['get'], url_path='grade')
+    def grade(self, request):
+        """Grade semanal materializada dos horários ativos do usuário logado."""
+        chave = str(request.user.pk)
+        return Response({'tipo': 'professor', 'chave': chave, **obter_grade('professor', chave)})
+
+    @action(detail=False, methods=['get'], url_path='disponibilidade')
+    def disponibilidade(self, request):
+        """
+        Intervalos livres de salas (?local=) e/ou professores/monitores
+        (?professor=<id>) em um dia (?dia_semana=) com pelo menos ?duracao=
+        minutos, dentro da janela ?inicio= / ?fim= (padrão: 07:00 às 22:00).
+        Um intervalo livre pode ser cadastrado sem conflito de sala/professor.
+        """
+        parametros = DisponibilidadeSerializer(data={
+            **request.query_params.dict(),
+            'local': request.query_params.getlist('local'),
+            'professor': request.query_params.getlist('professor'),
+        })
+        if not parametros.is_valid():
+            return ApiResponse.error(message="Parâmetros inválidos.", errors=parametros.errors)
+
+        dados = parametros.validated_data
+        livres = buscar_disponibilidade(
+            dados['dia_semana'], dados['duracao'], locais=dados['local'], professores=dados['professor'],
+            inicio=dados.get('inicio'), fim=dados.get('fim'),
+        )
+        return Response({
+            'dia_semana': DiaSemana(dados['dia_semana']).label,
+            'duracao': dados['duracao'],
+            **livres,
+        })
+
+    @action(detail=False, methods=['post'], url_path='importar',
+            parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def importar(self, request):
+        """
+        Importa em lote os horários do usuário logado, a partir de um JSON
+        (lista de horários) ou de um arquivo CSV enviado no campo 'arquivo'.
+        Nada é gravado se alguma linha tiver erro.
+        """
+        importador = ImportadorHorarios(professor=request.user)
+        try:
+            if 'arquivo' in request.FILES:
+                importador.carregar_csv(request.FILES['arquivo'])
+            else:
+                importador.carregar_json(request.data)
+        except ImportacaoInvalida as e:
+            return ApiResponse.error(message=str(e))
+
+        if not importador.validar():
+            return ApiResponse.error(
+                message="A importação contém erros. Nenhum horário foi salvo.",
+                errors={'linhas': importador.erros_por_linha()}
+            )
+
+        criados = importador.salvar()
+        return ApiResponse.success(
+            data={'total': len(criados), 'ids': [horario.pk for horario in criados]},
+            message=f"{len(criados)} horário(s) importado(s) com sucesso!",
+            status_code=status.HTTP_201_CREATED
+        )
+
+class HorarioPublicViewSet(LeituraReplicaMixin, CamposSelecionadosMixin, PlanejamentoConsultaMixin,
+                           ConditionalGetMixin, CacheGeracionalMixin, ExportacaoStreamingMixin,
+                           viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para visualização pública de horários, com cache e filtros otimizados.
+    O cache é invalidado por sinais sempre que um horário ou disciplina muda, e
+    clientes que já têm a versão atual recebem 304 (ETag / Last-Modified).
+    Com réplicas configuradas (AGENDA_DB_REPLICAS), as leituras vão para elas.
     """
-    queryset = Horario.objects.filter(ativo=True).select_related('disciplina', 'professor_monitor')
+    queryset = Horario.objects.filter(ativo=True)
     serializer_class = HorarioPublicSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = HorarioKeysetPagination
+    # A busca (?search=) usa o índice de texto_busca: disciplina (nome e código),
+    # professor/monitor (usuário e nome) e local, sem acentos e ranqueada
+    filter_backends = [DjangoFilterBackend, HorarioSearchFilter, filters.OrderingFilter]
     filterset_class = HorarioFilter
-    search_fields = [
-        'disciplina__nome', 
-        'disciplina__codigo', 
-        'professor_monitor__username', 
-        'professor_monitor__first_name', # Adicionado
-        'professor_monitor__last_name',  # Adicionado
-        'local'
-    ]
     ordering_fields = ['dia_semana', 'hora_inicio', 'hora_fim', 'ultima_atualizacao']
+    acoes_somente_leitura = ('list', 'retrieve', 'exportar')
+    acoes_replica = ('list', 'retrieve', 'exportar', 'grade')
+    acoes_campos = ('list', 'retrieve', 'exportar')
+
+    def get_escopos_cache(self, request):
+        """Listagens filtradas por dia só são invalidadas por alterações naquele dia."""
+        dia_semana = DiaSemana.de_texto(request.query_params.get('dia_semana', ''))
+        if self.action == 'list' and dia_semana is not None:
+            return [escopo('dia', dia_semana)]
+        return super().get_escopos_cache(request)
 
     def list(self, request, *args, **kwargs):
         """Adiciona mensagem informativa sobre o propósito do sistema"""
+        if request.query_params.get('stream') in ('1', 'true'):
+            # Lista completa (sem paginação) em streaming, fora do cache de respostas
+            return self._resposta_condicional(request, lambda: self._listagem_streaming(request))
         response = super().list(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK or self.modo_compacto():
+            return response
         if isinstance(response.data, dict):
-            response.data['message'] = "Este sistema é apenas para visualização de horários disponíveis, não para agendamento."
+            response.data['message'] = MENSAGEM_VISUALIZACAO
         else:
             # Se a resposta não for um dicionário, transforme-a em um
             results = response.data
             response.data = {
                 'results': results,
-                'message': "Este sistema é apenas para visualização de horários disponíveis, não para agendamento."
+                'message': MENSAGEM_VISUALIZACAO
             }
         return response
     
     def retrieve(self, request, *args, **kwargs):
         """Adiciona mensagem informativa sobre o propósito do sistema"""
         response = super().retrieve(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
         if isinstance(response.data, dict):
-            response.data['message'] = "Este sistema é apenas para visualização de horários disponíveis, não para agendamento."
+            response.data['message'] = MENSAGEM_VISUALIZACAO
         return response
 
+    def _listagem_streaming(self, request):
+        """Mesmo formato da listagem paginada, com todos os horários em uma só resposta."""
+        conteudo = stream_json(
+            self.iterar_linhas(self.get_queryset_exportacao(request)),
+            cabecalho={'next': None, 'previous': None},
+            rodape=lambda total: {'message': MENSAGEM_VISUALIZACAO},
+        )
+        return self.resposta_streaming(conteudo, 'json')
+
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Exporta todos os horários públicos (com os mesmos filtros, busca e
+        ordenação da listagem) em ?formato=json (padrão), ndjson ou csv.
+        A resposta é gerada em streaming, linha a linha.
+        """
+        formato = request.query_params.get('formato', 'json').lower()
+        if formato not in FORMATOS_EXPORTACAO:
+            return ApiResponse.error(
+                message=f"Formato inválido. Use um destes: {', '.join(FORMATOS_EXPORTACAO)}."
+            )
+
+        linhas = self.iterar_linhas(self.get_queryset_exportacao(request))
+
+        def rodape(total):
+            return {'message': f"{total} horário(s) exportado(s).", 'system_info': SYSTEM_INFO}
+
+        if formato == 'json':
+            conteudo = stream_json(linhas, cabecalho={'status': 'success'}, rodape=rodape, chave='data')
+        elif formato == 'ndjson':
+            conteudo = stream_ndjson(linhas, rodape)
+        else:
+            conteudo = stream_csv(linhas)
+        return self.resposta_streaming(conteudo, formato, nome_arquivo=f'horarios.{formato}')
+
+    @action(detail=False, methods=['get'], url_path='grade')
+    def grade(self, request):
+        """
+        Grade semanal materializada de um professor/monitor (?professor=<id>),
+        de um curso (?curso=<nome>) ou de um local (?local=<nome>).
+        """
+        pedidos = [(tipo, request.query_params[tipo]) for tipo in TIPOS_GRADE if request.query_params.get(tipo)]
+        if len(pedidos) != 1:
+            return ApiResponse.error(message="Informe exatamente um dos parâmetros: professor, curso ou local.")
+        tipo, chave = pedidos[0]
+        try:
+            chave = validar_chave(tipo, chave)
+        except ChaveInvalida:
+            return ApiResponse.error(message="Informe o id numérico do professor.")
+        except GradeInexistente:
+            raise NotFound(f"Nenhum horário encontrado para {tipo} '{chave}'.")
+        dados = obter_grade(tipo, chave)
+        if self.pediu_compacto():
+            dados = compactar_grade(dados)
+        return Response({'tipo': tipo, 'chave': chave, **dados})
+
     
-class DisciplinaViewSet(viewsets.ModelViewSet):
+class DisciplinaViewSet(CatalogoDisciplinasMixin, LeituraReplicaMixin, ConditionalGetMixin,
+                        viewsets.ModelViewSet):
     queryset = Disciplina.objects.all()
     serializer_class = DisciplinaSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['nome', 'codigo', 'curso']
     ordering_fields = ['nome', 'codigo', 'curso', 'semestre']
+
+    def get_escopos_validacao(self, request):
+        return [escopo('disciplinas')]
     
     def create(self, request, *args, **kwargs):
         """Sobrescreve o método create para fornecer feedback claro"""
@@ -190,32 +371,13 @@ class DisciplinaViewSet(viewsets.ModelViewSet):
         )
     
     def get_queryset(self):
+        """
+        Usado nas escritas. Listagem e detalhe vêm do catálogo em cache, com os
+        filtros ativo, semestre e curso (ver CatalogoDisciplinasMixin).
+        """
         if getattr(self, 'swagger_fake_view', False) or not self.request.user.is_authenticated:
             return Disciplina.objects.none()
-            
-        queryset = Disciplina.objects.all()
-        
-        # Filter by active status
-        ativo = self.request.query_params.get('ativo')
-        if ativo is not None:
-            ativo_bool = ativo.lower() == 'true'
-            queryset = queryset.filter(ativo=ativo_bool)
-            
-        # Filter by semester
-        semestre = self.request.query_params.get('semestre')
-        if semestre is not None:
-            try:
-                semestre_int = int(semestre)
-                queryset = queryset.filter(semestre=semestre_int)
-            except ValueError:
-                pass
-                
-        # Filter by course
-        curso = self.request.query_params.get('curso')
-        if curso is not None:
-            queryset = queryset.filter(curso__icontains=curso)
-            
-        return queryset
+        return Disciplina.objects.all()
 
 class MeView(APIView):
     """
@@ -229,4 +391,100 @@ class MeView(APIView):
         Pega o usuário da requisição e o serializa com UserBasicSerializer.
         """
         serializer = self.serializer_class(request.user)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class PerfilRequisicoesView(APIView):
+    """
+    Agregados da instrumentação de requisições (core.profiling) por endpoint:
+    tempos, consultas, consultas repetidas (N+1) e tamanho das respostas.
+    Os dados só são coletados com AGENDA_PROFILING ativo. DELETE zera os contadores.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'ativo': getattr(settings, 'AGENDA_PROFILING', False),
+            'endpoints': estatisticas.resumo(),
+        })
+
+    def delete(self, request):
+        estatisticas.limpar()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CalendarioView(APIView):
+    """
+    Feed iCalendar (.ics) dos horários de atendimento, para assinatura em
+    aplicativos de calendário: /api/calendario/<professor|disciplina|curso|local>/<chave>.ics
+    O arquivo fica pré-montado em cache até a próxima alteração relevante e é
+    servido com ETag / Last-Modified, então as consultas periódicas dos
+    clientes costumam terminar em 304 sem tocar no banco.
+    """
+    permission_classes = [AllowAny]
+    # Clientes de calendário não enviam token; o feed é público
+    authentication_classes = []
+
+    def get(self, request, tipo, chave):
+        try:
+            feed = obter_feed(tipo, chave)
+        except FeedInexistente:
+            return ApiResponse.error(message="Calendário não encontrado.", status_code=status.HTTP_404_NOT_FOUND)
+
+        response = HttpResponse(feed['conteudo'], content_type='text/calendar; charset=utf-8')
+        response['ETag'] = feed['etag']
+        response['Last-Modified'] = http_date(feed['last_modified'])
+        response['Content-Disposition'] = f'inline; filename="{tipo}.ics"'
+        return get_conditional_response(
+            request, etag=feed['etag'], last_modified=feed['last_modified'], response=response
+        )
+
+
+class AlteracoesView(View):
+    """
+    Feed de alterações dos horários em Server-Sent Events: uma conexão
+    mantida aberta por cliente recebe cada horário criado, atualizado ou
+    removido, opcionalmente filtrado por ?curso=, ?professor=, ?local= ou
+    ?disciplina=, em vez de consultar as listagens repetidamente.
+    View assíncrona (não DRF): a conexão fica aberta só sob ASGI (ex:
+    uvicorn, daphne). Sob WSGI, cada resposta traz os eventos pendentes e
+    termina, e o navegador reconecta a cada AGENDA_EVENTOS_CONSULTA segundos.
+    """
+
+    async def get(self, request):
+        filtros = set()
+        for tipo in TIPOS_FILTRO:
+            valor = request.GET.get(tipo)
+            if not valor:
+                continue
+            if tipo in ('professor', 'disciplina'):
+                try:
+                    valor = int(valor)
+                except ValueError:
+                    return JsonResponse({
+                        'status': 'error',
+                        'message': 'Parâmetros inválidos.',
+                        'errors': {tipo: ['Informe um número inteiro.']},
+                        'system_info': SYSTEM_INFO,
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            filtros.add(escopo(tipo, valor))
+
+        ultimo_id = request.headers.get('Last-Event-ID', '')
+        desde = int(ultimo_id) if ultimo_id.isdigit() else None
+        if isinstance(request, ASGIRequest):
+            corpo = stream_eventos(
+                obter_transmissor(), filtros, desde=desde,
+                espera=getattr(settings, 'AGENDA_EVENTOS_HEARTBEAT', 15),
+            )
+        else:
+            # O WSGI consumiria o gerador assíncrono com async_to_sync, sem
+            # enviar nada ao cliente e prendendo a thread enquanto a aba estiver aberta
+            corpo = eventos_recentes(
+                obter_transmissor(), filtros, desde=desde,
+                reconexao=getattr(settings, 'AGENDA_EVENTOS_CONSULTA', 10) * 1000,
+            )
+        response = StreamingHttpResponse(corpo, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Desliga o buffer de proxies (nginx), que seguraria os eventos
+        response['X-Accel-Buffering'] = 'no'
+        return response
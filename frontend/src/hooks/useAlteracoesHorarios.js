@@ -0,0 +1,40 @@
+import { useEffect, useRef } from 'react';
+
+// Assina o feed de alterações dos horários (Server-Sent Events) e chama
+// `onAlteracoes` com a lista de horários criados, atualizados ou removidos.
+// Eventos próximos (ex: uma importação em lote, um evento por linha) chegam
+// em um único lote, no máximo um a cada `intervalo` ms, para que quem refaz
+// a consulta a cada chamada não a repita por evento. O navegador reconecta
+// sozinho e recupera os eventos perdidos (Last-Event-ID).
+function useAlteracoesHorarios(onAlteracoes, filtros = {}, intervalo = 1000) {
+  const callback = useRef(onAlteracoes);
+  callback.current = onAlteracoes;
+  const query = new URLSearchParams(filtros).toString();
+
+  useEffect(() => {
+    const url = `${import.meta.env.VITE_API_BASE_URL}/horarios-publicos/alteracoes/${query ? `?${query}` : ''}`;
+    const fonte = new EventSource(url);
+    let pendentes = [];
+    let temporizador = null;
+
+    fonte.onmessage = (evento) => {
+      pendentes.push(JSON.parse(evento.data));
+      if (temporizador === null) {
+        temporizador = setTimeout(() => {
+          const lote = pendentes;
+          pendentes = [];
+          temporizador = null;
+          callback.current(lote);
+        }, intervalo);
+      }
+    };
+
+    // Fecha a conexão ao desmontar o componente ou trocar os filtros
+    return () => {
+      clearTimeout(temporizador);
+      fonte.close();
+    };
+  }, [query, intervalo]);
+}
+
+export default useAlteracoesHorarios;
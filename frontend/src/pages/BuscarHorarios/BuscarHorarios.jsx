@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import useDebounce from "../../hooks/useDebounce";
-import api from "../../services/api";
+import useAlteracoesHorarios from "../../hooks/useAlteracoesHorarios";
+import { buscarTodasPaginas } from "../../services/api";
 import "./BuscarHorarios.css";
 
 const BuscarHorarios = () => {
@@ -15,16 +16,20 @@ const BuscarHorarios = () => {
 
   const debouncedSearchTerm = useDebounce(searchTerm, 500);
 
+  // Refaz a busca uma vez por lote de alterações, em vez de consultar periodicamente
+  const [versao, setVersao] = useState(0);
+  useAlteracoesHorarios(() => setVersao((atual) => atual + 1));
+
   useEffect(() => {
     const fetchHorarios = async () => {
       if (debouncedSearchTerm) {
         setIsLoading(true);
         setError("");
         try {
-          const response = await api.get(
-            `/horarios-publicos/?search=${debouncedSearchTerm}`
-          );
-          setHorarios(response.data.results || response.data);
+          const resultados = await buscarTodasPaginas("/horarios-publicos/", {
+            params: { search: debouncedSearchTerm },
+          });
+          setHorarios(resultados);
         } catch (err) {
           setError("Não foi possível realizar a busca.");
           console.error(err);
@@ -37,6 +42,9 @@ const BuscarHorarios = () => {
     };
 
     fetchHorarios();
+  }, [debouncedSearchTerm, versao]);
+
+  useEffect(() => {
     setCurrentPage(1);
   }, [debouncedSearchTerm]);
 
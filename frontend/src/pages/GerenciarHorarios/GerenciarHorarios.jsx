@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import { FaEdit, FaTrashAlt } from "react-icons/fa";
-import api from "../../services/api";
+import api, { buscarTodasPaginas } from "../../services/api";
 import "./GerenciarHorarios.css";
 import ModalConfirmacao from "../../components/ModalConfirmacao/ModalConfirmacao";
 
@@ -22,8 +22,8 @@ const GerenciarHorarios = () => {
   useEffect(() => {
     const fetchHorarios = async () => {
       try {
-        const response = await api.get("/horarios/"); // Faz a requisição GET
-        setHorarios(response.data); // Preenche o estado com os dados recebidos
+        // Todas as páginas do cursor: a paginação da tabela é feita aqui
+        setHorarios(await buscarTodasPaginas("/horarios/"));
       } catch (err) {
         setError(
           "Não foi possível carregar os horários. Tente novamente mais tarde."
@@ -67,8 +67,21 @@ const VisualizarAgenda = () => {
     const fetchAndMapHorarios = async () => {
       setIsLoading(true);
       try {
-        const response = await api.get("/horarios/");
-        const horariosSemanais = response.data.results || response.data; // Compatível com e sem paginação do DRF
+        // Grade semanal materializada: uma lista de horários (em colunas) por dia
+        const response = await api.get("/horarios/grade/");
+        const { dias, colunas, grade } = response.data;
+        const horariosSemanais = grade.flatMap((horariosDoDia, posicao) =>
+          horariosDoDia.map((linha) => {
+            const horario = Object.fromEntries(
+              colunas.map((coluna, i) => [coluna, linha[i]])
+            );
+            return {
+              ...horario,
+              dia_semana: dias[posicao],
+              disciplina: { nome: horario.disciplina_nome },
+            };
+          })
+        );
 
         const mappedEvents = horariosSemanais.flatMap((horario) => {
           const eventosGerados = [];
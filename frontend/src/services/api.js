@@ -13,4 +13,20 @@ const api = axios.create({
   },
 });
 
+// Listagens paginadas por cursor: segue o `next` de cada página até a última
+// e devolve todos os itens. Rotas sem paginação retornam a lista direto.
+export const buscarTodasPaginas = async (url, config) => {
+  const itens = [];
+  let proxima = url;
+  while (proxima) {
+    const response = await api.get(proxima, config);
+    if (!response.data.results) return response.data;
+    itens.push(...response.data.results);
+    // `next` já traz os parâmetros da consulta e o cursor
+    proxima = response.data.next;
+    config = undefined;
+  }
+  return itens;
+};
+
 export default api;
\ No newline at end of file